@@ -8,6 +8,7 @@ from hydra.core.config_store import ConfigStore
 from omegaconf import MISSING
 
 from dependencies.ingestion.ingest_data import IngestDataConfig
+from dependencies.modeling.batch_predict import BatchPredictConfig
 from dependencies.modeling.rf_optuna_trial import RfOptunaTrialConfig
 from dependencies.modeling.ridge_optuna_trial import RidgeOptunaTrialConfig
 from dependencies.tests.check_required_columns import CheckRequiredColumnsConfig
@@ -21,6 +22,7 @@ from dependencies.transformations.drop_rare_drgs import DropRareDrgsConfig
 from dependencies.transformations.lag_columns import LagColumnsConfig
 from dependencies.transformations.mean_profit import MeanProfitConfig
 from dependencies.transformations.median_profit import MedianProfitConfig
+from dependencies.transformations.optimize_dtypes import OptimizeDtypesConfig
 from dependencies.transformations.ratio_drg_facility_vs_year import (
     RatioDrgFacilityVsYearConfig,
 )
@@ -36,6 +38,8 @@ from dependencies.transformations.yearly_discharge_bin import YearlyDischargeBin
 class IOPolicyConfig:
     READ_INPUT: bool = True
     WRITE_OUTPUT: bool = True
+    STREAMING: bool = False
+    CHUNK_SIZE_ROWS: int = 250_000
 
 
 @dataclass
@@ -72,13 +76,85 @@ class LoggingUtilsConfig:
     log_cfg_job: LogCfgJobConfig = field(default_factory=LogCfgJobConfig)
 
 
+@dataclass
+class PrunerConfig:
+    """Optuna pruner stopping trials between CV folds."""
+
+    name: str = "none"
+    n_startup_trials: int = 5
+    n_warmup_steps: int = 1
+    min_resource: int = 1
+    reduction_factor: int = 3
+
+
+@dataclass
+class StudyStorageConfig:
+    """Where Optuna keeps the trials of a study (memory, sqlite, journal)."""
+
+    backend: str = "memory"
+    directory: str = "optuna_studies"
+
+
+@dataclass
+class MlflowLoggingConfig:
+    """Batched logging of the per-trial MLflow runs."""
+
+    asynchronous: bool = False
+    max_queue_size: int = 100
+
+
+@dataclass
+class MlflowDatasetRegistryConfig:
+    """Cache of the MLflow dataset configs logged by the studies."""
+
+    file_path: str | None = None
+    df_hash_n_jobs: int = 1
+
+
+@dataclass
+class ResourcesConfig:
+    """Core and memory budget split between the phases of a study."""
+
+    total_cores: int | None = None
+    memory_per_worker_gb: float | None = None
+
+
+@dataclass
+class TrialResultCacheConfig:
+    """SQLite cache of trial results reused across studies on the same data."""
+
+    file_path: str | None = None
+    seed_sampler: bool = False
+
+
+@dataclass
+class PriorTrialsConfig:
+    """Best configurations of earlier experiments enqueued into a new study."""
+
+    top_k: int = 0
+    match_data_version: bool = True
+
+
+@dataclass
+class PermutationImportanceConfig:
+    """Permutation importance split, repeats, threads, rows and feature families."""
+
+    split: str = "val"
+    n_repeats: int = 5
+    n_jobs: int | None = None
+    sample_rows: int | None = None
+    group_pattern: str | None = None
+
+
 @dataclass
 class MLExperimentsConfig:
     rng_seed: int = MISSING
     n_jobs_study: int = MISSING
+    n_workers_study: int = 1
     n_jobs_final_model: int = MISSING
     target_col_modeling: str = MISSING
     year_col: str = MISSING
+    prediction_key_cols: list[str] = field(default_factory=list)
     train_range: list[int] | None = field(default_factory=list)
     val_range: list[int] | None = field(default_factory=list)
     test_range: list[int] | None = field(default_factory=list)
@@ -86,12 +162,26 @@ class MLExperimentsConfig:
     experiment_id: str = MISSING
     artifact_directory_path: str = MISSING
     permutation_importances_filename: str = MISSING
+    permutation_importance: PermutationImportanceConfig = field(
+        default_factory=PermutationImportanceConfig
+    )
     randomforest_importances_filename: str = MISSING
     top_n_importances: int = MISSING
     optuna_n_trials: int = MISSING
     cv_splits: int = MISSING
     direction: str = MISSING
     scoring: dict[str, str] | None = field(default_factory=dict)
+    pruner: PrunerConfig = field(default_factory=PrunerConfig)
+    study_storage: StudyStorageConfig = field(default_factory=StudyStorageConfig)
+    mlflow_logging: MlflowLoggingConfig = field(default_factory=MlflowLoggingConfig)
+    mlflow_dataset_registry: MlflowDatasetRegistryConfig = field(
+        default_factory=MlflowDatasetRegistryConfig
+    )
+    resources: ResourcesConfig = field(default_factory=ResourcesConfig)
+    trial_result_cache: TrialResultCacheConfig = field(
+        default_factory=TrialResultCacheConfig
+    )
+    prior_trials: PriorTrialsConfig = field(default_factory=PriorTrialsConfig)
 
 
 @dataclass
@@ -149,6 +239,7 @@ class TransformationsConfig:
     agg_severities: AggSeveritiesConfig | None
     mean_profit: MeanProfitConfig | None
     median_profit: MedianProfitConfig | None
+    optimize_dtypes: OptimizeDtypesConfig | None
     total_mean_cost: TotalMeanCostConfig | None
     total_mean_profit: TotalMeanProfitConfig | None
     total_median_cost: TotalMedianCostConfig | None
@@ -157,22 +248,38 @@ class TransformationsConfig:
     rolling_columns: RollingColumnsConfig | None
     rf_optuna_trial: RfOptunaTrialConfig | None
     ridge_optuna_trial: RidgeOptunaTrialConfig | None
+    batch_predict: BatchPredictConfig | None
 
 
 @dataclass
 class UtilityFunctionReadConfig:
-    """Parameters for reading CSV."""
+    """Parameters for reading a data version."""
 
     input_file_path: str = MISSING
+    file_type: str = "csv"
     low_memory: bool = False
+    dtype_schema_file_path: str | None = None
 
 
 @dataclass
 class UtilityFunctionWriteConfig:
-    """Parameters for writing to CSV."""
+    """Parameters for writing a data version."""
 
     output_file_path: str = MISSING
+    file_type: str = "csv"
     include_index: bool = False
+    compression: str | None = "zstd"
+
+
+@dataclass
+class ColumnProfileConfig:
+    """Options for the per-column statistics in the metadata JSON."""
+
+    distinct_count_mode: str = "exact"
+    exact_distinct_limit: int | None = None
+    hll_precision: int = 12
+    numeric_summaries: bool = False
+    deep_memory_usage: bool = True
 
 
 @dataclass
@@ -181,6 +288,8 @@ class UtilityFunctionMetadataConfig:
 
     data_file_path: str = MISSING
     output_metadata_file_path: str = MISSING
+    df_hash_n_jobs: int = 1
+    column_profile: ColumnProfileConfig = field(default_factory=ColumnProfileConfig)
 
 
 @dataclass
@@ -203,9 +312,11 @@ class UtilityFunctionsConfig:
 
 @dataclass
 class DataStorageConfig:
-    # Number of fields: 10
     split: str = MISSING
     suffix: str = MISSING
+    file_type: str = "csv"
+    input_file_type: str = "csv"
+    output_file_type: str = "csv"
     input_file_extension: str = MISSING
     output_file_extension: str = MISSING
     input_metadata_file_extension: str = MISSING
@@ -219,6 +330,7 @@ class DataStorageConfig:
     output_file_path: str = MISSING
     output_metadata_file_path: str = MISSING
     run_id_outputs_directory_path: str = MISSING
+    dtype_schema_file_path: str = MISSING
 
 
 @dataclass
@@ -255,6 +367,21 @@ class Pipeline:
     log_file_path: str | None = None
 
 
+@dataclass
+class FusedRunStepConfig:
+    transformation: str = MISSING
+    data_version_output: str = MISSING
+    test_params: str | None = None
+    overrides: list[str] | None = field(default_factory=list)
+
+
+@dataclass
+class FusedRunConfig:
+    steps: list[FusedRunStepConfig] | None = field(default_factory=list)
+    write_intermediate: bool = True
+    defer_writes: bool = False
+
+
 @dataclass
 class TestsConfig:
     check_required_columns: CheckRequiredColumnsConfig | None
@@ -290,6 +417,7 @@ class RootConfig:
     )
     data_storage: DataStorageConfig = field(default_factory=DataStorageConfig)
     test_params: TestParamsConfig = field(default_factory=TestParamsConfig)
+    fused_run: FusedRunConfig = field(default_factory=FusedRunConfig)
 
 
 cs = ConfigStore.instance()
@@ -308,6 +436,7 @@ cs.store(group="paths", name="default_schema", node=PathsConfig)
 cs.store(group="project_sections", name="example", node=ProjectSectionConfig)
 cs.store(group="setup", name="base_schema", node=SetupConfig)
 cs.store(group="pipeline", name="base_schema", node=Pipeline)
+cs.store(group="fused_run", name="base_schema", node=FusedRunConfig)
 
 # Register the final RootConfig so Hydra knows how to instantiate it
 cs.store(name="root_config", node=RootConfig)
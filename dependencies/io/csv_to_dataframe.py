@@ -1,6 +1,8 @@
 """Reads a CSV file, and returns a pd.DataFrame."""
 
 # dependencies/io/csv_to_dataframe.py
+from __future__ import annotations
+
 import logging
 
 import pandas as pd
@@ -11,8 +13,9 @@ logger = logging.getLogger(__name__)
 def csv_to_dataframe(
     input_file_path: str,
     low_memory: bool = False,
+    dtype: dict[str, str] | None = None,
 ) -> pd.DataFrame:
     """Reads a CSV file and returns a pd.DataFrame."""
-    df = pd.read_csv(input_file_path, low_memory=low_memory)
+    df = pd.read_csv(input_file_path, low_memory=low_memory, dtype=dtype)
     logger.info("Read %s, created df", input_file_path)
     return df
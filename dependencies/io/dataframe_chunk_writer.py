@@ -0,0 +1,101 @@
+# dependencies/io/dataframe_chunk_writer.py
+from __future__ import annotations
+
+import logging
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+from dependencies.io.hashing_file_writer import HashingFileWriter, WrittenFile
+from dependencies.io.read_dataframe import SUPPORTED_FILE_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+class DataFrameChunkWriter:
+    """Writes a data version incrementally, one row chunk at a time.
+
+    The output matches a single `write_dataframe` call on the concatenated
+    chunks: CSV gets one header, Parquet one row group per chunk and Feather
+    one record batch per chunk. The bytes go through a HashingFileWriter,
+    `written_file` is available after `close` (use with contextlib.closing).
+    """
+
+    def __init__(
+        self,
+        output_file_path: str,
+        include_index: bool,
+        file_type: str = "csv",
+        compression: str | None = "zstd",
+    ):
+        if file_type not in SUPPORTED_FILE_TYPES:
+            msg = (
+                f"Unsupported file_type '{file_type}'. "
+                f"Expected one of {SUPPORTED_FILE_TYPES}."
+            )
+            raise ValueError(msg)
+        self.output_file_path = output_file_path
+        self.include_index = bool(include_index)
+        self.file_type = file_type
+        self.compression = compression
+        self.num_rows = 0
+
+        mkdir_if_not_exists(os.path.dirname(output_file_path))
+        self._sink = HashingFileWriter(output_file_path)
+        self._text = self._sink.text_stream() if file_type == "csv" else None
+        self._schema: pa.Schema | None = None
+        self._writer: pq.ParquetWriter | pa.ipc.RecordBatchFileWriter | None = None
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        if self.file_type == "parquet":
+            return pa.Table.from_pandas(
+                df,
+                schema=self._schema,
+                preserve_index=self.include_index,
+            )
+        # Feather stores no index, see dataframe_to_feather
+        df = df.reset_index(drop=not self.include_index)
+        return pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+
+    def _open_arrow_writer(
+        self, table: pa.Table
+    ) -> pq.ParquetWriter | pa.ipc.RecordBatchFileWriter:
+        self._schema = table.schema
+        if self.file_type == "parquet":
+            return pq.ParquetWriter(
+                self._sink,
+                self._schema,
+                compression=self.compression,
+            )
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(self._sink, self._schema, options=options)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._text is not None:
+            df.to_csv(self._text, index=self.include_index, header=self.num_rows == 0)
+        else:
+            table = self._to_table(df)
+            if self._writer is None:
+                self._writer = self._open_arrow_writer(table)
+            self._writer.write_table(table)
+        self.num_rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._text is not None:
+            self._text.close()
+        self._sink.close()
+        logger.info(
+            "Exported %i rows in chunks to %s using filepath: %s",
+            self.num_rows,
+            self.file_type,
+            self.output_file_path,
+        )
+
+    @property
+    def written_file(self) -> WrittenFile:
+        return self._sink.written_file
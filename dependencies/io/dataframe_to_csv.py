@@ -4,6 +4,7 @@ import os
 import pandas as pd
 
 from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+from dependencies.io.hashing_file_writer import HashingFileWriter, WrittenFile
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +13,11 @@ def dataframe_to_csv(
     df: pd.DataFrame,
     output_file_path: str,
     include_index: bool,
-) -> None:
+) -> WrittenFile:
     mkdir_if_not_exists(os.path.dirname(output_file_path))
     logger.debug("Output CSV file path: %s", output_file_path)
-    df.to_csv(output_file_path, index=include_index)
+    writer = HashingFileWriter(output_file_path)
+    with writer.text_stream() as f:
+        df.to_csv(f, index=include_index)
     logger.info("Exported df to csv using filepath: %s", output_file_path)
+    return writer.written_file
@@ -0,0 +1,32 @@
+# dependencies/io/dataframe_to_feather.py
+from __future__ import annotations
+
+import logging
+import os
+
+import pandas as pd
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+from dependencies.io.hashing_file_writer import HashingFileWriter, WrittenFile
+
+logger = logging.getLogger(__name__)
+
+
+def dataframe_to_feather(
+    df: pd.DataFrame,
+    output_file_path: str,
+    include_index: bool,
+    compression: str | None = "zstd",
+) -> WrittenFile:
+    """Writes df as Feather v2 (Arrow IPC file format).
+
+    Feather only supports a default RangeIndex, so the index is either
+    materialized as a column (include_index=True) or dropped.
+    """
+    mkdir_if_not_exists(os.path.dirname(output_file_path))
+    logger.debug("Output Feather file path: %s", output_file_path)
+    df = df.reset_index(drop=not include_index)
+    with HashingFileWriter(output_file_path) as writer:
+        df.to_feather(writer, compression=compression)
+    logger.info("Exported df to feather using filepath: %s", output_file_path)
+    return writer.written_file
@@ -0,0 +1,34 @@
+# dependencies/io/dataframe_to_parquet.py
+from __future__ import annotations
+
+import logging
+import os
+
+import pandas as pd
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+from dependencies.io.hashing_file_writer import HashingFileWriter, WrittenFile
+
+logger = logging.getLogger(__name__)
+
+
+def dataframe_to_parquet(
+    df: pd.DataFrame,
+    output_file_path: str,
+    include_index: bool,
+    compression: str | None = "zstd",
+) -> WrittenFile:
+    """Writes df to Parquet. `category` columns are stored as dictionary
+    encoded arrays and the pandas metadata keeps all dtypes for the next read.
+    """
+    mkdir_if_not_exists(os.path.dirname(output_file_path))
+    logger.debug("Output Parquet file path: %s", output_file_path)
+    with HashingFileWriter(output_file_path) as writer:
+        df.to_parquet(
+            writer,
+            engine="pyarrow",
+            compression=compression,
+            index=include_index,
+        )
+    logger.info("Exported df to parquet using filepath: %s", output_file_path)
+    return writer.written_file
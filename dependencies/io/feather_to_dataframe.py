@@ -0,0 +1,20 @@
+"""Reads a Feather (Arrow IPC) file, and returns a pd.DataFrame."""
+
+# dependencies/io/feather_to_dataframe.py
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def feather_to_dataframe(
+    input_file_path: str,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Reads a Feather v2 / Arrow IPC file and returns a pd.DataFrame."""
+    df = pd.read_feather(input_file_path, columns=list(columns) if columns else None)
+    logger.info("Read %s, created df", input_file_path)
+    return df
@@ -0,0 +1,66 @@
+# dependencies/io/hashing_file_writer.py
+import hashlib
+import io
+import logging
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WrittenFile:
+    """SHA-256 and size of a file, computed while it was written."""
+
+    hash_sha256: str
+    file_size_bytes: int
+
+
+class HashingFileWriter(io.RawIOBase):
+    """Binary file opened for writing that tees every byte through SHA-256.
+
+    Pass it to writers that accept a file object (pyarrow directly, text
+    writers via `text_stream`). After closing, `written_file` holds the
+    digest and size of the file on disk without reading it back.
+    """
+
+    def __init__(self, file_path: str):
+        super().__init__()
+        self.file_path = file_path
+        self._file = open(file_path, "wb")  # noqa: SIM115
+        self._sha256 = hashlib.sha256()
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        n = self._file.write(b)
+        self._sha256.update(memoryview(b)[:n])
+        self._size += n
+        return n
+
+    def tell(self) -> int:
+        return self._size
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+    def text_stream(self, encoding: str = "utf-8") -> io.TextIOWrapper:
+        """Text layer on top of the writer, newline="" like open(path, "w")
+        in pandas, so the bytes match a write to the path itself.
+        """
+        return io.TextIOWrapper(
+            io.BufferedWriter(self, buffer_size=1 << 20),
+            encoding=encoding,
+            newline="",
+        )
+
+    @property
+    def written_file(self) -> WrittenFile:
+        return WrittenFile(self._sha256.hexdigest(), self._size)
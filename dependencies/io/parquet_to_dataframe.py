@@ -0,0 +1,28 @@
+"""Reads a Parquet file, and returns a pd.DataFrame."""
+
+# dependencies/io/parquet_to_dataframe.py
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def parquet_to_dataframe(
+    input_file_path: str,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Reads a Parquet file and returns a pd.DataFrame.
+
+    Dtypes are restored from the pandas metadata stored in the file, so
+    dictionary-encoded columns come back as `category`.
+    """
+    df = pd.read_parquet(
+        input_file_path,
+        engine="pyarrow",
+        columns=list(columns) if columns else None,
+    )
+    logger.info("Read %s, created df", input_file_path)
+    return df
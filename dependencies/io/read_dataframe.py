@@ -0,0 +1,56 @@
+"""Reads a data version in its storage format, and returns a pd.DataFrame."""
+
+# dependencies/io/read_dataframe.py
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+from dependencies.io.csv_to_dataframe import csv_to_dataframe
+from dependencies.io.feather_to_dataframe import feather_to_dataframe
+from dependencies.io.parquet_to_dataframe import parquet_to_dataframe
+from dependencies.pandas_specific.dtype_schema import (
+    apply_dtype_schema,
+    categorical_read_dtypes,
+    load_dtype_schema,
+)
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FILE_TYPES = ("csv", "parquet", "feather", "arrow")
+
+
+def read_dataframe(
+    input_file_path: str,
+    file_type: str = "csv",
+    low_memory: bool = False,
+    dtype_schema_file_path: str | None = None,
+) -> pd.DataFrame:
+    """Dispatches to the reader matching `file_type`.
+
+    `low_memory` only applies to CSV. `arrow` is an alias for `feather`,
+    both are the Arrow IPC file format. With `dtype_schema_file_path` the
+    dtype schema written by `optimize_dtypes` is applied to the result, CSV
+    parses the categorical columns straight into `category`.
+    """
+    schema = (
+        load_dtype_schema(dtype_schema_file_path) if dtype_schema_file_path else None
+    )
+    if file_type == "csv":
+        df = csv_to_dataframe(
+            input_file_path,
+            low_memory=low_memory,
+            dtype=categorical_read_dtypes(schema) if schema else None,
+        )
+    elif file_type == "parquet":
+        df = parquet_to_dataframe(input_file_path)
+    elif file_type in ("feather", "arrow"):
+        df = feather_to_dataframe(input_file_path)
+    else:
+        msg = (
+            f"Unsupported file_type '{file_type}'. "
+            f"Expected one of {SUPPORTED_FILE_TYPES}."
+        )
+        raise ValueError(msg)
+    return apply_dtype_schema(df, schema) if schema else df
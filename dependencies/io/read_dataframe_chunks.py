@@ -0,0 +1,160 @@
+"""Reads a data version in bounded-size chunks of rows."""
+
+# dependencies/io/read_dataframe_chunks.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Iterator
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dependencies.io.read_dataframe import SUPPORTED_FILE_TYPES
+from dependencies.pandas_specific.dtype_schema import (
+    apply_dtype_schema,
+    categorical_read_dtypes,
+    load_dtype_schema,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _metadata_dtypes(input_metadata_file_path: str | None) -> dict[str, str] | None:
+    """Column dtypes recorded in the metadata JSON of the input data version."""
+    if not input_metadata_file_path or not os.path.exists(input_metadata_file_path):
+        return None
+    with open(input_metadata_file_path) as f:
+        columns = json.load(f).get("columns") or {}
+    return {col: spec["data_type"] for col, spec in columns.items()}
+
+
+def _pinned_dtype(dtype: Any) -> Any:
+    """dtype CSV chunks parse a column into, None where read_csv cannot."""
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category"
+    if dtype.kind == "M":
+        return None  # dates only parse through parse_dates
+    return dtype
+
+
+def _nullable_dtype(dtype: Any) -> Any:
+    """Integers and booleans as their nullable types, other dtypes as is."""
+    if not isinstance(dtype, np.dtype):
+        return dtype
+    if dtype.kind == "b":
+        return "boolean"
+    if dtype.kind == "i":
+        return dtype.name.capitalize()
+    if dtype.kind == "u":
+        return "U" + dtype.name[1:].capitalize()
+    return dtype
+
+
+def csv_chunk_dtypes(
+    input_file_path: str,
+    chunk_size_rows: int,
+    input_metadata_file_path: str | None = None,
+) -> dict[str, Any]:
+    """dtypes pinned for every chunk of a CSV file.
+
+    Taken from the input metadata when it exists, it records the dtypes of
+    the whole data version. Otherwise they are inferred from the first chunk
+    with integers and booleans widened to their nullable types, so a missing
+    value in a later chunk does not turn them into float or object. Columns
+    without a value in the first chunk are left to inference.
+    """
+    recorded = _metadata_dtypes(input_metadata_file_path)
+    if recorded is not None:
+        dtypes = {
+            col: _pinned_dtype(pd.api.types.pandas_dtype(dtype))
+            for col, dtype in recorded.items()
+        }
+    else:
+        first = pd.read_csv(input_file_path, nrows=chunk_size_rows)
+        dtypes = {
+            col: _nullable_dtype(_pinned_dtype(dtype))
+            for col, dtype in first.dtypes.items()
+            if first[col].notna().any()
+        }
+    return {col: dtype for col, dtype in dtypes.items() if dtype is not None}
+
+
+def _csv_chunks(
+    input_file_path: str,
+    chunk_size_rows: int,
+    dtype: dict[str, Any] | None,
+) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(input_file_path, chunksize=chunk_size_rows, dtype=dtype) as reader:
+        yield from reader
+
+
+def _parquet_chunks(
+    input_file_path: str, chunk_size_rows: int
+) -> Iterator[pd.DataFrame]:
+    parquet_file = pq.ParquetFile(input_file_path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size_rows):
+        yield batch.to_pandas()
+
+
+def _feather_chunks(
+    input_file_path: str, chunk_size_rows: int
+) -> Iterator[pd.DataFrame]:
+    with pa.memory_map(input_file_path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, chunk_size_rows):
+                yield batch.slice(offset, chunk_size_rows).to_pandas()
+
+
+def read_dataframe_chunks(
+    input_file_path: str,
+    file_type: str = "csv",
+    chunk_size_rows: int = 250_000,
+    dtype_schema_file_path: str | None = None,
+    low_memory: bool = False,  # noqa: ARG001
+    input_metadata_file_path: str | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Yields consecutive row chunks of at most `chunk_size_rows` rows.
+
+    CSV is parsed with `chunksize`, Parquet in record batches and Feather per
+    IPC record batch. Every chunk carries its row positions in the whole file
+    as a RangeIndex, as if the file had been read at once. CSV chunks all
+    parse into the dtypes of csv_chunk_dtypes instead of inferring their
+    own. `low_memory` is accepted for parity with `read_dataframe`, chunked
+    parsing is always low memory.
+    """
+    schema = (
+        load_dtype_schema(dtype_schema_file_path) if dtype_schema_file_path else None
+    )
+    if file_type == "csv":
+        dtype = csv_chunk_dtypes(
+            input_file_path, chunk_size_rows, input_metadata_file_path
+        )
+        if schema:
+            dtype.update(categorical_read_dtypes(schema))
+        chunks = _csv_chunks(input_file_path, chunk_size_rows, dtype)
+    elif file_type == "parquet":
+        chunks = _parquet_chunks(input_file_path, chunk_size_rows)
+    elif file_type in ("feather", "arrow"):
+        chunks = _feather_chunks(input_file_path, chunk_size_rows)
+    else:
+        msg = (
+            f"Unsupported file_type '{file_type}'. "
+            f"Expected one of {SUPPORTED_FILE_TYPES}."
+        )
+        raise ValueError(msg)
+
+    offset = 0
+    for i, raw_chunk in enumerate(chunks):
+        raw_chunk.index = pd.RangeIndex(offset, offset + len(raw_chunk))
+        offset += len(raw_chunk)
+        chunk = apply_dtype_schema(raw_chunk, schema) if schema else raw_chunk
+        logger.debug("Read chunk %i of %s, %i rows", i, input_file_path, len(chunk))
+        yield chunk
+    logger.info("Read %s in chunks, %i rows", input_file_path, offset)
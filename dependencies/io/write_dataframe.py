@@ -0,0 +1,40 @@
+# dependencies/io/write_dataframe.py
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+from dependencies.io.dataframe_to_csv import dataframe_to_csv
+from dependencies.io.dataframe_to_feather import dataframe_to_feather
+from dependencies.io.dataframe_to_parquet import dataframe_to_parquet
+from dependencies.io.hashing_file_writer import WrittenFile
+from dependencies.io.read_dataframe import SUPPORTED_FILE_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+def write_dataframe(
+    df: pd.DataFrame,
+    output_file_path: str,
+    include_index: bool,
+    file_type: str = "csv",
+    compression: str | None = "zstd",
+) -> WrittenFile:
+    """Dispatches to the writer matching `file_type`.
+
+    `compression` applies to the columnar formats only, CSV is written as
+    plain text so DVC can diff it. Returns the SHA-256 and size of the written
+    file, hashed on the way to disk.
+    """
+    if file_type == "csv":
+        return dataframe_to_csv(df, output_file_path, include_index)
+    if file_type == "parquet":
+        return dataframe_to_parquet(df, output_file_path, include_index, compression)
+    if file_type in ("feather", "arrow"):
+        return dataframe_to_feather(df, output_file_path, include_index, compression)
+    msg = (
+        f"Unsupported file_type '{file_type}'. "
+        f"Expected one of {SUPPORTED_FILE_TYPES}."
+    )
+    raise ValueError(msg)
@@ -1,5 +1,8 @@
+from __future__ import annotations
+
 import logging
 import os
+import time
 from typing import Any
 
 import mlflow
@@ -7,6 +10,8 @@ import pandas as pd
 
 from dependencies.modeling.compute_permutation_importances import (
     compute_permutation_importances,
+    group_features,
+    stratified_sample,
 )
 
 logger = logging.getLogger(__name__)
@@ -17,11 +22,44 @@ def calculate_and_log_importances_as_artifact(
     model: Any,
     X: pd.DataFrame,
     y: pd.Series,
+    n_repeats: int = 5,
+    n_jobs: int | None = None,
+    sample_rows: int | None = None,
+    strata: pd.Series | None = None,
+    group_pattern: str | None = None,
+    random_state: int = 42,
 ) -> None:
-    perm_dict = compute_permutation_importances(model, X, y)
-    sorted_perm = sorted(perm_dict, key=lambda f: abs(perm_dict[f]), reverse=True)
-    pd.DataFrame(
-        [{"feature": f, "importances": perm_dict[f]} for f in sorted_perm],
+    """Permutation importances of `model` on X, logged as a CSV artifact.
+
+    `sample_rows` subsamples X stratified by `strata` (the year), feature
+    families matching `group_pattern` are permuted together, see
+    compute_permutation_importances.
+    """
+    X, y = stratified_sample(
+        X,
+        y,
+        strata if strata is not None else pd.Series(0, index=X.index),
+        sample_rows,
+        random_state=random_state,
+    )
+    start = time.perf_counter()
+    importances = compute_permutation_importances(
+        model,
+        X,
+        y,
+        random_state=random_state,
+        n_repeats=n_repeats,
+        n_jobs=n_jobs,
+        feature_groups=group_features(list(X.columns), group_pattern),
+    )
+    logger.info(
+        "Permutation importances of %i feature groups on %i rows took %.1fs",
+        len(importances),
+        len(X),
+        time.perf_counter() - start,
+    )
+    importances.sort_values(
+        "importances", key=lambda s: s.abs(), ascending=False
     ).to_csv(importances_filename, index=False)
     mlflow.log_artifact(importances_filename, artifact_path="importances")
     if os.path.exists(importances_filename):
@@ -0,0 +1,34 @@
+# dependencies/logging_utils/load_logged_predictions.py
+from __future__ import annotations
+
+import logging
+
+import mlflow
+import pandas as pd
+
+from dependencies.io.parquet_to_dataframe import parquet_to_dataframe
+from dependencies.logging_utils.log_predictions_as_artifact import (
+    PREDICTIONS_ARTIFACT_PATH,
+    predictions_file_name,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def load_logged_predictions(
+    run_id: str,
+    partition: str,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Predictions logged by log_predictions_as_artifact in run `run_id`.
+
+    Returns the key columns with `y_true`, `y_pred` and `residual` without
+    loading or re-scoring the model. The tracking URI must point at the
+    store holding the run, e.g. `file:./mlruns`.
+    """
+    local_path = mlflow.artifacts.download_artifacts(
+        run_id=run_id,
+        artifact_path=f"{PREDICTIONS_ARTIFACT_PATH}/{predictions_file_name(partition)}",
+    )
+    logger.info("Loaded %s predictions of run %s", partition, run_id)
+    return parquet_to_dataframe(local_path, columns=columns)
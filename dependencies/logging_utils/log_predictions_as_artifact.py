@@ -0,0 +1,105 @@
+# dependencies/logging_utils/log_predictions_as_artifact.py
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+
+import mlflow
+import numpy as np
+import pandas as pd
+
+from dependencies.io.dataframe_to_parquet import dataframe_to_parquet
+
+logger = logging.getLogger(__name__)
+
+PREDICTIONS_ARTIFACT_PATH = "predictions"
+RESIDUAL_QUANTILES = (0.05, 0.5, 0.95)
+
+
+def predictions_file_name(partition: str) -> str:
+    return f"{partition}_predictions.parquet"
+
+
+def residual_summary(residual: np.ndarray) -> dict[str, float]:
+    """Location, spread and tails of `y_true - y_pred`."""
+    quantiles = np.quantile(residual, RESIDUAL_QUANTILES)
+    return {
+        "residual_mean": float(residual.mean()),
+        "residual_std": float(residual.std()),
+        "residual_abs_max": float(np.abs(residual).max()),
+        **{
+            f"residual_p{round(q * 100):02d}": float(v)
+            for q, v in zip(RESIDUAL_QUANTILES, quantiles)
+        },
+    }
+
+
+def errors_by_year(years: np.ndarray, residual: np.ndarray) -> pd.DataFrame:
+    """Rows, RMSE, MAE and bias (mean residual) per year."""
+    year_values, year_index = np.unique(years, return_inverse=True)
+    n_rows = np.bincount(year_index)
+    return pd.DataFrame(
+        {
+            "year": year_values,
+            "n_rows": n_rows,
+            "rmse": np.sqrt(np.bincount(year_index, weights=residual**2) / n_rows),
+            "mae": np.bincount(year_index, weights=np.abs(residual)) / n_rows,
+            "bias": np.bincount(year_index, weights=residual) / n_rows,
+        }
+    )
+
+
+def log_predictions_as_artifact(
+    partition: str,
+    keys: pd.DataFrame,
+    y_true: pd.Series | np.ndarray,
+    y_pred: np.ndarray,
+    year_col: str,
+) -> pd.DataFrame:
+    """Logs a partition's predictions and error breakdowns to the active run.
+
+    `keys` (row identifiers including `year_col`, aligned with `y_true`) are
+    written with `y_true`, `y_pred` and `residual` as one zstd Parquet
+    artifact under `predictions/`, loadable with load_logged_predictions.
+    The residual summary is logged as `<partition>_residual_*` metrics and
+    the per-year RMSE, MAE and bias as `<partition>_errors_by_year.csv`
+    plus `<partition>_rmse_<year>` metrics. Returns the per-year frame.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    residual = y_true - y_pred
+    predictions = keys.reset_index(drop=True).assign(
+        y_true=y_true, y_pred=y_pred, residual=residual
+    )
+    by_year = errors_by_year(keys[year_col].to_numpy(), residual)
+
+    with tempfile.TemporaryDirectory() as directory:
+        dataframe_to_parquet(
+            predictions,
+            os.path.join(directory, predictions_file_name(partition)),
+            include_index=False,
+        )
+        by_year_path = os.path.join(directory, f"{partition}_errors_by_year.csv")
+        by_year.to_csv(by_year_path, index=False)
+        mlflow.log_artifacts(directory, artifact_path=PREDICTIONS_ARTIFACT_PATH)
+
+    mlflow.log_metrics(
+        {
+            **{
+                f"{partition}_{name}": value
+                for name, value in residual_summary(residual).items()
+            },
+            **{
+                f"{partition}_rmse_{year}": rmse
+                for year, rmse in zip(by_year["year"], by_year["rmse"])
+            },
+        }
+    )
+    logger.info(
+        "Logged %i %s predictions to the %s artifacts",
+        len(predictions),
+        partition,
+        PREDICTIONS_ARTIFACT_PATH,
+    )
+    return by_year
@@ -0,0 +1,216 @@
+# dependencies/logging_utils/mlflow_batch_logger.py
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from mlflow.data.dataset import Dataset
+from mlflow.entities import Dataset as DatasetEntity
+from mlflow.entities import DatasetInput, InputTag, Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+from mlflow.tracking.context import registry as context_registry
+from mlflow.utils.mlflow_tags import MLFLOW_DATASET_CONTEXT, MLFLOW_RUN_NAME
+from mlflow.utils.validation import (
+    MAX_ENTITIES_PER_BATCH,
+    MAX_METRICS_PER_BATCH,
+    MAX_PARAMS_TAGS_PER_BATCH,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def batch_chunks(
+    metrics: list[Metric],
+    params: list[Param],
+    tags: list[RunTag],
+) -> Iterator[tuple[list[Metric], list[Param], list[RunTag]]]:
+    """Splits one run's entities into chunks within the `log_batch` limits.
+
+    A chunk holds at most 100 params, 100 tags, 1000 metrics and 1000
+    entities in total, a tracking server rejects larger requests.
+    """
+    while metrics or params or tags:
+        params_chunk = params[:MAX_PARAMS_TAGS_PER_BATCH]
+        tags_chunk = tags[:MAX_PARAMS_TAGS_PER_BATCH]
+        n_metrics = min(
+            MAX_METRICS_PER_BATCH,
+            MAX_ENTITIES_PER_BATCH - len(params_chunk) - len(tags_chunk),
+        )
+        yield metrics[:n_metrics], params_chunk, tags_chunk
+        metrics = metrics[n_metrics:]
+        params = params[len(params_chunk) :]
+        tags = tags[len(tags_chunk) :]
+
+
+def dataset_entity(dataset: Dataset) -> DatasetEntity:
+    """The tracking entity of `dataset`, built from its public `to_dict`."""
+    config = dataset.to_dict()
+    return DatasetEntity(
+        name=config["name"],
+        digest=config["digest"],
+        source_type=config["source_type"],
+        source=config["source"],
+        schema=config.get("schema"),
+        profile=config.get("profile"),
+    )
+
+
+@dataclass
+class RunRecord:
+    """Everything one finished run logs: tags, params, metrics and inputs.
+
+    `metric_series` values are logged with their position as step, `texts`
+    maps artifact file paths to their content.
+    """
+
+    run_name: str
+    tags: dict[str, Any] = field(default_factory=dict)
+    params: dict[str, Any] = field(default_factory=dict)
+    metrics: dict[str, float] = field(default_factory=dict)
+    metric_series: dict[str, Sequence[float]] = field(default_factory=dict)
+    texts: dict[str, str] = field(default_factory=dict)
+    inputs: list[tuple[Dataset, str, dict[str, Any]]] = field(default_factory=list)
+
+    def log_input(
+        self,
+        dataset: Dataset,
+        context: str,
+        tags: dict[str, Any] | None = None,
+    ) -> None:
+        self.inputs.append((dataset, context, tags or {}))
+
+
+class MlflowBatchLogger:
+    """Logs whole runs with few `log_batch` calls and one `log_inputs` call.
+
+    A trial fills a RunRecord and hands it to `log_run`, instead of opening a
+    fluent run and writing every param, metric and input separately. Its
+    entities are split by `batch_chunks`, a `metric_series` alone can exceed
+    the 1000 metrics of one request. With `asynchronous` the records go
+    through a bounded queue to a background thread, `put` blocks when
+    `max_queue_size` records are pending. Call `close` at the end of the
+    study, it flushes the queue and raises the first error of the background
+    thread. After that error `log_run` raises it as well, and records queued
+    before it are dropped with a warning each. Processes forked from the
+    creating one (study workers) log synchronously, the thread does not
+    survive fork.
+    """
+
+    def __init__(
+        self,
+        experiment_id: str,
+        asynchronous: bool = False,
+        max_queue_size: int = 100,
+    ):
+        self.experiment_id = experiment_id
+        self.asynchronous = asynchronous
+        self._client = MlflowClient()
+        # start_run resolves these for every run, they do not change per trial
+        self._context_tags = context_registry.resolve_tags({})
+        self._pid = os.getpid()
+        self._error: BaseException | None = None
+        self._queue: queue.Queue[RunRecord | None] = queue.Queue(max_queue_size)
+        self._thread: threading.Thread | None = None
+        if asynchronous:
+            self._thread = threading.Thread(
+                target=self._drain,
+                name="mlflow-batch-logger",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _write(self, record: RunRecord) -> str:
+        run = self._client.create_run(
+            self.experiment_id,
+            run_name=record.run_name,
+            tags={MLFLOW_RUN_NAME: record.run_name},
+        )
+        run_id = run.info.run_id
+        timestamp = int(time.time() * 1000)
+        metrics = [
+            *(Metric(k, float(v), timestamp, 0) for k, v in record.metrics.items()),
+            *(
+                Metric(k, float(v), timestamp, step)
+                for k, values in record.metric_series.items()
+                for step, v in enumerate(values)
+            ),
+        ]
+        params = [Param(k, str(v)) for k, v in record.params.items()]
+        tags = [
+            RunTag(k, str(v)) for k, v in {**self._context_tags, **record.tags}.items()
+        ]
+        for metrics_chunk, params_chunk, tags_chunk in batch_chunks(
+            metrics, params, tags
+        ):
+            self._client.log_batch(
+                run_id, metrics=metrics_chunk, params=params_chunk, tags=tags_chunk
+            )
+        if record.inputs:
+            self._client.log_inputs(
+                run_id,
+                datasets=[
+                    DatasetInput(
+                        dataset=dataset_entity(dataset),
+                        tags=[
+                            *(InputTag(k, str(v)) for k, v in input_tags.items()),
+                            InputTag(MLFLOW_DATASET_CONTEXT, context),
+                        ],
+                    )
+                    for dataset, context, input_tags in record.inputs
+                ],
+            )
+        for artifact_file, text in record.texts.items():
+            self._client.log_text(run_id, text, artifact_file)
+        self._client.set_terminated(run_id)
+        return run_id
+
+    def _drain(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is None:
+                self._queue.task_done()
+                return
+            try:
+                if self._error is None:
+                    self._write(record)
+                else:
+                    # log_run raises the error, runs queued before it are lost
+                    logger.warning(
+                        "Dropped MLflow run '%s' after a failed background write",
+                        record.run_name,
+                    )
+            except Exception as e:
+                logger.exception(
+                    "Background MLflow logging of run '%s' failed", record.run_name
+                )
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def log_run(self, record: RunRecord) -> None:
+        if self._thread is None or os.getpid() != self._pid:
+            self._write(record)
+            return
+        if self._error is not None:
+            raise self._error
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        if self._thread is not None and os.getpid() == self._pid:
+            self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        if self._thread is not None and os.getpid() == self._pid:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        logger.debug("Closed MLflow batch logger of experiment %s", self.experiment_id)
+        self.flush()
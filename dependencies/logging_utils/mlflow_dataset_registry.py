@@ -0,0 +1,225 @@
+# dependencies/logging_utils/mlflow_dataset_registry.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+import pandas as pd
+from mlflow.data.dataset import Dataset
+from mlflow.data.dataset_source import DatasetSource
+from mlflow.data.dataset_source_registry import (
+    get_dataset_source_from_json,
+    resolve_dataset_source,
+)
+from mlflow.data.pandas_dataset import PandasDataset
+from mlflow.models import infer_signature
+from mlflow.types import ColSpec, Schema
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+from dependencies.logging_utils.mlflow_batch_logger import RunRecord
+from dependencies.metadata.compute_dataframe_fingerprint import (
+    DATAFRAME_HASH_ALGORITHM,
+    compute_dataframe_fingerprint,
+)
+
+logger = logging.getLogger(__name__)
+
+# MLflow recommends digests of at most 10 characters
+DATASET_DIGEST_LENGTH = 10
+SCHEMA_SAMPLE_ROWS = 1000
+# Fields identifying a dataset, without the schema and profile
+REFERENCE_FIELDS = ("name", "digest", "source", "source_type")
+
+
+def infer_dataset_schema(df: pd.DataFrame) -> Schema | None:
+    """Same schema as PandasDataset infers, without its per-cell Python loop.
+
+    Column types come from the first SCHEMA_SAMPLE_ROWS rows, `required`
+    from a vectorized null check over all rows.
+    """
+    try:
+        sample_schema = infer_signature(df.head(SCHEMA_SAMPLE_ROWS)).inputs
+    except Exception:
+        logger.debug("Could not infer an MLflow schema", exc_info=True)
+        return None
+    has_nulls = df.isna().any()
+    return Schema(
+        [
+            ColSpec(
+                type=spec.type,
+                name=spec.name,
+                required=not bool(has_nulls[spec.name]),
+            )
+            for spec in sample_schema.inputs
+        ]
+    )
+
+
+class RegisteredDataset(Dataset):
+    """MLflow dataset whose config (digest, source, schema, profile) is fixed.
+
+    Logging it serializes nothing, `to_dict` returns the stored config and
+    the DataFrame is not needed anymore.
+    """
+
+    def __init__(self, config: dict[str, Any], registry_key: str | None = None):
+        self._config = config
+        self.registry_key = registry_key or config["digest"]
+        super().__init__(
+            source=get_dataset_source_from_json(
+                config["source"], source_type=config["source_type"]
+            ),
+            name=config["name"],
+            digest=config["digest"],
+        )
+
+    def _compute_digest(self) -> str:
+        return self._config["digest"]
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(self._config)
+
+    def reference(self) -> RegisteredDataset:
+        """The same dataset with only its name, digest and source.
+
+        Runs logging the dataset many times (trials) log the reference, the
+        tracking store keeps the schema and profile of the first logging.
+        """
+        return RegisteredDataset(
+            {k: self._config[k] for k in REFERENCE_FIELDS},
+            registry_key=self.registry_key,
+        )
+
+    @property
+    def profile(self) -> Any | None:
+        profile = self._config.get("profile")
+        return json.loads(profile) if profile else None
+
+    @property
+    def schema(self) -> Schema | None:
+        schema = self._config.get("schema")
+        if not schema:
+            return None
+        return Schema.from_json(json.dumps(json.loads(schema)["mlflow_colspec"]))
+
+
+class MlflowDatasetRegistry:
+    """Creates the MLflow datasets of a study once, and across runs.
+
+    The full frame is fingerprinted with compute_dataframe_fingerprint.
+    A split's key derives from that fingerprint and the split's definition
+    (year range, columns), so splits are never hashed themselves. Configs
+    (digest, source, inferred schema, profile) are cached in memory and,
+    with `registry_file_path`, in a JSON file, so later runs on the same
+    data version skip the schema inference as well.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        registry_file_path: str | None = None,
+        df_hash_n_jobs: int = 1,
+    ):
+        self.registry_file_path = registry_file_path
+        self.df_hash_n_jobs = df_hash_n_jobs
+        self._source: DatasetSource = resolve_dataset_source(source)
+        self._configs: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        if registry_file_path and os.path.exists(registry_file_path):
+            with open(registry_file_path) as f:
+                registry = json.load(f)
+            if registry.get("hash_algorithm") == DATAFRAME_HASH_ALGORITHM:
+                self._configs = registry["datasets"]
+            logger.info(
+                "Loaded %i MLflow dataset configs from %s",
+                len(self._configs),
+                registry_file_path,
+            )
+
+    def _get_or_create(
+        self, key: str, df: pd.DataFrame, name: str
+    ) -> RegisteredDataset:
+        config = self._configs.get(key)
+        if config is None or config["source"] != self._source.to_json():
+            pandas_dataset = PandasDataset(
+                df=df,
+                source=self._source,
+                name=name,
+                digest=key[:DATASET_DIGEST_LENGTH],
+            )
+            schema = infer_dataset_schema(df)
+            config = {
+                # name, digest and source fields, without PandasDataset's schema
+                **Dataset.to_dict(pandas_dataset),
+                "schema": (
+                    json.dumps({"mlflow_colspec": schema.to_dict()}) if schema else None
+                ),
+                "profile": json.dumps(pandas_dataset.profile),
+            }
+            self._configs[key] = config
+            self._dirty = True
+            logger.debug("Registered MLflow dataset '%s' (%s)", name, config["digest"])
+        return RegisteredDataset(config, registry_key=key)
+
+    def register(self, df: pd.DataFrame, name: str = "dataset") -> RegisteredDataset:
+        key = compute_dataframe_fingerprint(df, n_jobs=self.df_hash_n_jobs)
+        return self._get_or_create(key, df, name)
+
+    def register_split(
+        self,
+        parent: RegisteredDataset,
+        df: pd.DataFrame,
+        name: str,
+        split: dict[str, Any],
+    ) -> RegisteredDataset:
+        """`split` must fully describe how df was cut from the parent frame."""
+        spec = json.dumps(
+            {"parent": parent.registry_key, "name": name, **split},
+            sort_keys=True,
+            default=list,
+        )
+        key = hashlib.sha256(spec.encode()).hexdigest()
+        return self._get_or_create(key, df, name)
+
+    def save(self) -> None:
+        if not self.registry_file_path or not self._dirty:
+            return
+        mkdir_if_not_exists(os.path.dirname(self.registry_file_path))
+        with open(self.registry_file_path, "w") as f:
+            json.dump(
+                {
+                    "hash_algorithm": DATAFRAME_HASH_ALGORITHM,
+                    "datasets": self._configs,
+                },
+                f,
+                indent=4,
+            )
+        self._dirty = False
+        logger.info(
+            "Saved %i MLflow dataset configs to %s",
+            len(self._configs),
+            self.registry_file_path,
+        )
+
+
+def datasets_record(
+    dataset: RegisteredDataset,
+    split_datasets: dict[str, RegisteredDataset],
+    model_tags: Any,
+) -> RunRecord:
+    """A `datasets` run logging the full frame and its splits in full.
+
+    Logged before any trial runs, so the tracking store (which keeps each
+    dataset once per experiment) holds their schema and profile and the
+    trial and final model runs only log `RegisteredDataset.reference()`.
+    """
+    record = RunRecord(run_name="datasets", tags=model_tags)
+    record.log_input(dataset, context="study", tags=model_tags)
+    for name, split_dataset in split_datasets.items():
+        record.log_input(
+            split_dataset, context="study", tags={**model_tags, "split": name}
+        )
+    return record
@@ -1,5 +1,6 @@
 # dependencies/metadata/calculate_metadata.py
-import hashlib
+from __future__ import annotations
+
 import json
 import logging
 import os
@@ -10,26 +11,26 @@ import pandas as pd
 
 from dependencies.general.make_relative_file_path import anonymize_path
 from dependencies.logging_utils.log_function_call import log_function_call
+from dependencies.metadata.compute_dataframe_fingerprint import (
+    DATAFRAME_HASH_ALGORITHM,
+    DataFrameFingerprint,
+    compute_dataframe_fingerprint,
+)
 from dependencies.metadata.compute_file_hash import compute_file_hash
+from dependencies.metadata.profile_columns import ColumnProfiler, profile_columns
 
 logger = logging.getLogger(__name__)
 
 
-def compute_dataframe_hash(df: pd.DataFrame) -> str:
-    df_string = df.to_csv(index=True)
-    return hashlib.sha256(df_string.encode("utf-8")).hexdigest()
+def compute_dataframe_hash(df: pd.DataFrame, n_jobs: int = 1) -> str:
+    return compute_dataframe_fingerprint(df, n_jobs=n_jobs)
 
 
-def get_column_metadata(df: pd.DataFrame) -> dict[str, dict[str, Any]]:
-    metadata = {}
-    for col in df.columns:
-        metadata[col] = {
-            "data_type": str(df[col].dtype),
-            "num_missing": int(df[col].isnull().sum()),
-            "unique_values": int(df[col].nunique()),
-            "memory_usage_bytes": int(df[col].memory_usage(deep=True)),
-        }
-    return metadata
+def get_column_metadata(
+    df: pd.DataFrame,
+    column_profile: dict[str, Any] | None = None,
+) -> dict[str, dict[str, Any]]:
+    return profile_columns(df, **(column_profile or {}))
 
 
 def get_index_metadata(df: pd.DataFrame) -> dict[str, Any]:
@@ -58,42 +59,110 @@ def get_index_metadata(df: pd.DataFrame) -> dict[str, Any]:
     return index_info
 
 
-def calculate_metadata(df: pd.DataFrame, data_file_path: str) -> dict[str, Any]:
-    timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-    try:
-        file_size = os.path.getsize(data_file_path)
-    except OSError:
-        file_size = None
-        logger.warning("File size could not be determined for %s.", data_file_path)
+class MetadataAccumulator:
+    """Collects the DataFrame part of the metadata over consecutive row chunks.
+
+    Fingerprint, column profile, row count and index are all mergeable, so a
+    data version written in chunks gets the same metadata as one written
+    from a single DataFrame.
+    """
+
+    def __init__(
+        self,
+        df_hash_n_jobs: int = 1,
+        column_profile: dict[str, Any] | None = None,
+    ):
+        self.fingerprint = DataFrameFingerprint(n_jobs=df_hash_n_jobs)
+        self.profiler = ColumnProfiler(**(column_profile or {}))
+        self.num_rows = 0
+        self.total_columns = 0
+        self.index: pd.Index | None = None
+        self.index_freq: str | None = None
+
+    def _update_index(self, index: pd.Index) -> None:
+        first = self.index is None
+        if self.index is None or isinstance(self.index, pd.RangeIndex):
+            combined = index if self.index is None else self.index.append(index)
+            if isinstance(combined, pd.RangeIndex):
+                self.index = combined
+                return
+        else:
+            combined = self.index.append(index)
+        # Of any other index only the type, names and datetime bounds are kept
+        if isinstance(combined, pd.DatetimeIndex) and combined.notna().any():
+            self.index = combined[[combined.argmin(), combined.argmax()]]
+            self.index_freq = combined.freqstr if first else None
+        else:
+            self.index = combined[:0]
+
+    def update(self, df: pd.DataFrame) -> MetadataAccumulator:
+        self.fingerprint.update(df)
+        self.profiler.update(df)
+        self._update_index(df.index)
+        self.num_rows += len(df)
+        self.total_columns = df.shape[1]
+        return self
+
+    def metadata(
+        self,
+        data_file_path: str,
+        file_hash_sha256: str | None = None,
+        file_size_bytes: int | None = None,
+    ) -> dict[str, Any]:
+        """`file_hash_sha256` and `file_size_bytes` come from the write when it
+        went through a HashingFileWriter, otherwise the file is read back.
+        """
+        timestamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        file_size = file_size_bytes
+        if file_size is None:
+            try:
+                file_size = os.path.getsize(data_file_path)
+            except OSError:
+                logger.warning(
+                    "File size could not be determined for %s.", data_file_path
+                )
+
+        hash_sha256 = file_hash_sha256
+        if hash_sha256 is None:
+            try:
+                hash_sha256 = compute_file_hash(data_file_path)
+            except Exception as e:
+                logger.error("Error computing file hash for %s: %s", data_file_path, e)
+
+        index_metadata = get_index_metadata(
+            pd.DataFrame(index=self.index if self.index is not None else [])
+        )
+        if isinstance(self.index, pd.DatetimeIndex):
+            index_metadata["frequency"] = self.index_freq
+        metadata = {
+            "timestamp": timestamp,
+            "file_path": anonymize_path(data_file_path),
+            "file_size_bytes": file_size,
+            "num_rows": self.num_rows,
+            "hash_sha256": hash_sha256,
+            "df_hash": self.fingerprint.hexdigest(),
+            "df_hash_algorithm": DATAFRAME_HASH_ALGORITHM,
+            "total_columns": self.total_columns,
+            "distinct_count_mode": self.profiler.distinct_count_mode,
+            "columns": self.profiler.to_dict(),
+            "index": index_metadata,
+        }
 
-    num_rows = len(df)
-    df_hash = compute_dataframe_hash(df)
+        logger.info("Generated metadata for file: %s", data_file_path)
+        logger.debug("Metadata details: %s", json.dumps(metadata, indent=4))
+        return metadata
 
-    try:
-        hash_sha256 = compute_file_hash(data_file_path)
-    except Exception as e:
-        logger.error("Error computing file hash for %s: %s", data_file_path, e)
-        hash_sha256 = None
-
-    updated_file_path = anonymize_path(data_file_path)
-    columns_metadata = get_column_metadata(df)
-    index_metadata = get_index_metadata(df)
-
-    metadata = {
-        "timestamp": timestamp,
-        "file_path": updated_file_path,
-        "file_size_bytes": file_size,
-        "num_rows": num_rows,
-        "hash_sha256": hash_sha256,
-        "df_hash": df_hash,
-        "total_columns": df.shape[1],
-        "columns": columns_metadata,
-        "index": index_metadata,
-    }
 
-    logger.info("Generated metadata for file: %s", data_file_path)
-    logger.debug("Metadata details: %s", json.dumps(metadata, indent=4))
-    return metadata
+def calculate_metadata(
+    df: pd.DataFrame,
+    data_file_path: str,
+    df_hash_n_jobs: int = 1,
+    column_profile: dict[str, Any] | None = None,
+    file_hash_sha256: str | None = None,
+    file_size_bytes: int | None = None,
+) -> dict[str, Any]:
+    accumulator = MetadataAccumulator(df_hash_n_jobs, column_profile).update(df)
+    return accumulator.metadata(data_file_path, file_hash_sha256, file_size_bytes)
 
 
 def save_metadata(metadata: dict[str, Any], metadata_file: str):
@@ -125,7 +194,31 @@ def calculate_and_save_metadata(
     df: pd.DataFrame,
     data_file_path: str,
     output_metadata_file_path: str,
+    df_hash_n_jobs: int = 1,
+    column_profile: dict[str, Any] | None = None,
+    file_hash_sha256: str | None = None,
+    file_size_bytes: int | None = None,
+) -> None:
+    validate_data_file_path(data_file_path)
+    metadata = calculate_metadata(
+        df,
+        data_file_path,
+        df_hash_n_jobs=df_hash_n_jobs,
+        column_profile=column_profile,
+        file_hash_sha256=file_hash_sha256,
+        file_size_bytes=file_size_bytes,
+    )
+    save_metadata(metadata, output_metadata_file_path)
+
+
+@log_function_call
+def save_accumulated_metadata(
+    accumulator: MetadataAccumulator,
+    data_file_path: str,
+    output_metadata_file_path: str,
+    file_hash_sha256: str | None = None,
+    file_size_bytes: int | None = None,
 ) -> None:
     validate_data_file_path(data_file_path)
-    metadata = calculate_metadata(df, data_file_path)
+    metadata = accumulator.metadata(data_file_path, file_hash_sha256, file_size_bytes)
     save_metadata(metadata, output_metadata_file_path)
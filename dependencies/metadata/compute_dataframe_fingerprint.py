@@ -0,0 +1,76 @@
+# dependencies/metadata/compute_dataframe_fingerprint.py
+from __future__ import annotations
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Recorded next to the hash in the metadata JSON, bump when the scheme changes
+DATAFRAME_HASH_ALGORITHM = "sha256-hash_pandas_object-v1"
+INDEX_KEY = "__index__"
+
+
+def _hash_values(values: pd.Series | pd.Index) -> bytes:
+    # Row hashes use pandas' fixed default hash key, so they are stable across
+    # runs and processes.
+    return pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes()
+
+
+class DataFrameFingerprint:
+    """Incremental SHA-256 fingerprint of a DataFrame.
+
+    Every column (and the index) feeds its own digest with the 64-bit row
+    hashes of `pd.util.hash_pandas_object`, seeded with the column name and
+    dtype. Feeding consecutive row chunks through `update` gives the same
+    fingerprint as hashing the whole frame at once.
+    """
+
+    def __init__(self, n_jobs: int = 1):
+        self.n_jobs = max(int(n_jobs), 1)
+        self._schema: list[tuple[str, str]] | None = None
+        self._digests: list[hashlib._Hash] = []
+
+    def _init_schema(self, df: pd.DataFrame) -> None:
+        self._schema = [(INDEX_KEY, str(df.index.dtype))] + [
+            (str(name), str(dtype)) for name, dtype in df.dtypes.items()
+        ]
+        self._digests = []
+        for name, dtype in self._schema:
+            digest = hashlib.sha256()
+            digest.update(f"{name}\x00{dtype}\x00".encode())
+            self._digests.append(digest)
+
+    def update(self, df: pd.DataFrame) -> DataFrameFingerprint:
+        if self._schema is None:
+            self._init_schema(df)
+        elif [name for name, _ in self._schema[1:]] != [str(c) for c in df.columns]:
+            msg = "Chunk columns differ from the first chunk."
+            raise ValueError(msg)
+
+        parts = [df.index] + [df.iloc[:, i] for i in range(df.shape[1])]
+        if self.n_jobs > 1 and len(parts) > 2:
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+                row_hashes = list(executor.map(_hash_values, parts))
+        else:
+            row_hashes = [_hash_values(part) for part in parts]
+
+        for digest, hashed in zip(self._digests, row_hashes, strict=True):
+            digest.update(hashed)
+        return self
+
+    def hexdigest(self) -> str:
+        combined = hashlib.sha256(DATAFRAME_HASH_ALGORITHM.encode())
+        for (name, _), digest in zip(self._schema or [], self._digests, strict=True):
+            combined.update(name.encode())
+            combined.update(digest.digest())
+        return combined.hexdigest()
+
+
+def compute_dataframe_fingerprint(df: pd.DataFrame, n_jobs: int = 1) -> str:
+    fingerprint = DataFrameFingerprint(n_jobs=n_jobs).update(df).hexdigest()
+    logger.info("Generated dataframe fingerprint: %s", fingerprint)
+    return fingerprint
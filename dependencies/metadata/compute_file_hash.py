@@ -1,14 +1,28 @@
 # dependencies/metadata/compute_file_hash.py
 import hashlib
 import logging
+import mmap
+import os
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 1 << 20
 
-def compute_file_hash(file_path: str) -> str:
+
+def compute_file_hash(
+    file_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    use_mmap: bool = False,
+) -> str:
     sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                sha256_hash.update(mapped)
+        else:
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while n := f.readinto(buffer):
+                sha256_hash.update(view[:n])
     logger.info("Generated file hash: %s", sha256_hash.hexdigest())
     return sha256_hash.hexdigest()
@@ -0,0 +1,295 @@
+# dependencies/metadata/profile_columns.py
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DISTINCT_COUNT_MODES = ("exact", "approximate", "none")
+
+
+def unique_non_null(series: pd.Series) -> np.ndarray:
+    uniques = series.unique()
+    return np.asarray(uniques[~pd.isna(uniques)])
+
+
+def hash_non_null(series: pd.Series) -> np.ndarray:
+    """64-bit hashes of the non-null values of `series`."""
+    values = series.dropna()
+    if pd.api.types.is_float_dtype(values.dtype):
+        values = values + 0.0  # -0.0 and 0.0 are the same value
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # frexp is exact for integers below 2**53, so split into 32-bit halves
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit hashes.
+
+    Uses 2**precision one-byte registers, the relative standard error is about
+    1.04 / sqrt(2**precision). Sketches of the same precision merge by
+    taking the register-wise maximum.
+    """
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 18:
+            msg = f"HyperLogLog precision must be in [4, 18], got {precision}."
+            raise ValueError(msg)
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, hashes: np.ndarray) -> None:
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if hashes.size == 0:
+            return
+        rest_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        ranks = (rest_bits - _bit_length(rest) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other: HyperLogLog) -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return round(estimate)
+
+
+class ColumnProfiler:
+    """Column statistics for the `columns` block of the metadata JSON.
+
+    Null counts, memory usage and numeric summaries come from DataFrame-wide
+    calls. Distinct counts are either exact (sets of unique values) or
+    approximate (one HyperLogLog sketch per column). With an
+    `exact_distinct_limit` an exact set growing past it is hashed into a
+    sketch, so memory stays bounded and the count becomes approximate for
+    that column, `unique_values_approximate` marks such columns. The
+    profiler accumulates over consecutive row chunks via `update`, and
+    profilers of disjoint chunks combine with `merge`.
+    """
+
+    def __init__(
+        self,
+        distinct_count_mode: str = "exact",
+        hll_precision: int = 12,
+        numeric_summaries: bool = False,
+        deep_memory_usage: bool = True,
+        exact_distinct_limit: int | None = None,
+    ):
+        if distinct_count_mode not in DISTINCT_COUNT_MODES:
+            msg = f"Unknown distinct_count_mode '{distinct_count_mode}'."
+            raise ValueError(msg)
+        self.distinct_count_mode = distinct_count_mode
+        self.hll_precision = int(hll_precision)
+        self.numeric_summaries = bool(numeric_summaries)
+        self.deep_memory_usage = bool(deep_memory_usage)
+        self.exact_distinct_limit = (
+            None if exact_distinct_limit is None else int(exact_distinct_limit)
+        )
+
+        self.dtypes: pd.Series | None = None
+        self.num_rows = 0
+        self.num_missing: pd.Series | None = None
+        self.memory_usage: pd.Series | None = None
+        # Consecutive RangeIndex chunks, any other index only adds its memory
+        self.range_index: pd.RangeIndex | None = None
+        self.index_memory_usage = 0
+        self.distinct: dict[Any, np.ndarray | HyperLogLog] = {}
+        self.minimum: pd.Series | None = None
+        self.maximum: pd.Series | None = None
+        self.total: pd.Series | None = None
+        self.count: pd.Series | None = None
+
+    def _update_index(self, index: pd.Index) -> None:
+        if isinstance(index, pd.RangeIndex):
+            combined = _append(self.range_index, index)
+            if isinstance(combined, pd.RangeIndex):
+                self.range_index = combined
+                return
+        self.index_memory_usage += index.memory_usage(deep=self.deep_memory_usage)
+
+    def _sketch(self, values: np.ndarray) -> HyperLogLog:
+        sketch = HyperLogLog(self.hll_precision)
+        sketch.update(hash_non_null(pd.Series(values)))
+        return sketch
+
+    def _combine_distinct(self, col: Any, theirs: np.ndarray | HyperLogLog) -> None:
+        mine = self.distinct.get(col)
+        if mine is None:
+            combined = theirs
+        elif isinstance(mine, HyperLogLog) or isinstance(theirs, HyperLogLog):
+            combined = mine if isinstance(mine, HyperLogLog) else self._sketch(mine)
+            combined.merge(
+                theirs if isinstance(theirs, HyperLogLog) else self._sketch(theirs)
+            )
+        else:
+            combined = _union(mine, theirs)
+        if (
+            self.exact_distinct_limit is not None
+            and not isinstance(combined, HyperLogLog)
+            and len(combined) > self.exact_distinct_limit
+        ):
+            logger.info(
+                "Column '%s' has over %i distinct values, counting it approximately",
+                col,
+                self.exact_distinct_limit,
+            )
+            combined = self._sketch(combined)
+        self.distinct[col] = combined
+
+    def _update_distinct(self, df: pd.DataFrame) -> None:
+        for col in df.columns:
+            sketch = self.distinct.get(col)
+            if sketch is None and self.distinct_count_mode == "approximate":
+                sketch = self.distinct[col] = HyperLogLog(self.hll_precision)
+            if isinstance(sketch, HyperLogLog):
+                sketch.update(hash_non_null(df[col]))
+            else:
+                self._combine_distinct(col, unique_non_null(df[col]))
+
+    def update(self, df: pd.DataFrame) -> ColumnProfiler:
+        if self.dtypes is None:
+            self.dtypes = df.dtypes
+        self.num_rows += len(df)
+        self.num_missing = _add(self.num_missing, df.isna().sum())
+        self._update_index(df.index)
+        self.memory_usage = _add(
+            self.memory_usage,
+            df.memory_usage(index=False, deep=self.deep_memory_usage),
+        )
+        if self.distinct_count_mode != "none":
+            self._update_distinct(df)
+        if self.numeric_summaries:
+            numeric = df.select_dtypes(include="number", exclude="bool")
+            self.minimum = _combine(self.minimum, _reduce(numeric, "min"), np.fmin)
+            self.maximum = _combine(self.maximum, _reduce(numeric, "max"), np.fmax)
+            self.total = _add(self.total, numeric.sum())
+            self.count = _add(self.count, numeric.count())
+        return self
+
+    def merge(self, other: ColumnProfiler) -> ColumnProfiler:
+        if other.dtypes is None or other.num_missing is None:
+            return self
+        if self.dtypes is None:
+            self.dtypes = other.dtypes
+        self.num_rows += other.num_rows
+        if other.range_index is not None:
+            self._update_index(other.range_index)
+        self.index_memory_usage += other.index_memory_usage
+        self.num_missing = _add(self.num_missing, other.num_missing)
+        self.memory_usage = _add(self.memory_usage, other.memory_usage)
+        for col, theirs in other.distinct.items():
+            self._combine_distinct(col, theirs)
+        if self.numeric_summaries and other.minimum is not None:
+            self.minimum = _combine(self.minimum, other.minimum, np.fmin)
+            self.maximum = _combine(self.maximum, other.maximum, np.fmax)
+            self.total = _add(self.total, other.total)
+            self.count = _add(self.count, other.count)
+        return self
+
+    def _unique_values(self, col: Any) -> int | None:
+        distinct = self.distinct.get(col)
+        if self.distinct_count_mode == "none":
+            return None
+        if distinct is None:
+            return 0
+        if isinstance(distinct, HyperLogLog):
+            return distinct.count()
+        return len(distinct)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        metadata: dict[str, dict[str, Any]] = {}
+        if self.dtypes is None or self.num_missing is None or self.memory_usage is None:
+            return metadata
+        # Counts the index for every column, like Series.memory_usage does
+        index_memory_usage = self.index_memory_usage
+        if self.range_index is not None:
+            index_memory_usage += self.range_index.memory_usage()
+        for col, dtype in self.dtypes.items():
+            metadata[col] = {
+                "data_type": str(dtype),
+                "num_missing": int(self.num_missing[col]),
+                "unique_values": self._unique_values(col),
+                "unique_values_approximate": isinstance(
+                    self.distinct.get(col), HyperLogLog
+                ),
+                "memory_usage_bytes": int(self.memory_usage[col] + index_memory_usage),
+            }
+            if (
+                self.numeric_summaries
+                and self.count is not None
+                and col in self.count.index
+            ):
+                count = int(self.count[col])
+                metadata[col].update(
+                    {
+                        "min": _to_builtin(self.minimum[col]),
+                        "max": _to_builtin(self.maximum[col]),
+                        "mean": float(self.total[col]) / count if count else None,
+                    },
+                )
+        return metadata
+
+
+def _add(left: pd.Series | None, right: pd.Series) -> pd.Series:
+    return right if left is None else left.add(right, fill_value=0)
+
+
+def _append(left: pd.Index | None, right: pd.Index) -> pd.Index:
+    return right if left is None else left.append(right)
+
+
+def _union(left: np.ndarray | None, right: np.ndarray) -> np.ndarray:
+    return right if left is None else pd.unique(np.concatenate([left, right]))
+
+
+def _reduce(df: pd.DataFrame, how: str) -> pd.Series:
+    # Per column, so integer columns are not upcast to a common float dtype
+    return pd.Series(
+        {col: getattr(df[col], how)() for col in df.columns},
+        index=df.columns,
+        dtype=object,
+    )
+
+
+def _combine(left: pd.Series | None, right: pd.Series, func) -> pd.Series:
+    return right if left is None else left.combine(right, func)
+
+
+def _to_builtin(value: Any) -> Any:
+    if pd.isna(value):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def profile_columns(
+    df: pd.DataFrame,
+    distinct_count_mode: str = "exact",
+    hll_precision: int = 12,
+    numeric_summaries: bool = False,
+    deep_memory_usage: bool = True,
+    exact_distinct_limit: int | None = None,
+) -> dict[str, dict[str, Any]]:
+    profiler = ColumnProfiler(
+        distinct_count_mode=distinct_count_mode,
+        hll_precision=hll_precision,
+        numeric_summaries=numeric_summaries,
+        deep_memory_usage=deep_memory_usage,
+        exact_distinct_limit=exact_distinct_limit,
+    )
+    return profiler.update(df).to_dict()
@@ -0,0 +1,137 @@
+# dependencies/modeling/batch_predict.py
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import pairwise
+from typing import Any
+
+import mlflow
+import numpy as np
+import pandas as pd
+from sklearn.base import RegressorMixin
+
+logger = logging.getLogger(__name__)
+
+# Model and chunk of the current batch, inherited by the forked workers
+_SHARED: dict[str, Any] = {}
+
+
+@dataclass
+class BatchPredictConfig:
+    run_id: str | None
+    run_name: str
+    model_tags: dict
+    model_artifact_path: str
+    tracking_uri: str
+    keep_cols: list[str] | None
+    prediction_col: str
+    n_workers: int
+
+
+@lru_cache(maxsize=8)
+def resolve_model_run(
+    run_id: str | None,
+    run_name: str,
+    model_tag_items: tuple[tuple[str, str], ...],
+    tracking_uri: str,
+) -> str:
+    """`run_id`, or the id of the latest `run_name` run carrying all tags."""
+    if run_id:
+        return run_id
+    mlflow.set_tracking_uri(tracking_uri)
+    filters = [f"tags.mlflow.runName = '{run_name}'"]
+    filters += [f"tags.{key} = '{value}'" for key, value in model_tag_items]
+    runs = mlflow.search_runs(
+        search_all_experiments=True,
+        filter_string=" AND ".join(filters),
+        order_by=["attributes.start_time DESC"],
+        max_results=1,
+    )
+    if runs.empty:
+        msg = (
+            f"No '{run_name}' run with tags {dict(model_tag_items)} in {tracking_uri}."
+        )
+        raise ValueError(msg)
+    return runs["run_id"].iloc[0]
+
+
+@lru_cache(maxsize=2)
+def load_run_model(
+    run_id: str, model_artifact_path: str, tracking_uri: str
+) -> RegressorMixin:
+    """The sklearn model logged in run `run_id`, loaded once per process."""
+    mlflow.set_tracking_uri(tracking_uri)
+    model = mlflow.sklearn.load_model(f"runs:/{run_id}/{model_artifact_path}")
+    if not hasattr(model, "feature_names_in_"):
+        msg = f"The model of run {run_id} was not fitted on named features."
+        raise ValueError(msg)
+    logger.info("Loaded %s of run %s", type(model).__name__, run_id)
+    return model
+
+
+def _predict_slice(bounds: tuple[int, int]) -> np.ndarray:
+    start, stop = bounds
+    return _SHARED["model"].predict(_SHARED["X"].iloc[start:stop])
+
+
+def predict_in_workers(
+    model: RegressorMixin, X: pd.DataFrame, n_workers: int
+) -> np.ndarray:
+    """Predicts X split into `n_workers` row slices in forked processes.
+
+    The workers inherit the model and X instead of unpickling them, their
+    memory pages stay shared with the parent as long as they are only read.
+    A joblib memory map would not help a forest, sklearn copies the tree
+    nodes out of it on load. The model predicts single-threaded meanwhile.
+    """
+    if n_workers <= 1 or len(X) < n_workers:
+        return model.predict(X)
+    params = model.get_params()
+    if "n_jobs" in params:
+        model.set_params(n_jobs=1)
+    _SHARED.update(model=model, X=X)
+    bounds = np.linspace(0, len(X), n_workers + 1, dtype=int)
+    try:
+        with multiprocessing.get_context("fork").Pool(n_workers) as pool:
+            parts = pool.map(_predict_slice, pairwise(bounds))
+    finally:
+        _SHARED.clear()
+        if "n_jobs" in params:
+            model.set_params(n_jobs=params["n_jobs"])
+    return np.concatenate(parts)
+
+
+def batch_predict(
+    df: pd.DataFrame,
+    run_id: str | None,
+    run_name: str,
+    model_tags: dict,
+    model_artifact_path: str,
+    tracking_uri: str,
+    keep_cols: list[str] | None,
+    prediction_col: str,
+    n_workers: int,
+) -> pd.DataFrame:
+    """Scores df with a model logged in the MLflow store.
+
+    The model is that of `run_id`, or of the latest `run_name` run whose
+    tags match `model_tags`. It is resolved and loaded once per process, so
+    a streamed data version only pays for it on the first chunk. Returns
+    `keep_cols` (all columns when null) with the predictions in
+    `prediction_col`.
+    """
+    model_run_id = resolve_model_run(
+        run_id, run_name, tuple(sorted((model_tags or {}).items())), tracking_uri
+    )
+    model = load_run_model(model_run_id, model_artifact_path, tracking_uri)
+    X = df[list(model.feature_names_in_)]
+    y_pred = predict_in_workers(model, X, n_workers)
+    df = df[keep_cols] if keep_cols else df
+    df = df.assign(**{prediction_col: y_pred})
+    logger.info(
+        "Done with batch_predict: %i rows scored by run %s", len(df), model_run_id
+    )
+    return df
@@ -1,7 +1,77 @@
+from __future__ import annotations
+
+import copy
+import re
 from typing import Any
 
+import numpy as np
 import pandas as pd
-from sklearn.inspection import permutation_importance
+from joblib import Parallel, delayed
+from sklearn.metrics import check_scoring
+from sklearn.utils import check_random_state
+
+PERMUTATION_SPLITS = ("train", "val")
+
+
+def group_features(
+    columns: list[str], group_pattern: str | None = None
+) -> dict[str, list[str]]:
+    """Feature families sharing the first capture group of `group_pattern`.
+
+    With `^(.+?)(?:_lag\\d+|_rolling\\d+.*)?$` a column, its lags and its
+    rolling aggregates form one family named after the column. Columns not
+    matching the pattern, and all columns without one, are their own group.
+    """
+    groups: dict[str, list[str]] = {}
+    for column in columns:
+        match = re.match(group_pattern, column) if group_pattern else None
+        groups.setdefault(match.group(1) if match else column, []).append(column)
+    return groups
+
+
+def stratified_sample(
+    X: pd.DataFrame,
+    y: pd.Series,
+    strata: pd.Series,
+    n_rows: int | None,
+    random_state: int = 42,
+) -> tuple[pd.DataFrame, pd.Series]:
+    """About `n_rows` rows of X and y, each stratum keeps its share of rows."""
+    if n_rows is None or n_rows >= len(X):
+        return X, y
+    sample = (
+        pd.Series(np.arange(len(X)), index=X.index)
+        .groupby(strata.to_numpy())
+        .sample(frac=n_rows / len(X), random_state=random_state)
+        .sort_values()
+        .to_numpy()
+    )
+    return X.iloc[sample], y.iloc[sample]
+
+
+def _permuted_scores(
+    model: Any,
+    X: pd.DataFrame,
+    y: pd.Series,
+    columns: list[str],
+    scorer: Any,
+    n_repeats: int,
+    seed: int,
+) -> np.ndarray:
+    # Same shuffles as sklearn's _calculate_permutation_scores: the row
+    # order is shuffled in place, so each repeat permutes the last one
+    rng = np.random.RandomState(seed)
+    X_permuted = X.copy()
+    col_idx = [X.columns.get_loc(c) for c in columns]
+    shuffling_idx = np.arange(len(X))
+    scores = np.empty(n_repeats)
+    for repeat in range(n_repeats):
+        rng.shuffle(shuffling_idx)
+        # One row order for the whole group keeps its columns consistent
+        shuffled = X_permuted.iloc[shuffling_idx, col_idx]
+        X_permuted[columns] = shuffled.set_axis(X.index)
+        scores[repeat] = scorer(model, X_permuted, y)
+    return scores
 
 
 def compute_permutation_importances(
@@ -9,6 +79,41 @@ def compute_permutation_importances(
     X: pd.DataFrame,
     y: pd.Series,
     random_state: int = 42,
-) -> dict[str, float]:
-    perm_res = permutation_importance(model, X, y, random_state=random_state)
-    return dict(zip(X.columns, perm_res.importances_mean))
+    n_repeats: int = 5,
+    n_jobs: int | None = None,
+    feature_groups: dict[str, list[str]] | None = None,
+    scoring: str | None = None,
+) -> pd.DataFrame:
+    """Mean and std of the score drop when a feature (group) is permuted.
+
+    The columns of each of `feature_groups` (default: one per column) are
+    permuted together, so correlated families are not masked by each
+    other. Groups are scored in `n_jobs` threads sharing the model (forest
+    and BLAS predictions release the GIL, a large forest is not copied to
+    worker processes), a shallow copy of the model then predicts
+    single-threaded. `scoring` defaults to the model's `score` (R2 for
+    regressors). Seeds and shuffles follow sklearn's permutation_importance,
+    without groups the results are identical to it.
+    """
+    feature_groups = feature_groups or {c: [c] for c in X.columns}
+    scorer = check_scoring(model, scoring=scoring)
+    baseline = scorer(model, X, y)
+    # sklearn draws one seed, every feature replays the same shuffles
+    seed = check_random_state(random_state).randint(np.iinfo(np.int32).max + 1)
+
+    if "n_jobs" in model.get_params() and n_jobs not in (None, 1):
+        model = copy.copy(model).set_params(n_jobs=1)
+    scores = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_permuted_scores)(model, X, y, columns, scorer, n_repeats, seed)
+        for columns in feature_groups.values()
+    )
+
+    drops = baseline - np.array(scores)
+    return pd.DataFrame(
+        {
+            "feature": list(feature_groups),
+            "importances": drops.mean(axis=1),
+            "importances_std": np.std(drops, axis=1),
+            "columns": [",".join(columns) for columns in feature_groups.values()],
+        }
+    )
@@ -0,0 +1,42 @@
+# dependencies/modeling/create_optuna_pruner.py
+import logging
+from typing import Any
+
+import optuna
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PRUNERS = ("none", "median", "successive_halving", "hyperband")
+
+
+def create_optuna_pruner(
+    pruner: dict[str, Any], max_resource: int
+) -> optuna.pruners.BasePruner:
+    """Builds the study pruner from `ml_experiments.pruner`.
+
+    Trials report their mean RMSE after every CV fold, so one fold is one
+    unit of resource and `cv_splits` is the maximum resource. Growing
+    forests report after every tree checkpoint instead, one tree is one
+    unit and the largest n_estimators is the maximum.
+    """
+    name = pruner.get("name", "none") or "none"
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    if name == "median":
+        return optuna.pruners.MedianPruner(
+            n_startup_trials=pruner.get("n_startup_trials", 5),
+            n_warmup_steps=pruner.get("n_warmup_steps", 1),
+        )
+    if name == "successive_halving":
+        return optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=pruner.get("min_resource", 1),
+            reduction_factor=pruner.get("reduction_factor", 3),
+        )
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(
+            min_resource=pruner.get("min_resource", 1),
+            max_resource=max_resource,
+            reduction_factor=pruner.get("reduction_factor", 3),
+        )
+    msg = f"Unsupported pruner '{name}'. Expected one of {SUPPORTED_PRUNERS}."
+    raise ValueError(msg)
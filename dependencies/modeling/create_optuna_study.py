@@ -0,0 +1,76 @@
+# dependencies/modeling/create_optuna_study.py
+from __future__ import annotations
+
+import logging
+import os
+
+import optuna
+from optuna.storages.journal import JournalFileBackend, JournalStorage
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_STUDY_STORAGES = ("memory", "sqlite", "journal")
+
+
+def create_study_storage(
+    study_name: str,
+    backend: str,
+    directory: str,
+) -> str | optuna.storages.BaseStorage | None:
+    """Storage for `optuna.create_study`, one file per study in `directory`.
+
+    `sqlite` uses `<study_name>.db`, `journal` Optuna's append-only
+    `<study_name>.log`, which tolerates concurrent writers from several
+    processes better than SQLite. `memory` keeps the study in the process.
+    """
+    if backend == "memory":
+        return None
+    if backend not in SUPPORTED_STUDY_STORAGES:
+        msg = (
+            f"Unsupported study storage '{backend}'. "
+            f"Expected one of {SUPPORTED_STUDY_STORAGES}."
+        )
+        raise ValueError(msg)
+
+    mkdir_if_not_exists(directory)
+    if backend == "sqlite":
+        return f"sqlite:///{os.path.join(directory, f'{study_name}.db')}"
+    return JournalStorage(
+        JournalFileBackend(os.path.join(directory, f"{study_name}.log")),
+    )
+
+
+def create_optuna_study(
+    study_name: str,
+    direction: str,
+    pruner: optuna.pruners.BasePruner,
+    storage: str | optuna.storages.BaseStorage | None,
+    directions: list[str] | None = None,
+    seed: int | None = None,
+) -> optuna.Study:
+    """Creates the study, or loads it when `storage` already holds it.
+
+    A persistent study resumes where an interrupted run stopped, trials
+    still marked RUNNING by a crashed process are left as they are and do
+    not count towards `n_trials`. `directions` (one per objective) makes it
+    a multi-objective study and replaces `direction`. A `seed` makes the
+    TPE sampler suggest the same sequence when the study is rerun.
+    """
+    study = optuna.create_study(
+        study_name=study_name,
+        direction=None if directions else direction,
+        directions=directions,
+        sampler=optuna.samplers.TPESampler(seed=seed) if seed is not None else None,
+        pruner=pruner,
+        storage=storage,
+        load_if_exists=storage is not None,
+    )
+    if study.trials:
+        logger.info(
+            "Loaded study '%s' with %i existing trials",
+            study_name,
+            len(study.trials),
+        )
+    return study
@@ -0,0 +1,98 @@
+# dependencies/modeling/cross_validate_folds.py
+from __future__ import annotations
+
+import logging
+import time
+
+import numpy as np
+import optuna
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import RegressorMixin, clone
+from sklearn.metrics import mean_squared_error, r2_score
+
+from dependencies.modeling.measure_model_cost import measure_model_cost
+
+logger = logging.getLogger(__name__)
+
+
+def _fit_fold(
+    model: RegressorMixin,
+    X: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+) -> tuple[RegressorMixin, dict[str, float]]:
+    fold_model = clone(model)
+    start = time.perf_counter()
+    fold_model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+
+    y_test = y[test_idx]
+    y_pred = fold_model.predict(X[test_idx])
+    return fold_model, {
+        "fit_time": fit_time,
+        "score_time": time.perf_counter() - start - fit_time,
+        "test_rmse": -np.sqrt(mean_squared_error(y_test, y_pred)),
+        "test_r2": r2_score(y_test, y_pred),
+    }
+
+
+def cross_validate_folds(
+    model: RegressorMixin,
+    X: np.ndarray,
+    y: np.ndarray,
+    cv_folds: list[tuple[np.ndarray, np.ndarray]],
+    trial: optuna.Trial | None = None,
+    n_jobs: int | None = None,
+    cost_sample: np.ndarray | None = None,
+) -> dict[str, np.ndarray | float]:
+    """Fits the folds and reports to the trial's pruner as they finish.
+
+    Models with an `n_jobs` parameter get `n_jobs` and fit the folds one
+    after another, so a forest still uses the cores the parallel folds would
+    have used. Other models (Ridge) fit `n_jobs` folds at a time in joblib
+    workers, like sklearn's cross_validate. After every round the mean RMSE
+    over the folds so far is passed to `trial.report` (step = number of
+    finished folds), and optuna.TrialPruned is raised when the pruner stops
+    the trial. The result has the keys and signs of sklearn's cross_validate
+    with the rmse/r2 scoring. With `cost_sample` the cost of the last fold's
+    model (the largest training window) is added, see measure_model_cost.
+    """
+    fold_jobs = 1
+    if "n_jobs" in model.get_params():
+        if n_jobs is not None:
+            model = clone(model).set_params(n_jobs=n_jobs)
+    elif n_jobs is not None:
+        fold_jobs = effective_n_jobs(n_jobs)
+
+    results: dict[str, list[float]] = {
+        "fit_time": [],
+        "score_time": [],
+        "test_rmse": [],
+        "test_r2": [],
+    }
+    with Parallel(n_jobs=fold_jobs) as parallel:
+        for first in range(0, len(cv_folds), fold_jobs):
+            fitted = parallel(
+                delayed(_fit_fold)(model, X, y, train_idx, test_idx)
+                for train_idx, test_idx in cv_folds[first : first + fold_jobs]
+            )
+            fold_model = fitted[-1][0]
+            for fold, (_, scores) in enumerate(fitted, start=first + 1):
+                for key, value in scores.items():
+                    results[key].append(value)
+                if trial is not None:
+                    trial.report(-np.mean(results["test_rmse"]), step=fold)
+
+            if trial is not None and trial.should_prune():
+                logger.info(
+                    "Trial %d pruned after fold %d of %d, RMSE=%.3f",
+                    trial.number,
+                    fold,
+                    len(cv_folds),
+                    -np.mean(results["test_rmse"]),
+                )
+                raise optuna.TrialPruned
+
+    costs = {} if cost_sample is None else measure_model_cost(fold_model, cost_sample)
+    return {**{key: np.asarray(values) for key, values in results.items()}, **costs}
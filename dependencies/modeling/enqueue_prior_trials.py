@@ -0,0 +1,120 @@
+# dependencies/modeling/enqueue_prior_trials.py
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import mlflow
+import optuna
+
+logger = logging.getLogger(__name__)
+
+# Training runs scanned per search, duplicates of a configuration are collapsed
+MAX_PRIOR_RUNS = 1000
+
+
+def _parse_param(value: str, spec: dict) -> Any:
+    """A logged param string as the value `spec` would suggest, None if invalid."""
+    p_type = spec.get("type")
+    parsed: float
+    try:
+        if p_type == "int":
+            parsed = int(float(value))
+        elif p_type == "float":
+            parsed = float(value)
+        elif p_type == "bool":
+            return {"True": True, "False": False}.get(value)
+        elif p_type == "categorical":
+            return next((v for v in spec["values"] if str(v) == value), None)
+        else:
+            return None
+    except ValueError:
+        return None
+    if not spec["low"] <= parsed <= spec["high"]:
+        return None
+    step = spec.get("step")
+    if p_type == "int" and step and (parsed - spec["low"]) % step:
+        return None
+    return parsed
+
+
+def find_prior_trial_params(
+    hyperparameters: dict,
+    model_tags: dict,
+    top_k: int,
+    match_data_version: bool = True,
+    exclude_experiment_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """Params of the `top_k` best distinct training runs in the MLflow store.
+
+    Searches every experiment for `training` runs with the same `model_tag`
+    (and `data_version_tag` when `match_data_version`), ranked by their
+    logged RMSE. Only the currently tuned hyperparameters are kept, values
+    outside their current range are dropped and left to the sampler.
+    """
+    filters = [
+        "tags.mlflow.runName = 'training'",
+        "params.training = 'True'",
+        f"tags.model_tag = '{model_tags['model_tag']}'",
+    ]
+    if match_data_version:
+        filters.append(f"tags.data_version_tag = '{model_tags['data_version_tag']}'")
+    runs = mlflow.search_runs(
+        search_all_experiments=True,
+        filter_string=" AND ".join(filters),
+        # rmse is logged rounded, r2 breaks its ties
+        order_by=["metrics.rmse ASC", "metrics.r2 DESC"],
+        max_results=MAX_PRIOR_RUNS,
+    )
+    if runs.empty:
+        return []
+    if exclude_experiment_id is not None:
+        runs = runs[runs["experiment_id"] != exclude_experiment_id]
+
+    tuned = {k: v for k, v in hyperparameters.items() if v.get("tune", False)}
+    prior_params: list[dict[str, Any]] = []
+    for _, run in runs.iterrows():
+        params = {}
+        for name, spec in tuned.items():
+            value = run.get(f"params.{name}")
+            if isinstance(value, str):
+                parsed = _parse_param(value, spec)
+                if parsed is not None:
+                    params[name] = parsed
+        if params and params not in prior_params:
+            prior_params.append(params)
+        if len(prior_params) == top_k:
+            break
+    return prior_params
+
+
+def enqueue_prior_trials(
+    study: optuna.Study,
+    hyperparameters: dict,
+    model_tags: dict,
+    top_k: int,
+    match_data_version: bool = True,
+    exclude_experiment_id: str | None = None,
+) -> int:
+    """Enqueues the best prior params, the study evaluates them first.
+
+    Returns the number of enqueued parameter sets. Sets the study already
+    holds (a resumed study) are skipped.
+    """
+    if top_k <= 0:
+        return 0
+    prior_params = find_prior_trial_params(
+        hyperparameters,
+        model_tags,
+        top_k,
+        match_data_version=match_data_version,
+        exclude_experiment_id=exclude_experiment_id,
+    )
+    for params in prior_params:
+        study.enqueue_trial(params, skip_if_exists=True)
+    logger.info(
+        "Enqueued %i prior parameter sets into study '%s'",
+        len(prior_params),
+        study.study_name,
+    )
+    return len(prior_params)
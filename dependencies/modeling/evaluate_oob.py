@@ -0,0 +1,53 @@
+# dependencies/modeling/evaluate_oob.py
+from __future__ import annotations
+
+import logging
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+
+from dependencies.modeling.measure_model_cost import measure_model_cost
+
+logger = logging.getLogger(__name__)
+
+
+def score_oob(model: RandomForestRegressor, y: np.ndarray) -> dict[str, float]:
+    """OOB RMSE, R2 and scored row count of a forest fitted with oob_score."""
+    oob_prediction = np.ravel(model.oob_prediction_)
+    scored = ~np.isnan(oob_prediction)
+    oob_rmse = float(np.sqrt(np.mean(np.square(y[scored] - oob_prediction[scored]))))
+    return {
+        "oob_rmse": oob_rmse,
+        "oob_r2": float(model.oob_score_),
+        "oob_rows": int(scored.sum()),
+    }
+
+
+def evaluate_oob(
+    model: RandomForestRegressor,
+    X: np.ndarray,
+    y: np.ndarray,
+    n_jobs: int | None = None,
+    cost_sample: np.ndarray | None = None,
+) -> dict[str, float]:
+    """Fits one forest on all of X and scores it on its out-of-bag rows.
+
+    Bootstrapping and the OOB estimate are switched on whatever the sampled
+    params say. Rows that ended up in every bootstrap sample have no OOB
+    prediction and are left out of the RMSE. The OOB rows are drawn at
+    random, not after the training rows in time like the TimeSeriesSplit
+    folds, so the estimate can be optimistic for temporal drift. With
+    `cost_sample` the forest's measure_model_cost is added.
+    """
+    model = clone(model).set_params(bootstrap=True, oob_score=True)
+    if n_jobs is not None:
+        model.set_params(n_jobs=n_jobs)
+
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_time = time.perf_counter() - start
+
+    costs = {} if cost_sample is None else measure_model_cost(model, cost_sample)
+    return {**score_oob(model, y), "fit_time": fit_time, **costs}
@@ -0,0 +1,154 @@
+# dependencies/modeling/grow_forest.py
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import threading
+import time
+from typing import Any
+
+import numpy as np
+import optuna
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error, r2_score
+
+from dependencies.modeling.evaluate_oob import score_oob
+from dependencies.modeling.measure_model_cost import measure_model_cost
+
+logger = logging.getLogger(__name__)
+
+
+def tree_checkpoints(n_estimators: int, checkpoint_step: int) -> list[int]:
+    """Tree counts at which a growing forest is scored, ending at n_estimators."""
+    return sorted(
+        {*range(checkpoint_step, n_estimators, checkpoint_step), n_estimators}
+    )
+
+
+class ForestCurveCache:
+    """Scores of grown forests by tree count, shared by the trials of one study.
+
+    With a fixed integer random_state a forest of k trees is exactly the
+    first k trees of any larger forest with the same params, so a trial
+    whose params and n_estimators match a checkpoint that an earlier trial
+    already scored gets the stored result instead of fitting.
+    """
+
+    def __init__(self) -> None:
+        self._curves: dict[str, dict[int, dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: RandomForestRegressor, mode: str) -> str:
+        """All params that change the trees, n_estimators excluded."""
+        params = model.get_params()
+        for name in ("n_estimators", "n_jobs", "verbose", "warm_start"):
+            params.pop(name)
+        return json.dumps({"mode": mode, **params}, sort_keys=True, default=str)
+
+    def get(self, key: str, n_trees: int) -> dict[str, Any] | None:
+        with self._lock:
+            results = self._curves.get(key, {}).get(n_trees)
+        return copy.deepcopy(results)
+
+    def put(self, key: str, n_trees: int, results: dict[str, Any]) -> None:
+        with self._lock:
+            self._curves.setdefault(key, {})[n_trees] = copy.deepcopy(results)
+
+
+def grow_forest(
+    model: RandomForestRegressor,
+    X: np.ndarray,
+    y: np.ndarray,
+    checkpoint_step: int,
+    cv_folds: list[tuple[np.ndarray, np.ndarray]] | None = None,
+    trial: optuna.Trial | None = None,
+    n_jobs: int | None = None,
+    curve_cache: ForestCurveCache | None = None,
+    cost_sample: np.ndarray | None = None,
+) -> dict[str, Any]:
+    """Grows the forest with warm_start and scores it at tree checkpoints.
+
+    With `cv_folds` one forest per fold grows in lockstep and the mean test
+    RMSE is the checkpoint score, the result has the keys of
+    cross_validate_folds. Without folds a single forest is scored out of
+    bag and the result has the keys of evaluate_oob. After every checkpoint
+    the score is reported to the trial with the tree count as step, and
+    optuna.TrialPruned is raised when the pruner stops the trial. With
+    `cost_sample` every checkpoint's result (and cache entry) holds the
+    measure_model_cost of the last fold's forest.
+    """
+    mode = "oob" if cv_folds is None else "cv"
+    n_estimators = model.get_params()["n_estimators"]
+    # In cv mode the OOB estimate is unused, and sklearn would recompute it
+    # over all trees at every checkpoint
+    model = clone(model).set_params(warm_start=True, oob_score=mode == "oob")
+    if mode == "oob":
+        model.set_params(bootstrap=True)
+    if n_jobs is not None:
+        model.set_params(n_jobs=n_jobs)
+
+    # Only forests with a fixed seed are prefixes of each other
+    if not isinstance(model.random_state, int):
+        curve_cache = None
+    cache_key = ForestCurveCache.key(model, mode)
+    if curve_cache is not None:
+        cached = curve_cache.get(cache_key, n_estimators)
+        if cached is not None and (cost_sample is None or "model_size_mb" in cached):
+            logger.debug("Reusing the scores of a forest of %i trees", n_estimators)
+            return cached
+
+    # The OOB forest trains on all rows and has no test fold
+    folds: list[tuple[Any, Any]] = (
+        [(slice(None), None)] if cv_folds is None else list(cv_folds)
+    )
+    forests = [clone(model) for _ in folds]
+    fit_time = np.zeros(len(folds))
+    score_time = np.zeros(len(folds))
+    test_rmse = np.zeros(len(folds))
+    test_r2 = np.zeros(len(folds))
+    for n_trees in tree_checkpoints(n_estimators, checkpoint_step):
+        for i, (forest, (train_idx, test_idx)) in enumerate(zip(forests, folds)):
+            forest.set_params(n_estimators=n_trees)
+            start = time.perf_counter()
+            forest.fit(X[train_idx], y[train_idx])
+            fit_time[i] += time.perf_counter() - start
+            if test_idx is None:
+                continue
+            start = time.perf_counter()
+            y_pred = forest.predict(X[test_idx])
+            score_time[i] += time.perf_counter() - start
+            test_rmse[i] = np.sqrt(mean_squared_error(y[test_idx], y_pred))
+            test_r2[i] = r2_score(y[test_idx], y_pred)
+
+        results: dict[str, Any]
+        if mode == "oob":
+            results = {**score_oob(forests[0], y), "fit_time": float(fit_time[0])}
+            score = results["oob_rmse"]
+        else:
+            results = {
+                "fit_time": fit_time.copy(),
+                "score_time": score_time.copy(),
+                "test_rmse": -test_rmse,
+                "test_r2": test_r2.copy(),
+            }
+            score = float(np.mean(test_rmse))
+        if cost_sample is not None:
+            results.update(measure_model_cost(forests[-1], cost_sample))
+        if curve_cache is not None:
+            curve_cache.put(cache_key, n_trees, results)
+
+        if trial is not None:
+            trial.report(score, step=n_trees)
+            if trial.should_prune():
+                logger.info(
+                    "Trial %d pruned at %d of %d trees, RMSE=%.3f",
+                    trial.number,
+                    n_trees,
+                    n_estimators,
+                    score,
+                )
+                raise optuna.TrialPruned
+    return results
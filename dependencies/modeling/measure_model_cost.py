@@ -0,0 +1,62 @@
+# dependencies/modeling/measure_model_cost.py
+from __future__ import annotations
+
+import logging
+import pickle
+import time
+
+import numpy as np
+from sklearn.base import RegressorMixin
+from sklearn.tree._tree import NODE_DTYPE, Tree
+
+logger = logging.getLogger(__name__)
+
+COST_SAMPLE_ROWS = 1000
+PREDICT_REPEATS = 3
+
+
+def _tree_nbytes(tree: Tree) -> int:
+    return tree.node_count * NODE_DTYPE.itemsize + tree.value.nbytes
+
+
+def estimate_model_size(model: RegressorMixin) -> int:
+    """Bytes of the pickled model, without pickling a fitted tree ensemble.
+
+    A tree pickles its node and value arrays, their sizes summed over the
+    trees are within a fraction of a percent of the pickled forest. Other
+    models (Ridge) are small and pickled.
+    """
+    if hasattr(model, "tree_"):
+        return _tree_nbytes(model.tree_)
+    estimators = getattr(model, "estimators_", None)
+    if estimators is not None and all(hasattr(e, "tree_") for e in estimators):
+        return sum(_tree_nbytes(e.tree_) for e in estimators)
+    return len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def measure_model_cost(model: RegressorMixin, X_sample: np.ndarray) -> dict[str, float]:
+    """Predict latency and serialized size of a fitted model.
+
+    The latency is the fastest of PREDICT_REPEATS single-threaded predictions
+    of `X_sample`, in milliseconds per 1000 rows, so it does not depend on the
+    cores a trial happened to get. The size is that of the pickled model,
+    estimated for tree ensembles (see estimate_model_size).
+    """
+    params = model.get_params()
+    n_jobs = params.get("n_jobs")
+    if "n_jobs" in params:
+        model.set_params(n_jobs=1)
+    try:
+        timings = []
+        for _ in range(PREDICT_REPEATS):
+            start = time.perf_counter()
+            model.predict(X_sample)
+            timings.append(time.perf_counter() - start)
+    finally:
+        if "n_jobs" in params:
+            model.set_params(n_jobs=n_jobs)
+    model_size = estimate_model_size(model)
+    return {
+        "predict_ms_per_1k_rows": min(timings) * 1e6 / len(X_sample),
+        "model_size_mb": model_size / 1e6,
+    }
@@ -33,7 +33,7 @@ def optuna_random_search_util(
                         param_name,
                         low,
                         high,
-                        step,
+                        step=step,
                     )
                 else:
                     final_params[param_name] = trial.suggest_int(param_name, low, high)
@@ -46,7 +46,7 @@ def optuna_random_search_util(
                             param_name,
                             low,
                             high,
-                            step,
+                            step=step,
                             log=True,
                         )
                     else:
@@ -54,7 +54,7 @@ def optuna_random_search_util(
                             param_name,
                             low,
                             high,
-                            step,
+                            step=step,
                         )
                 elif log:
                     final_params[param_name] = trial.suggest_float(
@@ -0,0 +1,176 @@
+# dependencies/modeling/plan_resources.py
+from __future__ import annotations
+
+import logging
+import math
+import os
+from dataclasses import asdict, dataclass
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read_cgroup_file(*parts: str) -> str | None:
+    try:
+        with open(os.path.join(CGROUP_ROOT, *parts)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def detect_cpu_quota() -> float | None:
+    """CPUs the cgroup (container) may use, None without a quota.
+
+    Reads `cpu.max` (cgroup v2) or `cpu.cfs_quota_us` / `cpu.cfs_period_us`
+    (cgroup v1), e.g. `docker run --cpus 2.5` gives 2.5.
+    """
+    cpu_max = _read_cgroup_file("cpu.max")
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            return int(quota) / int(period)
+        return None
+    quota_us = _read_cgroup_file("cpu", "cpu.cfs_quota_us")
+    period_us = _read_cgroup_file("cpu", "cpu.cfs_period_us")
+    if quota_us and period_us and int(quota_us) > 0:
+        return int(quota_us) / int(period_us)
+    return None
+
+
+def detect_available_cores() -> int:
+    """Cores this process may run on: its CPU affinity, capped by the quota."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    quota = detect_cpu_quota()
+    if quota is not None:
+        cores = min(cores, max(1, math.floor(quota)))
+    return cores
+
+
+def detect_available_memory() -> int | None:
+    """Bytes of memory available to this process, None if unknown.
+
+    The smaller of the host's available memory (psutil) and what is left of
+    the cgroup memory limit.
+    """
+    candidates = []
+    if HAS_PSUTIL:
+        candidates.append(psutil.virtual_memory().available)
+    for limit_file, usage_file in (
+        (("memory.max",), ("memory.current",)),
+        (
+            ("memory", "memory.limit_in_bytes"),
+            ("memory", "memory.usage_in_bytes"),
+        ),
+    ):
+        limit = _read_cgroup_file(*limit_file)
+        usage = _read_cgroup_file(*usage_file)
+        if limit and usage and limit.isdigit() and usage.isdigit():
+            candidates.append(max(0, int(limit) - int(usage)))
+            break
+    return min(candidates) if candidates else None
+
+
+@dataclass
+class ResourcePlan:
+    """Workers per phase of a study, fitting the core and memory budget.
+
+    The study phase runs `n_workers_study` processes with `n_jobs_study`
+    trial threads each, every trial fitting with `n_jobs_cv` jobs, and
+    native (BLAS/OpenMP) pools limited to `native_threads_study` threads.
+    The final model then fits alone with `n_jobs_final_model` jobs and
+    `native_threads_final` native threads.
+    """
+
+    total_cores: int
+    cpu_quota: float | None
+    available_memory_bytes: int | None
+    n_workers_study: int
+    n_jobs_study: int
+    n_jobs_cv: int
+    n_jobs_final_model: int
+    native_threads_study: int
+    native_threads_final: int
+
+    def as_params(self) -> dict[str, int | float | None]:
+        return {f"resource_{k}": v for k, v in asdict(self).items()}
+
+
+def _fit(requested: int, available: int, name: str) -> int:
+    """-1 takes all of `available`, larger requests are scaled down."""
+    if requested == -1:
+        return available
+    if requested > available:
+        logger.warning(
+            "Reducing %s from %i to %i to fit the available resources",
+            name,
+            requested,
+            available,
+        )
+        return available
+    return max(1, requested)
+
+
+def plan_resources(
+    n_jobs_cv: int,
+    n_jobs_study: int,
+    n_jobs_final_model: int = -1,
+    n_workers: int = 1,
+    total_cores: int | None = None,
+    memory_per_worker_gb: float | None = None,
+) -> ResourcePlan:
+    """Splits the core budget between the study, CV and final-model phases.
+
+    `total_cores` (None or -1: all available) is capped by the CPU affinity
+    and cgroup quota. Requested values of -1 take what is left, explicit
+    values are kept unless they oversubscribe the budget, then they are
+    reduced (inner CV jobs first) with a warning instead of an error. With
+    `memory_per_worker_gb` the worker processes are capped by the available
+    memory as well. If both n_jobs_study and n_jobs_cv are -1 the cores go
+    to CV, trials then run one after another. Cores left over per job go to
+    the native thread pools, e.g. BLAS inside Ridge, whose final model fits
+    with n_jobs_final_model=1 and all cores as BLAS threads.
+    """
+    available = detect_available_cores()
+    if total_cores is None or total_cores == -1:
+        budget = available
+    else:
+        budget = _fit(total_cores, available, "total_cores")
+    available_memory = detect_available_memory()
+
+    workers = _fit(n_workers, budget, "n_workers_study")
+    if memory_per_worker_gb and available_memory is not None:
+        memory_workers = max(1, int(available_memory // (memory_per_worker_gb * 1e9)))
+        workers = _fit(workers, memory_workers, "n_workers_study")
+    per_worker = budget // workers
+
+    if n_jobs_study == -1:
+        n_study = 1 if n_jobs_cv == -1 else max(1, per_worker // max(1, n_jobs_cv))
+    else:
+        n_study = _fit(n_jobs_study, per_worker, "n_jobs_study")
+    n_cv = _fit(n_jobs_cv, max(1, per_worker // n_study), "n_jobs_cv")
+    n_final = _fit(n_jobs_final_model, budget, "n_jobs_final_model")
+
+    plan = ResourcePlan(
+        total_cores=budget,
+        cpu_quota=detect_cpu_quota(),
+        available_memory_bytes=available_memory,
+        n_workers_study=workers,
+        n_jobs_study=n_study,
+        n_jobs_cv=n_cv,
+        n_jobs_final_model=n_final,
+        native_threads_study=max(1, per_worker // (n_study * n_cv)),
+        native_threads_final=max(1, budget // n_final),
+    )
+    logger.info("Resource plan: %s", plan)
+    return plan
@@ -0,0 +1,146 @@
+# dependencies/modeling/prepared_dataset.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import TimeSeriesSplit
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+
+logger = logging.getLogger(__name__)
+
+PARTITIONS = ("train", "val", "test")
+PREPARED_DATASET_MANIFEST = "prepared_dataset.json"
+
+
+@dataclass
+class PreparedDataset:
+    """Train/val/test partitions as C-contiguous arrays plus the CV folds.
+
+    `cv_folds` holds the (train_idx, test_idx) pairs of the TimeSeriesSplit
+    over the training partition. They only depend on the number of training
+    rows, so they are computed once per study and passed as `cv` to every
+    trial.
+    """
+
+    feature_cols: list[str]
+    X_train: np.ndarray
+    y_train: np.ndarray
+    X_val: np.ndarray
+    y_val: np.ndarray
+    X_test: np.ndarray
+    y_test: np.ndarray
+    cv_folds: list[tuple[np.ndarray, np.ndarray]]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [getattr(self, f"{xy}_{p}") for p in PARTITIONS for xy in "Xy"]
+        arrays += [idx for fold in self.cv_folds for idx in fold]
+        return sum(a.nbytes for a in arrays)
+
+
+def partition_frame(
+    df: pd.DataFrame,
+    year_col: str,
+    year_range: tuple[int, int],
+) -> pd.DataFrame:
+    return df[(df[year_col] >= year_range[0]) & (df[year_col] <= year_range[1])]
+
+
+def _to_contiguous(frame: pd.DataFrame | pd.Series, dtype: str) -> np.ndarray:
+    return np.ascontiguousarray(frame.to_numpy(dtype=dtype, na_value=np.nan))
+
+
+def prepare_dataset(
+    df: pd.DataFrame,
+    feature_cols: list[str],
+    target_col: str,
+    year_col: str,
+    train_range: tuple[int, int],
+    val_range: tuple[int, int],
+    test_range: tuple[int, int],
+    cv_splits: int,
+    dtype: str = "float64",
+    memmap_dir: str | None = None,
+) -> PreparedDataset:
+    """Converts the year partitions of df once for all trials of a study.
+
+    Features are cast to `dtype` (float32 matches what RandomForestRegressor
+    converts to internally, so its fits are unchanged), the target stays
+    float64. With `memmap_dir` the arrays are saved there and reopened as
+    read-only memory maps, so worker processes share the pages instead of
+    receiving pickled copies.
+    """
+    arrays = {}
+    for partition, year_range in zip(PARTITIONS, (train_range, val_range, test_range)):
+        part = partition_frame(df, year_col, year_range)
+        arrays[f"X_{partition}"] = _to_contiguous(part[feature_cols], dtype)
+        arrays[f"y_{partition}"] = _to_contiguous(part[target_col], "float64")
+
+    cv_folds = list(TimeSeriesSplit(n_splits=cv_splits).split(arrays["X_train"]))
+    prepared = PreparedDataset(
+        feature_cols=list(feature_cols),
+        cv_folds=cv_folds,
+        **arrays,
+    )
+    logger.info(
+        "Prepared %s arrays: %i train, %i val, %i test rows, %i features, "
+        "%i folds, %.1f MB",
+        dtype,
+        len(prepared.X_train),
+        len(prepared.X_val),
+        len(prepared.X_test),
+        len(feature_cols),
+        cv_splits,
+        prepared.nbytes / 1e6,
+    )
+    if memmap_dir:
+        save_prepared_dataset(prepared, memmap_dir)
+        prepared = load_prepared_dataset(memmap_dir, mmap_mode="r")
+    return prepared
+
+
+def save_prepared_dataset(prepared: PreparedDataset, output_dir: str) -> None:
+    mkdir_if_not_exists(output_dir)
+    for partition in PARTITIONS:
+        for xy in "Xy":
+            name = f"{xy}_{partition}"
+            np.save(os.path.join(output_dir, f"{name}.npy"), getattr(prepared, name))
+    for i, (train_idx, test_idx) in enumerate(prepared.cv_folds):
+        np.save(os.path.join(output_dir, f"fold{i}_train_idx.npy"), train_idx)
+        np.save(os.path.join(output_dir, f"fold{i}_test_idx.npy"), test_idx)
+    manifest = {
+        "feature_cols": prepared.feature_cols,
+        "n_folds": len(prepared.cv_folds),
+    }
+    with open(os.path.join(output_dir, PREPARED_DATASET_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=4)
+    logger.info("Saved prepared dataset to %s", output_dir)
+
+
+def load_prepared_dataset(
+    input_dir: str,
+    mmap_mode: str | None = "r",
+) -> PreparedDataset:
+    with open(os.path.join(input_dir, PREPARED_DATASET_MANIFEST)) as f:
+        manifest = json.load(f)
+
+    def load(name: str) -> np.ndarray:
+        return np.load(os.path.join(input_dir, f"{name}.npy"), mmap_mode=mmap_mode)
+
+    cv_folds = [
+        (load(f"fold{i}_train_idx"), load(f"fold{i}_test_idx"))
+        for i in range(manifest["n_folds"])
+    ]
+    arrays = {f"{xy}_{p}": load(f"{xy}_{p}") for p in PARTITIONS for xy in "Xy"}
+    logger.debug("Loaded prepared dataset from %s (mmap_mode=%s)", input_dir, mmap_mode)
+    return PreparedDataset(
+        feature_cols=manifest["feature_cols"],
+        cv_folds=cv_folds,
+        **arrays,
+    )
@@ -1,30 +1,73 @@
 # dependencies/modeling/rf_optuna_trial.py
+from __future__ import annotations
+
 import logging
 import os
+import time
 from dataclasses import dataclass
 from math import sqrt
+from operator import attrgetter
 from typing import Any
 
 import mlflow
 import numpy as np
 import optuna
 import pandas as pd
-from mlflow.data.pandas_dataset import PandasDataset
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-from sklearn.model_selection import TimeSeriesSplit, cross_validate
+from threadpoolctl import threadpool_limits
 
 from dependencies.logging_utils.calculate_and_log_importances_as_artifact import (
     calculate_and_log_importances_as_artifact,
 )
+from dependencies.logging_utils.log_predictions_as_artifact import (
+    log_predictions_as_artifact,
+)
+from dependencies.logging_utils.mlflow_batch_logger import (
+    MlflowBatchLogger,
+    RunRecord,
+)
+from dependencies.logging_utils.mlflow_dataset_registry import (
+    MlflowDatasetRegistry,
+    RegisteredDataset,
+    datasets_record,
+)
+from dependencies.modeling.compute_permutation_importances import (
+    PERMUTATION_SPLITS,
+)
+from dependencies.modeling.create_optuna_pruner import create_optuna_pruner
+from dependencies.modeling.create_optuna_study import (
+    create_optuna_study,
+    create_study_storage,
+)
+from dependencies.modeling.cross_validate_folds import cross_validate_folds
+from dependencies.modeling.enqueue_prior_trials import enqueue_prior_trials
+from dependencies.modeling.evaluate_oob import evaluate_oob
+from dependencies.modeling.grow_forest import ForestCurveCache, grow_forest
+from dependencies.modeling.measure_model_cost import (
+    COST_SAMPLE_ROWS,
+    measure_model_cost,
+)
 from dependencies.modeling.optuna_random_search_util import optuna_random_search_util
+from dependencies.modeling.plan_resources import plan_resources
+from dependencies.modeling.prepared_dataset import prepare_dataset
 from dependencies.modeling.rf_sklearn_instantiate_rfr_class import (
     rf_sklearn_instantiate_rfr_class,
 )
-from dependencies.modeling.validate_parallelism import validate_parallelism
+from dependencies.modeling.run_optuna_study import run_optuna_study
+from dependencies.modeling.select_study_trial import (
+    cost_constraints,
+    feasible_trials,
+    pareto_front_frame,
+    select_study_trial,
+    validate_study_mode,
+)
+from dependencies.modeling.trial_result_cache import TrialResultCache
 
 logger = logging.getLogger(__name__)
 
+OBJECTIVE_MODES = ("cv", "oob")
+
 
 @dataclass
 class RfOptunaTrialConfig:
@@ -34,6 +77,7 @@ class RfOptunaTrialConfig:
     val_range: tuple[int, int]
     test_range: tuple[int, int]
     experiment_name: str
+    study_name: str | None
     cv_splits: int
     n_trials: int
     top_n_importances: int
@@ -46,6 +90,26 @@ class RfOptunaTrialConfig:
     n_jobs_final_model: int
     random_state: int
     model_tags: Any
+    cv_dtype: str
+    prepared_data_dir: str | None
+    pruner: dict
+    study_storage: dict
+    n_workers_study: int
+    mlflow_logging: dict
+    mlflow_dataset_registry: dict
+    objective_mode: str
+    oob_verify_top_k: int
+    tree_checkpoint_step: int | None
+    resources: dict
+    study_mode: str
+    cost_objectives: list[str]
+    cost_limits: dict
+    pareto_pick: str
+    pareto_rmse_tolerance: float
+    trial_result_cache: dict
+    prior_trials: dict
+    prediction_key_cols: list[str]
+    permutation_importance: dict
 
 
 def rf_optuna_trial(
@@ -68,11 +132,94 @@ def rf_optuna_trial(
     n_jobs_final_model: int,
     random_state: int,
     model_tags: Any,
+    cv_dtype: str = "float64",
+    prepared_data_dir: str | None = None,
+    pruner: dict | None = None,
+    study_storage: dict | None = None,
+    n_workers_study: int = 1,
+    mlflow_logging: dict | None = None,
+    mlflow_dataset_registry: dict | None = None,
+    objective_mode: str = "cv",
+    oob_verify_top_k: int = 0,
+    tree_checkpoint_step: int | None = None,
+    resources: dict | None = None,
+    study_mode: str = "single",
+    cost_objectives: list[str] | None = None,
+    cost_limits: dict | None = None,
+    pareto_pick: str = "knee",
+    pareto_rmse_tolerance: float = 0.02,
+    trial_result_cache: dict | None = None,
+    prior_trials: dict | None = None,
+    prediction_key_cols: list[str] | None = None,
+    permutation_importance: dict | None = None,
+    study_name: str | None = None,
 ) -> None:
     """Minimal version using MLflow's default local './mlruns' directory.
     We do not use any output/experiment paths from the config.
+
+    `objective_mode: cv` scores every trial with the TimeSeriesSplit folds,
+    `oob` fits one forest per trial and scores its out-of-bag RMSE. The
+    `oob_verify_top_k` best OOB trials are then cross-validated and the best
+    of them by CV RMSE is used for the final model.
+
+    With `tree_checkpoint_step` each trial's forests grow with warm_start
+    and are scored every `tree_checkpoint_step` trees, the pruner sees the
+    curve over tree counts. Trees are seeded with `random_state`, so a
+    trial matching an already scored smaller forest is not fitted again.
+
+    Every trial also measures the mean fold fit time, the predict latency
+    and the pickled size of its last fold's model. `study_mode: single`
+    minimizes RMSE, `constrained` minimizes it within `cost_limits` and
+    `multi_objective` minimizes RMSE and `cost_objectives` together. The
+    final model then takes the trial chosen by select_study_trial.
+
+    With `trial_result_cache.file_path` evaluated configurations are stored
+    in a TrialResultCache, trials repeating one (in this or an earlier
+    study on the same data) return its scores without fitting and are
+    tagged `cached` in MLflow.
+
+    `prior_trials.top_k` enqueues the best params of earlier experiments'
+    training runs with the same model (and data version), see
+    enqueue_prior_trials.
+
+    The final model's val and test predictions are logged with their
+    `prediction_key_cols` as Parquet artifacts, see
+    log_predictions_as_artifact. Its permutation importances are computed
+    as set by `permutation_importance` (split, repeats, threads, a row
+    sample stratified by year and grouped feature families).
+
+    The Optuna study and its storage file are keyed on `study_name`
+    (default: the data version and model tags), so a rerun on the same data
+    resumes the study while each run logs to its own `experiment_name`.
     """
-    validate_parallelism(n_jobs_cv=n_jobs_cv, n_jobs_study=n_jobs_study)
+    permutation_importance = permutation_importance or {}
+    permutation_split = permutation_importance.get("split", "train")
+    if permutation_split not in PERMUTATION_SPLITS:
+        msg = (
+            f"Unsupported permutation_importance.split '{permutation_split}'. "
+            f"Expected one of {PERMUTATION_SPLITS}."
+        )
+        raise ValueError(msg)
+    if objective_mode not in OBJECTIVE_MODES:
+        msg = (
+            f"Unsupported objective_mode '{objective_mode}'. "
+            f"Expected one of {OBJECTIVE_MODES}."
+        )
+        raise ValueError(msg)
+    cost_objectives = list(cost_objectives or ["predict_ms_per_1k_rows"])
+    cost_limits = dict(cost_limits or {})
+    validate_study_mode(study_mode, cost_objectives, cost_limits, pareto_pick)
+    multi_objective = study_mode == "multi_objective"
+    plan = plan_resources(
+        n_jobs_cv=n_jobs_cv,
+        n_jobs_study=n_jobs_study,
+        n_jobs_final_model=n_jobs_final_model,
+        n_workers=n_workers_study,
+        **(resources or {}),
+    )
+    n_jobs_cv, n_jobs_study = plan.n_jobs_cv, plan.n_jobs_study
+    n_workers_study = plan.n_workers_study
+    n_jobs_final_model = plan.n_jobs_final_model
     logger.info("Starting rf_optuna_trial with %i trials to run", n_trials)
 
     # Always use the default local mlruns folder
@@ -82,15 +229,28 @@ def rf_optuna_trial(
     existing = mlflow.get_experiment_by_name(experiment_name)
     if existing is None:
         experiment_id = mlflow.create_experiment(experiment_name)
+    else:
+        experiment_id = existing.experiment_id
 
     if "index" in df.columns:
         feature_cols = [c for c in df.columns if c not in [target_col, "index"]]
     else:
         feature_cols = [c for c in df.columns if c != target_col]
-
-    dataset: PandasDataset = mlflow.data.from_pandas(
-        df, source=model_tags.get("input_file_path", "")
+    # Row identifiers stored next to the logged val/test predictions
+    key_cols = list(dict.fromkeys([*(prediction_key_cols or []), year_col]))
+    missing_key_cols = [c for c in key_cols if c not in df.columns]
+    if missing_key_cols:
+        logger.warning("Prediction key columns %s not in df", missing_key_cols)
+        key_cols = [c for c in key_cols if c in df.columns]
+
+    # Digests and schemas are computed once, every trial run reuses them
+    mlflow_dataset_registry = mlflow_dataset_registry or {}
+    registry = MlflowDatasetRegistry(
+        source=model_tags.get("input_file_path", ""),
+        registry_file_path=mlflow_dataset_registry.get("file_path"),
+        df_hash_n_jobs=mlflow_dataset_registry.get("df_hash_n_jobs", 1),
     )
+    dataset = registry.register(df)
 
     def partition_data() -> dict[str, pd.DataFrame]:
         df_train = df[
@@ -104,8 +264,10 @@ def rf_optuna_trial(
             "y_train": df_train[target_col],
             "X_val": df_val[feature_cols],
             "y_val": df_val[target_col],
+            "keys_val": df_val[key_cols],
             "X_test": df_test[feature_cols],
             "y_test": df_test[target_col],
+            "keys_test": df_test[key_cols],
         }
 
     data_part = partition_data()
@@ -113,62 +275,178 @@ def rf_optuna_trial(
     X_val, y_val = data_part["X_val"], data_part["y_val"]
     X_test, y_test = data_part["X_test"], data_part["y_test"]
 
-    X_train_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(X_train))
-    y_train_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(y_train))
-    X_val_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(X_val))
-    y_val_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(y_val))
-    X_test_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(X_test))
-    y_test_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(y_test))
+    # Converted once per study, every trial cross-validates on these arrays
+    prepared = prepare_dataset(
+        df,
+        feature_cols=feature_cols,
+        target_col=target_col,
+        year_col=year_col,
+        train_range=train_range,
+        val_range=val_range,
+        test_range=test_range,
+        cv_splits=cv_splits,
+        dtype=cv_dtype,
+        memmap_dir=prepared_data_dir,
+    )
 
-    def objective(trial: optuna.Trial) -> float:
-        # sample hyperparams from config
-        final_params = optuna_random_search_util(trial, hyperparameters)
-        # instantiate with rfr_options
-        model = rf_sklearn_instantiate_rfr_class(final_params, rfr_options)
+    def register_split(
+        split: str,
+        frame: pd.DataFrame | pd.Series,
+        year_range: tuple[int, int],
+    ) -> RegisteredDataset:
+        frame = pd.DataFrame(frame)
+        return registry.register_split(
+            dataset,
+            frame,
+            name=split,
+            split={
+                "year_col": year_col,
+                "year_range": list(year_range),
+                "columns": list(frame.columns),
+            },
+        )
 
-        cv_obj = TimeSeriesSplit(n_splits=cv_splits)
-        scoring = {"rmse": "neg_root_mean_squared_error", "r2": "r2"}
-        results = cross_validate(
+    X_train_dataset = register_split("X_train", X_train, train_range)
+    y_train_dataset = register_split("y_train", y_train, train_range)
+    X_val_dataset = register_split("X_val", X_val, val_range)
+    y_val_dataset = register_split("y_val", y_val, val_range)
+    X_test_dataset = register_split("X_test", X_test, test_range)
+    y_test_dataset = register_split("y_test", y_test, test_range)
+    registry.save()
+    curve_cache = ForestCurveCache()
+    cost_sample = prepared.X_train[:COST_SAMPLE_ROWS]
+
+    # Trial results persist across reruns on the same data and CV setup
+    trial_result_cache = trial_result_cache or {}
+    result_cache = (
+        TrialResultCache(trial_result_cache["file_path"])
+        if trial_result_cache.get("file_path")
+        else None
+    )
+    data_key = f"{X_train_dataset.registry_key}:{y_train_dataset.registry_key}"
+    cv_spec = {
+        "objective_mode": objective_mode,
+        "cv_splits": cv_splits,
+        "cv_dtype": cv_dtype,
+        "cost_sample_rows": COST_SAMPLE_ROWS,
+    }
+
+    def evaluate_trial(
+        model: RandomForestRegressor, trial: optuna.Trial | None
+    ) -> dict[str, Any]:
+        if tree_checkpoint_step:
+            return grow_forest(
+                model,
+                prepared.X_train,
+                prepared.y_train,
+                checkpoint_step=tree_checkpoint_step,
+                cv_folds=prepared.cv_folds if objective_mode == "cv" else None,
+                trial=trial,
+                n_jobs=n_jobs_cv,
+                curve_cache=curve_cache,
+                cost_sample=cost_sample,
+            )
+        if objective_mode == "oob":
+            return evaluate_oob(
+                model,
+                prepared.X_train,
+                prepared.y_train,
+                n_jobs=n_jobs_cv,
+                cost_sample=cost_sample,
+            )
+        return cross_validate_folds(
             model,
-            X_train,
-            y_train,
-            cv=cv_obj,
-            scoring=scoring,
+            prepared.X_train,
+            prepared.y_train,
+            cv_folds=prepared.cv_folds,
+            trial=trial,
             n_jobs=n_jobs_cv,
+            cost_sample=cost_sample,
         )
 
-        rmse = -np.mean(results["test_rmse"])
-        r2 = np.mean(results["test_r2"])
+    def objective(trial: optuna.Trial) -> float | tuple[float, ...]:
+        # sample hyperparams from config
+        final_params = optuna_random_search_util(trial, hyperparameters)
+        # instantiate with rfr_options
+        model = rf_sklearn_instantiate_rfr_class(final_params, rfr_options)
+        if tree_checkpoint_step:
+            # Grown forests are seeded, a smaller one is a prefix of a larger one
+            model.set_params(random_state=random_state)
+
+        cache_key = result_cache.key(model, data_key, cv_spec) if result_cache else ""
+        cached_results = result_cache.get(cache_key) if result_cache else None
+        cached = cached_results is not None
+        trial.set_user_attr("cached", cached)
+        if cached_results is not None:
+            logger.info("Trial %d reuses cached results", trial.number)
+            results = cached_results
+        else:
+            # Optuna cannot prune multi-objective trials
+            results = evaluate_trial(model, None if multi_objective else trial)
+            if result_cache:
+                result_cache.put(cache_key, model, results)
 
-        with mlflow.start_run(
-            experiment_id=experiment_id,
+        if objective_mode == "oob":
+            rmse, r2 = float(results["oob_rmse"]), float(results["oob_r2"])
+        else:
+            rmse = float(-np.mean(results["test_rmse"]))
+            r2 = float(np.mean(results["test_r2"]))
+        costs: dict[str, float] = {
+            "fit_time_s": float(np.mean(results["fit_time"])),
+            "predict_ms_per_1k_rows": float(results.pop("predict_ms_per_1k_rows")),
+            "model_size_mb": float(results.pop("model_size_mb")),
+        }
+        for name, value in costs.items():
+            trial.set_user_attr(name, value)
+        if study_mode == "constrained":
+            for name, value in cost_constraints(costs, cost_limits).items():
+                trial.set_constraint(name, value)
+
+        record = RunRecord(
             run_name="training",
-            tags=model_tags,
-            nested=True,
-        ):
-            mlflow.log_input(dataset, context="training", tags=model_tags)
-            mlflow.log_input(
-                X_train_dataset,
-                context="training",
-                tags=model_tags.update({"split": "X_train"}),
-            )
-            mlflow.log_input(
-                y_train_dataset,
-                context="training",
-                tags=model_tags.update({"split": "y_train"}),
+            tags={**model_tags, "cached": str(cached)},
+            params={
+                "training": "True",
+                "cv_score": str(objective_mode == "cv"),
+                "objective_mode": objective_mode,
+                "tree_checkpoint_step": tree_checkpoint_step,
+                "study_mode": study_mode,
+                "data_partition": "train",
+                **results,
+                **final_params,
+            },
+            metrics={"rmse": np.round(rmse, 0), "r2": r2, **costs},
+        )
+        record.log_input(dataset.reference(), context="training", tags=model_tags)
+        record.log_input(
+            X_train_dataset.reference(),
+            context="training",
+            tags={**model_tags, "split": "X_train"},
+        )
+        record.log_input(
+            y_train_dataset.reference(),
+            context="training",
+            tags={**model_tags, "split": "y_train"},
+        )
+        run_logger.log_run(record)
+
+        if multi_objective:
+            logger.info(
+                "Trial %d => RMSE=%.3f R2=%.3f Predict=%.2f ms/1k rows Size=%.1f MB",
+                trial.number,
+                rmse,
+                r2,
+                costs["predict_ms_per_1k_rows"],
+                costs["model_size_mb"],
             )
-            mlflow.log_param("training", "True")
-            mlflow.log_param("cv_score", "True")
-            mlflow.log_param("data_partition", "train")
-            mlflow.log_params(results)
-            mlflow.log_params(final_params)
-            mlflow.log_metrics({"rmse": np.round(rmse, 0), "r2": r2})
+            return (rmse, *(costs[name] for name in cost_objectives))
 
         completed = [
             t for t in trial.study.trials if t.state == optuna.trial.TrialState.COMPLETE
         ]
         if completed:
-            best_val = trial.study.best_value or float("inf")
+            # study.best_value skips trials outside the cost constraints
+            best_val = min(t.value for t in completed if t.value is not None)
             logger.info(
                 "Trial %d => RMSE=%.3f R2=%.3f (Best so far=%.3f)",
                 trial.number,
@@ -186,22 +464,153 @@ def rf_optuna_trial(
 
         return rmse
 
-    study = optuna.create_study(direction="minimize")
-    study.optimize(objective, n_trials=n_trials, n_jobs=n_jobs_study)
+    def verify_top_trials(top_k: int) -> dict:
+        """Cross-validates the best OOB trials, returns the best CV params."""
+        completed = study.get_trials(
+            deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)
+        )
+        top_trials = sorted(feasible_trials(completed), key=attrgetter("value"))[:top_k]
+        cv_rmse: dict[int, float] = {}
+        for top_trial in top_trials:
+            oob_rmse = top_trial.value
+            assert oob_rmse is not None, "Completed trials have a value"
+            model = rf_sklearn_instantiate_rfr_class(top_trial.params, rfr_options)
+            results = cross_validate_folds(
+                model,
+                prepared.X_train,
+                prepared.y_train,
+                cv_folds=prepared.cv_folds,
+                n_jobs=n_jobs_cv,
+            )
+            cv_rmse[top_trial.number] = float(-np.mean(results["test_rmse"]))
+            run_logger.log_run(
+                RunRecord(
+                    run_name="cv_verification",
+                    tags=model_tags,
+                    params={
+                        "training": "True",
+                        "cv_score": "True",
+                        "data_partition": "train",
+                        "trial_number": top_trial.number,
+                        **results,
+                        **top_trial.params,
+                    },
+                    metrics={
+                        "rmse": np.round(cv_rmse[top_trial.number], 0),
+                        "r2": float(np.mean(results["test_r2"])),
+                        "oob_rmse": oob_rmse,
+                    },
+                )
+            )
+            logger.info(
+                "Trial %d => OOB RMSE=%.3f CV RMSE=%.3f",
+                top_trial.number,
+                oob_rmse,
+                cv_rmse[top_trial.number],
+            )
+        best_number = min(cv_rmse, key=cv_rmse.get)
+        return next(t.params for t in top_trials if t.number == best_number)
 
-    # Final Model
-    if not any(t.state == optuna.trial.TrialState.COMPLETE for t in study.trials):
-        logger.warning("No completed trials found, skipping final model")
-        return
+    # Keyed by the stable study name, a rerun on the same data resumes it while
+    # the timestamped experiment_name only names the MLflow experiment
+    study_name = study_name or (
+        f"{model_tags.get('data_version_tag')}_{model_tags.get('model_tag')}"
+    )
+    study_storage = study_storage or {}
+    storage = create_study_storage(
+        study_name,
+        backend=study_storage.get("backend", "memory") or "memory",
+        directory=study_storage.get("directory", "optuna_studies"),
+    )
+    study = create_optuna_study(
+        study_name,
+        direction="minimize",
+        directions=(
+            ["minimize"] * (1 + len(cost_objectives)) if multi_objective else None
+        ),
+        pruner=create_optuna_pruner(
+            {"name": "none"} if multi_objective else pruner or {},
+            max_resource=(
+                hyperparameters["n_estimators"]["high"]
+                if tree_checkpoint_step
+                else cv_splits
+            ),
+        ),
+        storage=storage,
+        # Seeded, a rerun on the same data repeats (and reuses) the trials
+        seed=random_state if trial_result_cache.get("seed_sampler") else None,
+    )
+    # Earlier experiments' best configurations are evaluated before sampling
+    prior_trials = prior_trials or {}
+    enqueue_prior_trials(
+        study,
+        hyperparameters,
+        model_tags,
+        top_k=prior_trials.get("top_k", 0),
+        match_data_version=prior_trials.get("match_data_version", True),
+        exclude_experiment_id=experiment_id,
+    )
+    mlflow_logging = mlflow_logging or {}
+    run_logger = MlflowBatchLogger(
+        experiment_id,
+        asynchronous=mlflow_logging.get("asynchronous", False),
+        max_queue_size=mlflow_logging.get("max_queue_size", 100),
+    )
+    try:
+        run_logger.log_run(
+            datasets_record(
+                dataset,
+                {
+                    "X_train": X_train_dataset,
+                    "y_train": y_train_dataset,
+                    "X_val": X_val_dataset,
+                    "y_val": y_val_dataset,
+                    "X_test": X_test_dataset,
+                    "y_test": y_test_dataset,
+                },
+                model_tags,
+            )
+        )
+        # Forked study workers write synchronously, they must not log first
+        run_logger.flush()
+        with threadpool_limits(limits=plan.native_threads_study):
+            run_optuna_study(
+                study,
+                storage,
+                objective,
+                n_trials=n_trials,
+                n_jobs=n_jobs_study,
+                n_workers=n_workers_study,
+                native_threads=plan.native_threads_study,
+            )
+            # Final Model
+            if not any(
+                t.state == optuna.trial.TrialState.COMPLETE for t in study.trials
+            ):
+                logger.warning("No completed trials found, skipping final model")
+                return
+            if objective_mode == "oob" and oob_verify_top_k > 0 and not multi_objective:
+                best_params = verify_top_trials(oob_verify_top_k)
+            else:
+                best_params = select_study_trial(
+                    study, study_mode, pareto_pick, pareto_rmse_tolerance
+                ).params
+    finally:
+        run_logger.close()
 
     logger.info("Training final model on best_params")
-    best_params = study.best_params
     final_model = RandomForestRegressor(
         **best_params,
         random_state=random_state,
         n_jobs=n_jobs_final_model,
     )
-    final_model.fit(X_train, y_train)
+    start = time.perf_counter()
+    with threadpool_limits(limits=plan.native_threads_final):
+        final_model.fit(X_train, y_train)
+    final_costs = {
+        "fit_time_s": time.perf_counter() - start,
+        **measure_model_cost(final_model, X_train.iloc[:COST_SAMPLE_ROWS]),
+    }
 
     y_pred_val = final_model.predict(X_val)
     val_rmse = sqrt(mean_squared_error(y_val, y_pred_val))
@@ -213,16 +622,16 @@ def rf_optuna_trial(
         nested=True,
         tags=model_tags,
     ):
-        mlflow.log_input(dataset, context="validation", tags=model_tags)
+        mlflow.log_input(dataset.reference(), context="validation", tags=model_tags)
         mlflow.log_input(
-            X_val_dataset,
+            X_val_dataset.reference(),
             context="validation",
-            tags=model_tags.update({"split": "X_val"}),
+            tags={**model_tags, "split": "X_val"},
         )
         mlflow.log_input(
-            y_val_dataset,
+            y_val_dataset.reference(),
             context="validation",
-            tags=model_tags.update({"split": "y_val"}),
+            tags={**model_tags, "split": "y_val"},
         )
         mlflow.log_param("validation", "True")
         mlflow.log_param("data_partition", "val")
@@ -232,15 +641,37 @@ def rf_optuna_trial(
             {"val_rmse": np.round(val_rmse, 0), "val_mae": np.round(val_mae, 0)}
         )
         mlflow.log_params(best_params)
-        mlflow.log_param("y_pred_val", y_pred_val)
+        mlflow.log_params(plan.as_params())
+        mlflow.log_param("study_mode", study_mode)
+        mlflow.log_metrics(final_costs)
+        if multi_objective:
+            mlflow.log_param("pareto_pick", pareto_pick)
+            mlflow.log_text(
+                pareto_front_frame(study, ["rmse", *cost_objectives]).to_csv(
+                    index=False
+                ),
+                "study/pareto_front.csv",
+            )
+        log_predictions_as_artifact(
+            "val", data_part["keys_val"], y_val, y_pred_val, year_col
+        )
         mlflow.sklearn.log_model(final_model, artifact_path="model")
 
         # Permutation importances
+        X_perm, y_perm = (
+            (X_val, y_val) if permutation_split == "val" else (X_train, y_train)
+        )
         calculate_and_log_importances_as_artifact(
             permutation_importances_filename,
             final_model,
-            X_train,
-            y_train,
+            X_perm,
+            y_perm,
+            n_repeats=permutation_importance.get("n_repeats", 5),
+            n_jobs=permutation_importance.get("n_jobs") or plan.n_jobs_final_model,
+            sample_rows=permutation_importance.get("sample_rows"),
+            strata=X_perm[year_col],
+            group_pattern=permutation_importance.get("group_pattern"),
+            random_state=random_state,
         )
 
         # RandomForest importances
@@ -276,20 +707,23 @@ def rf_optuna_trial(
             mlflow.log_metrics(
                 {"test_rmse": np.round(test_rmse, 0), "test_mae": np.round(test_mae, 0)}
             )
-            mlflow.log_input(dataset, context="test", tags=model_tags)
+            mlflow.log_input(dataset.reference(), context="test", tags=model_tags)
             mlflow.log_input(
-                X_test_dataset,
+                X_test_dataset.reference(),
                 context="test",
-                tags=model_tags.update({"split": "X_test"}),
+                tags={**model_tags, "split": "X_test"},
             )
             mlflow.log_input(
-                y_test_dataset,
+                y_test_dataset.reference(),
                 context="test",
-                tags=model_tags.update({"split": "y_test"}),
+                tags={**model_tags, "split": "y_test"},
             )
             mlflow.log_metric("rmse", test_rmse)
             mlflow.log_metric("mae", test_mae)
             mlflow.log_param("test", "True")
             mlflow.log_param("data_partition", "test")
+            log_predictions_as_artifact(
+                "test", data_part["keys_test"], y_test, y_pred_test, year_col
+            )
 
     logger.info("Done with rf_optuna_trial. All outputs in ./mlruns/")
@@ -0,0 +1,80 @@
+# dependencies/modeling/ridge_alpha_path.py
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RidgeFoldPath:
+    """One CV fold's training matrix, decomposed once for every alpha.
+
+    With the centered training features X_c = U diag(s) V^T, the Ridge
+    coefficients for `alpha` are V diag(s / (s^2 + alpha)) U^T y_c, the
+    same solution `Ridge(alpha, fit_intercept=True)` computes.
+    """
+
+    s: np.ndarray
+    uty: np.ndarray
+    test_proj: np.ndarray
+    y_test: np.ndarray
+    y_mean: float
+
+    def predict(self, alphas: np.ndarray) -> np.ndarray:
+        """Test fold predictions, one column per alpha."""
+        shrink = self.s[:, None] / (self.s[:, None] ** 2 + alphas[None, :])
+        return self.y_mean + self.test_proj @ (shrink * self.uty[:, None])
+
+
+def decompose_ridge_folds(
+    X: np.ndarray,
+    y: np.ndarray,
+    cv_folds: list[tuple[np.ndarray, np.ndarray]],
+) -> list[RidgeFoldPath]:
+    fold_paths = []
+    for train_idx, test_idx in cv_folds:
+        X_train = np.asarray(X[train_idx], dtype=np.float64)
+        y_train = np.asarray(y[train_idx], dtype=np.float64)
+        x_mean = X_train.mean(axis=0)
+        y_mean = float(y_train.mean())
+        U, s, Vt = np.linalg.svd(X_train - x_mean, full_matrices=False)
+        X_test = np.asarray(X[test_idx], dtype=np.float64)
+        fold_paths.append(
+            RidgeFoldPath(
+                s=s,
+                uty=U.T @ (y_train - y_mean),
+                test_proj=(X_test - x_mean) @ Vt.T,
+                y_test=np.asarray(y[test_idx], dtype=np.float64),
+                y_mean=y_mean,
+            )
+        )
+    logger.debug("Decomposed %i folds for the Ridge alpha path", len(fold_paths))
+    return fold_paths
+
+
+def ridge_alpha_path_cv(
+    fold_paths: list[RidgeFoldPath],
+    alphas: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """Test RMSE and R2 of every fold (rows) for every alpha (columns)."""
+    rmse = np.empty((len(fold_paths), len(alphas)))
+    r2 = np.empty_like(rmse)
+    for i, fold in enumerate(fold_paths):
+        residuals = fold.y_test[:, None] - fold.predict(alphas)
+        sse = np.square(residuals).sum(axis=0)
+        sst = np.square(fold.y_test - fold.y_test.mean()).sum()
+        rmse[i] = np.sqrt(sse / len(fold.y_test))
+        r2[i] = 1 - sse / sst
+    return {"test_rmse": rmse, "test_r2": r2}
+
+
+def ridge_alpha_grid(alpha: dict, n_alphas: int) -> np.ndarray:
+    """`n_alphas` values spanning the `alpha` hyperparameter range."""
+    low, high = float(alpha["low"]), float(alpha["high"])
+    if alpha.get("log"):
+        return np.geomspace(low, high, n_alphas)
+    return np.linspace(low, high, n_alphas)
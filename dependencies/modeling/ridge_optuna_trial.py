@@ -1,5 +1,7 @@
 # dependencies/modeling/ridge_optuna_trial.py
 
+from __future__ import annotations
+
 import logging
 from dataclasses import dataclass
 from math import sqrt
@@ -10,22 +12,53 @@ import mlflow.data
 import numpy as np
 import optuna
 import pandas as pd
-from mlflow.data.pandas_dataset import PandasDataset
 from sklearn.linear_model import Ridge
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-from sklearn.model_selection import TimeSeriesSplit, cross_validate
+from threadpoolctl import threadpool_limits
 
 from dependencies.logging_utils.calculate_and_log_importances_as_artifact import (
     calculate_and_log_importances_as_artifact,
 )
+from dependencies.logging_utils.log_predictions_as_artifact import (
+    log_predictions_as_artifact,
+)
+from dependencies.logging_utils.mlflow_batch_logger import (
+    MlflowBatchLogger,
+    RunRecord,
+)
+from dependencies.logging_utils.mlflow_dataset_registry import (
+    MlflowDatasetRegistry,
+    RegisteredDataset,
+    datasets_record,
+)
+from dependencies.modeling.compute_permutation_importances import (
+    PERMUTATION_SPLITS,
+)
+from dependencies.modeling.create_optuna_pruner import create_optuna_pruner
+from dependencies.modeling.create_optuna_study import (
+    create_optuna_study,
+    create_study_storage,
+)
+from dependencies.modeling.cross_validate_folds import cross_validate_folds
+from dependencies.modeling.enqueue_prior_trials import enqueue_prior_trials
 from dependencies.modeling.optuna_random_search_util import optuna_random_search_util
+from dependencies.modeling.plan_resources import plan_resources
+from dependencies.modeling.prepared_dataset import prepare_dataset
+from dependencies.modeling.ridge_alpha_path import (
+    decompose_ridge_folds,
+    ridge_alpha_grid,
+    ridge_alpha_path_cv,
+)
 from dependencies.modeling.ridge_sklearn_instantiate_ridge_class import (
     ridge_sklearn_instantiate_ridge_class,
 )
-from dependencies.modeling.validate_parallelism import validate_parallelism
+from dependencies.modeling.run_optuna_study import FINISHED_STATES, run_optuna_study
+from dependencies.modeling.trial_result_cache import TrialResultCache
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("fit", "closed_form")
+
 
 @dataclass
 class RidgeOptunaTrialConfig:
@@ -35,6 +68,7 @@ class RidgeOptunaTrialConfig:
     val_range: tuple[int, int]
     test_range: tuple[int, int]
     experiment_name: str
+    study_name: str | None
     cv_splits: int
     n_trials: int
     permutation_importances_filename: str
@@ -43,6 +77,19 @@ class RidgeOptunaTrialConfig:
     n_jobs_cv: int
     random_state: int
     model_tags: Any
+    cv_dtype: str
+    prepared_data_dir: str | None
+    pruner: dict
+    study_storage: dict
+    n_workers_study: int
+    mlflow_logging: dict
+    mlflow_dataset_registry: dict
+    search_mode: str
+    resources: dict
+    trial_result_cache: dict
+    prior_trials: dict
+    prediction_key_cols: list[str]
+    permutation_importance: dict
 
 
 def ridge_optuna_trial(
@@ -61,8 +108,56 @@ def ridge_optuna_trial(
     n_jobs_cv: int,
     random_state: int,
     model_tags: Any,
+    cv_dtype: str = "float64",
+    prepared_data_dir: str | None = None,
+    pruner: dict | None = None,
+    study_storage: dict | None = None,
+    n_workers_study: int = 1,
+    mlflow_logging: dict | None = None,
+    mlflow_dataset_registry: dict | None = None,
+    search_mode: str = "fit",
+    resources: dict | None = None,
+    trial_result_cache: dict | None = None,
+    prior_trials: dict | None = None,
+    prediction_key_cols: list[str] | None = None,
+    permutation_importance: dict | None = None,
+    study_name: str | None = None,
 ) -> None:
-    validate_parallelism(n_jobs_cv=n_jobs_cv, n_jobs_study=n_jobs_study)
+    """Tunes Ridge with Optuna, then fits and evaluates the best model.
+
+    `search_mode: fit` refits Ridge for every trial and fold. With
+    `closed_form` only `alpha` is searched: each fold is decomposed once and
+    a grid of `n_trials` alphas over the `alpha` range is scored in one
+    vectorized pass, the results are added to the study as finished trials.
+    With `trial_result_cache.file_path` fitted configurations are cached
+    across studies on the same data and `prior_trials.top_k` starts a `fit`
+    study from earlier experiments' best params, see rf_optuna_trial. Val
+    and test predictions are logged as artifacts like rf_optuna_trial's.
+    The study is keyed on `study_name` like rf_optuna_trial's.
+    """
+    permutation_importance = permutation_importance or {}
+    permutation_split = permutation_importance.get("split", "train")
+    if permutation_split not in PERMUTATION_SPLITS:
+        msg = (
+            f"Unsupported permutation_importance.split '{permutation_split}'. "
+            f"Expected one of {PERMUTATION_SPLITS}."
+        )
+        raise ValueError(msg)
+    if search_mode not in SEARCH_MODES:
+        msg = (
+            f"Unsupported search_mode '{search_mode}'. Expected one of {SEARCH_MODES}."
+        )
+        raise ValueError(msg)
+    # Ridge has no n_jobs, its final fit gets all cores as BLAS threads
+    plan = plan_resources(
+        n_jobs_cv=n_jobs_cv,
+        n_jobs_study=n_jobs_study,
+        n_jobs_final_model=1,
+        n_workers=n_workers_study,
+        **(resources or {}),
+    )
+    n_jobs_cv, n_jobs_study = plan.n_jobs_cv, plan.n_jobs_study
+    n_workers_study = plan.n_workers_study
     logger.info("Starting ridge_optuna_trial with %i trials to run", n_trials)
 
     # Always use the default local mlruns folder
@@ -72,15 +167,28 @@ def ridge_optuna_trial(
     existing = mlflow.get_experiment_by_name(experiment_name)
     if existing is None:
         experiment_id = mlflow.create_experiment(experiment_name)
+    else:
+        experiment_id = existing.experiment_id
 
     if "index" in df.columns:
         feature_cols = [c for c in df.columns if c not in [target_col, "index"]]
     else:
         feature_cols = [c for c in df.columns if c != target_col]
+    # Row identifiers stored next to the logged val/test predictions
+    key_cols = list(dict.fromkeys([*(prediction_key_cols or []), year_col]))
+    missing_key_cols = [c for c in key_cols if c not in df.columns]
+    if missing_key_cols:
+        logger.warning("Prediction key columns %s not in df", missing_key_cols)
+        key_cols = [c for c in key_cols if c in df.columns]
 
-    dataset: PandasDataset = mlflow.data.from_pandas(
-        df, source=model_tags.get("input_file_path", "")
+    # Digests and schemas are computed once, every trial run reuses them
+    mlflow_dataset_registry = mlflow_dataset_registry or {}
+    registry = MlflowDatasetRegistry(
+        source=model_tags.get("input_file_path", ""),
+        registry_file_path=mlflow_dataset_registry.get("file_path"),
+        df_hash_n_jobs=mlflow_dataset_registry.get("df_hash_n_jobs", 1),
     )
+    dataset = registry.register(df)
 
     def partition_data() -> dict[str, pd.DataFrame]:
         df_train = df[
@@ -94,8 +202,10 @@ def ridge_optuna_trial(
             "y_train": df_train[target_col],
             "X_val": df_val[feature_cols],
             "y_val": df_val[target_col],
+            "keys_val": df_val[key_cols],
             "X_test": df_test[feature_cols],
             "y_test": df_test[target_col],
+            "keys_test": df_test[key_cols],
         }
 
     data_part = partition_data()
@@ -103,54 +213,105 @@ def ridge_optuna_trial(
     X_val, y_val = data_part["X_val"], data_part["y_val"]
     X_test, y_test = data_part["X_test"], data_part["y_test"]
 
-    X_train_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(X_train))
-    y_train_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(y_train))
-    X_val_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(X_val))
-    y_val_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(y_val))
-    X_test_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(X_test))
-    y_test_dataset: PandasDataset = mlflow.data.from_pandas(pd.DataFrame(y_test))
+    # Converted once per study, every trial cross-validates on these arrays
+    prepared = prepare_dataset(
+        df,
+        feature_cols=feature_cols,
+        target_col=target_col,
+        year_col=year_col,
+        train_range=train_range,
+        val_range=val_range,
+        test_range=test_range,
+        cv_splits=cv_splits,
+        dtype=cv_dtype,
+        memmap_dir=prepared_data_dir,
+    )
+
+    def register_split(
+        split: str,
+        frame: pd.DataFrame | pd.Series,
+        year_range: tuple[int, int],
+    ) -> RegisteredDataset:
+        frame = pd.DataFrame(frame)
+        return registry.register_split(
+            dataset,
+            frame,
+            name=split,
+            split={
+                "year_col": year_col,
+                "year_range": list(year_range),
+                "columns": list(frame.columns),
+            },
+        )
+
+    X_train_dataset = register_split("X_train", X_train, train_range)
+    y_train_dataset = register_split("y_train", y_train, train_range)
+    X_val_dataset = register_split("X_val", X_val, val_range)
+    y_val_dataset = register_split("y_val", y_val, val_range)
+    X_test_dataset = register_split("X_test", X_test, test_range)
+    y_test_dataset = register_split("y_test", y_test, test_range)
+    registry.save()
+
+    # Trial results persist across reruns on the same data and CV setup
+    trial_result_cache = trial_result_cache or {}
+    result_cache = (
+        TrialResultCache(trial_result_cache["file_path"])
+        if trial_result_cache.get("file_path")
+        else None
+    )
+    data_key = f"{X_train_dataset.registry_key}:{y_train_dataset.registry_key}"
+    cv_spec = {"cv_splits": cv_splits, "cv_dtype": cv_dtype}
 
     def objective(trial: optuna.Trial) -> float:
         final_params = optuna_random_search_util(trial, hyperparameters)
         model = ridge_sklearn_instantiate_ridge_class(final_params)
 
-        cv_obj = TimeSeriesSplit(n_splits=cv_splits)
-        scoring = {"rmse": "neg_root_mean_squared_error", "r2": "r2"}
-        results = cross_validate(
-            model,
-            X_train,
-            y_train,
-            cv=cv_obj,
-            scoring=scoring,
-            n_jobs=n_jobs_cv,
-        )
+        cache_key = result_cache.key(model, data_key, cv_spec) if result_cache else ""
+        cached_results = result_cache.get(cache_key) if result_cache else None
+        cached = cached_results is not None
+        trial.set_user_attr("cached", cached)
+        if cached_results is not None:
+            logger.info("Trial %d reuses cached results", trial.number)
+            results = cached_results
+        else:
+            results = cross_validate_folds(
+                model,
+                prepared.X_train,
+                prepared.y_train,
+                cv_folds=prepared.cv_folds,
+                trial=trial,
+                n_jobs=n_jobs_cv,
+            )
+            if result_cache:
+                result_cache.put(cache_key, model, results)
 
-        rmse = -np.mean(results["test_rmse"])
-        r2 = np.mean(results["test_r2"])
+        rmse = float(-np.mean(results["test_rmse"]))
+        r2 = float(np.mean(results["test_r2"]))
 
-        with mlflow.start_run(
-            experiment_id=experiment_id,
+        record = RunRecord(
             run_name="training",
-            tags=model_tags,
-            nested=True,
-        ):
-            mlflow.log_input(dataset, context="training", tags=model_tags)
-            mlflow.log_input(
-                X_train_dataset,
-                context="training",
-                tags=model_tags.update({"split": "X_train"}),
-            )
-            mlflow.log_input(
-                y_train_dataset,
-                context="training",
-                tags=model_tags.update({"split": "y_train"}),
-            )
-            mlflow.log_param("training", "True")
-            mlflow.log_param("cv_score", "True")
-            mlflow.log_param("data_partition", "train")
-            mlflow.log_params(results)
-            mlflow.log_params(final_params)
-            mlflow.log_metrics({"rmse": np.round(rmse, 0), "r2": r2})
+            tags={**model_tags, "cached": str(cached)},
+            params={
+                "training": "True",
+                "cv_score": "True",
+                "data_partition": "train",
+                **results,
+                **final_params,
+            },
+            metrics={"rmse": np.round(rmse, 0), "r2": r2},
+        )
+        record.log_input(dataset.reference(), context="training", tags=model_tags)
+        record.log_input(
+            X_train_dataset.reference(),
+            context="training",
+            tags={**model_tags, "split": "X_train"},
+        )
+        record.log_input(
+            y_train_dataset.reference(),
+            context="training",
+            tags={**model_tags, "split": "y_train"},
+        )
+        run_logger.log_run(record)
 
         completed = [
             t for t in trial.study.trials if t.state == optuna.trial.TrialState.COMPLETE
@@ -174,8 +335,155 @@ def ridge_optuna_trial(
 
         return rmse
 
-    study = optuna.create_study(direction="minimize")
-    study.optimize(objective, n_trials=n_trials, n_jobs=n_jobs_study)
+    def alpha_path_search() -> None:
+        alpha = hyperparameters.get("alpha", {})
+        if not alpha.get("tune", False):
+            msg = "search_mode closed_form needs a tuned 'alpha' hyperparameter."
+            raise ValueError(msg)
+        ignored = [
+            k for k, v in hyperparameters.items() if k != "alpha" and v.get("tune")
+        ]
+        if ignored:
+            logger.warning("search_mode closed_form does not tune %s", ignored)
+        if study.get_trials(deepcopy=False, states=FINISHED_STATES):
+            logger.info("Study '%s' already holds the alpha path", study.study_name)
+            return
+
+        alphas = ridge_alpha_grid(alpha, n_trials)
+        fold_paths = decompose_ridge_folds(
+            prepared.X_train, prepared.y_train, prepared.cv_folds
+        )
+        results = ridge_alpha_path_cv(fold_paths, alphas)
+        rmse = results["test_rmse"].mean(axis=0)
+        r2 = results["test_r2"].mean(axis=0)
+
+        distributions = {
+            "alpha": optuna.distributions.FloatDistribution(
+                float(alpha["low"]), float(alpha["high"]), log=bool(alpha.get("log"))
+            )
+        }
+        study.add_trials(
+            [
+                optuna.trial.create_trial(
+                    params={"alpha": float(a)},
+                    distributions=distributions,
+                    value=float(v),
+                )
+                for a, v in zip(alphas, rmse)
+            ]
+        )
+
+        cv_results = pd.DataFrame({"alpha": alphas, "rmse": rmse, "r2": r2})
+        for i in range(len(fold_paths)):
+            cv_results[f"fold{i}_rmse"] = results["test_rmse"][i]
+        best = int(np.argmin(rmse))
+        record = RunRecord(
+            run_name="training",
+            tags=model_tags,
+            params={
+                "training": "True",
+                "cv_score": "True",
+                "data_partition": "train",
+                "search_mode": search_mode,
+                "n_alphas": len(alphas),
+                "alpha": alphas[best],
+            },
+            metrics={"rmse": np.round(rmse[best], 0), "r2": r2[best]},
+            metric_series={
+                "cv_alpha": alphas.tolist(),
+                "cv_rmse": rmse.tolist(),
+                "cv_r2": r2.tolist(),
+            },
+            texts={"cv_results/ridge_alpha_path.csv": cv_results.to_csv(index=False)},
+        )
+        record.log_input(dataset.reference(), context="training", tags=model_tags)
+        record.log_input(
+            X_train_dataset.reference(),
+            context="training",
+            tags={**model_tags, "split": "X_train"},
+        )
+        record.log_input(
+            y_train_dataset.reference(),
+            context="training",
+            tags={**model_tags, "split": "y_train"},
+        )
+        run_logger.log_run(record)
+        logger.info(
+            "Alpha path of %i alphas, %i folds => alpha=%.3g RMSE=%.3f R2=%.3f",
+            len(alphas),
+            len(fold_paths),
+            alphas[best],
+            rmse[best],
+            r2[best],
+        )
+
+    # Keyed by the stable study name, a rerun on the same data resumes it while
+    # the timestamped experiment_name only names the MLflow experiment
+    study_name = study_name or (
+        f"{model_tags.get('data_version_tag')}_{model_tags.get('model_tag')}"
+    )
+    study_storage = study_storage or {}
+    storage = create_study_storage(
+        study_name,
+        backend=study_storage.get("backend", "memory") or "memory",
+        directory=study_storage.get("directory", "optuna_studies"),
+    )
+    study = create_optuna_study(
+        study_name,
+        direction="minimize",
+        pruner=create_optuna_pruner(pruner or {}, max_resource=cv_splits),
+        storage=storage,
+        # Seeded, a rerun on the same data repeats (and reuses) the trials
+        seed=random_state if trial_result_cache.get("seed_sampler") else None,
+    )
+    # Earlier experiments' best configurations are evaluated before sampling
+    prior_trials = prior_trials or {}
+    enqueue_prior_trials(
+        study,
+        hyperparameters,
+        model_tags,
+        top_k=prior_trials.get("top_k", 0) if search_mode == "fit" else 0,
+        match_data_version=prior_trials.get("match_data_version", True),
+        exclude_experiment_id=experiment_id,
+    )
+    mlflow_logging = mlflow_logging or {}
+    run_logger = MlflowBatchLogger(
+        experiment_id,
+        asynchronous=mlflow_logging.get("asynchronous", False),
+        max_queue_size=mlflow_logging.get("max_queue_size", 100),
+    )
+    try:
+        run_logger.log_run(
+            datasets_record(
+                dataset,
+                {
+                    "X_train": X_train_dataset,
+                    "y_train": y_train_dataset,
+                    "X_val": X_val_dataset,
+                    "y_val": y_val_dataset,
+                    "X_test": X_test_dataset,
+                    "y_test": y_test_dataset,
+                },
+                model_tags,
+            )
+        )
+        # Forked study workers write synchronously, they must not log first
+        run_logger.flush()
+        with threadpool_limits(limits=plan.native_threads_study):
+            if search_mode == "closed_form":
+                alpha_path_search()
+            else:
+                run_optuna_study(
+                    study,
+                    storage,
+                    objective,
+                    n_trials=n_trials,
+                    n_jobs=n_jobs_study,
+                    n_workers=n_workers_study,
+                    native_threads=plan.native_threads_study,
+                )
+    finally:
+        run_logger.close()
 
     # Final Model
     if not any(t.state == optuna.trial.TrialState.COMPLETE for t in study.trials):
@@ -185,7 +493,8 @@ def ridge_optuna_trial(
     logger.info("Training final model on best_params")
     best_params = study.best_params
     final_model = Ridge(**best_params, random_state=random_state)
-    final_model.fit(X_train, y_train)
+    with threadpool_limits(limits=plan.native_threads_final):
+        final_model.fit(X_train, y_train)
 
     y_pred_val = final_model.predict(X_val)
     val_rmse = sqrt(mean_squared_error(y_val, y_pred_val))
@@ -197,16 +506,16 @@ def ridge_optuna_trial(
         nested=True,
         tags=model_tags,
     ):
-        mlflow.log_input(dataset, context="validation", tags=model_tags)
+        mlflow.log_input(dataset.reference(), context="validation", tags=model_tags)
         mlflow.log_input(
-            X_val_dataset,
+            X_val_dataset.reference(),
             context="validation",
-            tags=model_tags.update({"split": "X_val"}),
+            tags={**model_tags, "split": "X_val"},
         )
         mlflow.log_input(
-            y_val_dataset,
+            y_val_dataset.reference(),
             context="validation",
-            tags=model_tags.update({"split": "y_val"}),
+            tags={**model_tags, "split": "y_val"},
         )
         mlflow.log_param("validation", "True")
         mlflow.log_param("data_partition", "val")
@@ -216,15 +525,27 @@ def ridge_optuna_trial(
             {"val_rmse": np.round(val_rmse, 0), "val_mae": np.round(val_mae, 0)}
         )
         mlflow.log_params(best_params)
-        mlflow.log_param("y_pred_val", y_pred_val)
+        mlflow.log_params(plan.as_params())
+        log_predictions_as_artifact(
+            "val", data_part["keys_val"], y_val, y_pred_val, year_col
+        )
         mlflow.sklearn.log_model(final_model, artifact_path="model")
 
         # Permutation importances
+        X_perm, y_perm = (
+            (X_val, y_val) if permutation_split == "val" else (X_train, y_train)
+        )
         calculate_and_log_importances_as_artifact(
             permutation_importances_filename,
             final_model,
-            X_train,
-            y_train,
+            X_perm,
+            y_perm,
+            n_repeats=permutation_importance.get("n_repeats", 5),
+            n_jobs=permutation_importance.get("n_jobs") or plan.n_jobs_final_model,
+            sample_rows=permutation_importance.get("sample_rows"),
+            strata=X_perm[year_col],
+            group_pattern=permutation_importance.get("group_pattern"),
+            random_state=random_state,
         )
 
         y_pred_test = final_model.predict(X_test)
@@ -239,20 +560,23 @@ def ridge_optuna_trial(
             mlflow.log_metrics(
                 {"test_rmse": np.round(test_rmse, 0), "test_mae": np.round(test_mae, 0)}
             )
-            mlflow.log_input(dataset, context="test", tags=model_tags)
+            mlflow.log_input(dataset.reference(), context="test", tags=model_tags)
             mlflow.log_input(
-                X_test_dataset,
+                X_test_dataset.reference(),
                 context="test",
-                tags=model_tags.update({"split": "X_test"}),
+                tags={**model_tags, "split": "X_test"},
             )
             mlflow.log_input(
-                y_test_dataset,
+                y_test_dataset.reference(),
                 context="test",
-                tags=model_tags.update({"split": "y_test"}),
+                tags={**model_tags, "split": "y_test"},
             )
             mlflow.log_metric("rmse", test_rmse)
             mlflow.log_metric("mae", test_mae)
             mlflow.log_param("test", "True")
             mlflow.log_param("data_partition", "test")
+            log_predictions_as_artifact(
+                "test", data_part["keys_test"], y_test, y_pred_test, year_col
+            )
 
     logger.info("Done with ridge_optuna_trial. All outputs in ./mlruns/")
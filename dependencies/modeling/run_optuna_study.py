@@ -0,0 +1,114 @@
+# dependencies/modeling/run_optuna_study.py
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from collections.abc import Callable
+
+import optuna
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+from threadpoolctl import threadpool_limits
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATES = (TrialState.COMPLETE, TrialState.PRUNED)
+
+
+def _count_finished(study: optuna.Study) -> int:
+    return len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+
+
+def _optimize_worker(
+    study_name: str,
+    storage: str | optuna.storages.BaseStorage,
+    objective: Callable[[optuna.Trial], float],
+    n_trials: int,
+    n_jobs: int,
+    sampler: optuna.samplers.BaseSampler,
+    pruner: optuna.pruners.BasePruner,
+    native_threads: int | None,
+) -> None:
+    # Forked workers would otherwise all draw the parent's random sequence
+    sampler.reseed_rng()
+    study = optuna.load_study(
+        study_name=study_name, storage=storage, sampler=sampler, pruner=pruner
+    )
+    # The parent's limits do not carry over to the pools a fork starts
+    with threadpool_limits(limits=native_threads):
+        study.optimize(
+            objective,
+            n_trials=n_trials,
+            n_jobs=n_jobs,
+            callbacks=[MaxTrialsCallback(n_trials, states=FINISHED_STATES)],
+        )
+
+
+def run_optuna_study(
+    study: optuna.Study,
+    storage: str | optuna.storages.BaseStorage | None,
+    objective: Callable[[optuna.Trial], float],
+    n_trials: int,
+    n_jobs: int,
+    n_workers: int,
+    native_threads: int | None = None,
+) -> None:
+    """Runs the study until it holds `n_trials` finished trials.
+
+    With `n_workers` > 1 the trials run in forked worker processes that share
+    the study through its storage (each still running `n_jobs` threads), so
+    the objective closure needs no pickling and trials do not compete for
+    the GIL. Workers reopen `storage` (the sqlite URL, or the journal file
+    storage) instead of sharing the parent's connection. A resumed study
+    only runs the trials that are missing. Each worker limits its native
+    (BLAS/OpenMP) pools to `native_threads` threads, None leaves them as
+    they are.
+    """
+    remaining = n_trials - _count_finished(study)
+    if remaining <= 0:
+        logger.info(
+            "Study '%s' already has %i finished trials", study.study_name, n_trials
+        )
+        return
+    callbacks = [MaxTrialsCallback(n_trials, states=FINISHED_STATES)]
+    if n_workers <= 1:
+        study.optimize(
+            objective, n_trials=remaining, n_jobs=n_jobs, callbacks=callbacks
+        )
+        return
+
+    if storage is None:
+        msg = "n_workers_study > 1 needs a sqlite or journal study_storage."
+        raise ValueError(msg)
+
+    logger.info(
+        "Running %i remaining trials of study '%s' in %i worker processes",
+        remaining,
+        study.study_name,
+        n_workers,
+    )
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(
+            target=_optimize_worker,
+            args=(
+                study.study_name,
+                storage,
+                objective,
+                n_trials,
+                n_jobs,
+                study.sampler,
+                study.pruner,
+                native_threads,
+            ),
+        )
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    failed = [w.exitcode for w in workers if w.exitcode != 0]
+    if failed:
+        msg = f"{len(failed)} study worker processes exited with codes {failed}."
+        raise RuntimeError(msg)
@@ -0,0 +1,126 @@
+# dependencies/modeling/select_study_trial.py
+from __future__ import annotations
+
+import logging
+from operator import attrgetter
+
+import numpy as np
+import optuna
+import pandas as pd
+from optuna.trial import FrozenTrial, TrialState
+
+logger = logging.getLogger(__name__)
+
+STUDY_MODES = ("single", "multi_objective", "constrained")
+PARETO_PICKS = ("best_rmse", "knee", "fastest_within")
+COST_METRICS = ("fit_time_s", "predict_ms_per_1k_rows", "model_size_mb")
+
+
+def validate_study_mode(
+    study_mode: str,
+    cost_objectives: list[str],
+    cost_limits: dict[str, float | None],
+    pareto_pick: str,
+) -> None:
+    if study_mode not in STUDY_MODES:
+        msg = f"Unsupported study_mode '{study_mode}'. Expected one of {STUDY_MODES}."
+        raise ValueError(msg)
+    if pareto_pick not in PARETO_PICKS:
+        msg = (
+            f"Unsupported pareto_pick '{pareto_pick}'. Expected one of {PARETO_PICKS}."
+        )
+        raise ValueError(msg)
+    unknown = set(cost_objectives).union(cost_limits) - set(COST_METRICS)
+    if unknown:
+        msg = f"Unsupported cost metrics {sorted(unknown)}. Expected {COST_METRICS}."
+        raise ValueError(msg)
+    if study_mode == "multi_objective" and not cost_objectives:
+        msg = "study_mode 'multi_objective' needs at least one cost_objectives entry."
+        raise ValueError(msg)
+    if study_mode == "constrained" and not any(
+        v is not None for v in cost_limits.values()
+    ):
+        msg = "study_mode 'constrained' needs at least one cost_limits value."
+        raise ValueError(msg)
+
+
+def cost_constraints(
+    costs: dict[str, float], cost_limits: dict[str, float | None]
+) -> dict[str, float]:
+    """Values for `trial.set_constraint`, feasible when all are <= 0.
+
+    Optuna's samplers steer away from trials with positive values, pruned
+    trials never measured their cost and have none.
+    """
+    return {
+        name: costs[name] - limit
+        for name, limit in cost_limits.items()
+        if limit is not None
+    }
+
+
+def feasible_trials(trials: list[FrozenTrial]) -> list[FrozenTrial]:
+    """Trials meeting their cost constraints, all trials if none does."""
+    feasible = [t for t in trials if all(v <= 0 for v in t.constraints.values())]
+    if not feasible:
+        logger.warning("No trial meets the cost_limits, selecting from all trials")
+        return trials
+    return feasible
+
+
+def pareto_front_frame(study: optuna.Study, objectives: list[str]) -> pd.DataFrame:
+    """Trial number, params and objective values of the study's Pareto front."""
+    return pd.DataFrame(
+        [
+            {"trial": t.number, **dict(zip(objectives, t.values)), **t.params}
+            for t in study.best_trials
+        ]
+    ).sort_values(objectives[0])
+
+
+def _pick_from_front(
+    front: list[FrozenTrial], pareto_pick: str, rmse_tolerance: float
+) -> FrozenTrial:
+    values = np.array([t.values for t in front], dtype=np.float64)
+    if pareto_pick == "best_rmse":
+        return front[int(np.argmin(values[:, 0]))]
+    if pareto_pick == "fastest_within":
+        # cheapest by the first cost objective among the near-best RMSEs
+        within = np.flatnonzero(
+            values[:, 0] <= values[:, 0].min() * (1 + rmse_tolerance)
+        )
+        return front[int(within[np.lexsort((values[within, 0], values[within, 1]))[0]])]
+    # knee: closest to the ideal point once every objective is scaled to [0, 1]
+    spread = values.max(axis=0) - values.min(axis=0)
+    scaled = (values - values.min(axis=0)) / np.where(spread > 0, spread, 1)
+    return front[int(np.argmin(np.linalg.norm(scaled, axis=1)))]
+
+
+def select_study_trial(
+    study: optuna.Study,
+    study_mode: str,
+    pareto_pick: str = "knee",
+    rmse_tolerance: float = 0.02,
+) -> FrozenTrial:
+    """The trial whose params train the final model.
+
+    `single` takes the best RMSE, `constrained` the best RMSE within the
+    cost limits. `multi_objective` picks from the Pareto front (RMSE first,
+    then the cost objectives): `best_rmse`, `knee` (closest to the ideal
+    point after min-max scaling) or `fastest_within` (lowest first cost
+    objective with an RMSE at most `rmse_tolerance` above the best).
+    """
+    if study_mode == "single":
+        return study.best_trial
+    if study_mode == "constrained":
+        completed = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+        return min(feasible_trials(completed), key=attrgetter("value"))
+    trial = _pick_from_front(study.best_trials, pareto_pick, rmse_tolerance)
+    logger.info(
+        "Picked trial %d (values %s) from a Pareto front of %i trials by '%s'",
+        trial.number,
+        np.round(trial.values, 3).tolist(),
+        len(study.best_trials),
+        pareto_pick,
+    )
+    return trial
@@ -0,0 +1,98 @@
+# dependencies/modeling/trial_result_cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+import sklearn
+from sklearn.base import BaseEstimator
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+
+logger = logging.getLogger(__name__)
+
+# Params that do not change a fitted model's predictions
+VOLATILE_PARAMS = ("n_jobs", "verbose", "warm_start")
+
+
+class TrialResultCache:
+    """Persistent cache of trial evaluation results in a SQLite file.
+
+    A result is keyed by the model class, its resolved params (without
+    VOLATILE_PARAMS), the data it was evaluated on, the CV spec and the
+    scikit-learn version, so a rerun of the same stage on unchanged data
+    reuses every configuration evaluated before. Models without a fixed
+    random_state get the scores of their first evaluation. Connections are
+    opened per call, the cache can be shared by trial threads and forked
+    study workers.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        directory = os.path.dirname(file_path)
+        if directory:
+            mkdir_if_not_exists(directory)
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS trial_results ("
+            "key TEXT PRIMARY KEY, model TEXT, results TEXT, created_at TEXT)"
+        )
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        connection = sqlite3.connect(self.file_path, timeout=60)
+        try:
+            with connection:
+                return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def key(model: BaseEstimator, data_key: str, cv_spec: dict[str, Any]) -> str:
+        params = {
+            k: v for k, v in model.get_params().items() if k not in VOLATILE_PARAMS
+        }
+        spec = json.dumps(
+            {
+                "model": f"{type(model).__module__}.{type(model).__qualname__}",
+                "params": params,
+                "data": data_key,
+                "cv": cv_spec,
+                "sklearn": sklearn.__version__,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(spec.encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        rows = self._execute("SELECT results FROM trial_results WHERE key = ?", (key,))
+        if not rows:
+            return None
+        return {
+            k: np.asarray(v) if isinstance(v, list) else v
+            for k, v in json.loads(rows[0][0]).items()
+        }
+
+    def put(self, key: str, model: BaseEstimator, results: dict[str, Any]) -> None:
+        serialized = json.dumps(
+            {
+                k: v.tolist() if isinstance(v, np.ndarray) else v
+                for k, v in results.items()
+            },
+            default=float,
+        )
+        self._execute(
+            "INSERT OR REPLACE INTO trial_results VALUES (?, ?, ?, ?)",
+            (
+                key,
+                type(model).__name__,
+                serialized,
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        logger.debug("Cached trial results under %s", key[:12])
@@ -0,0 +1,155 @@
+# dependencies/pandas_specific/dtype_schema.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from dependencies.general.mkdir_if_not_exists import mkdir_if_not_exists
+
+logger = logging.getLogger(__name__)
+
+DTYPE_SCHEMA_VERSION = 1
+
+
+def _is_string_like(series: pd.Series) -> bool:
+    return (
+        pd.api.types.is_object_dtype(series.dtype)
+        or pd.api.types.is_string_dtype(series.dtype)
+        or isinstance(series.dtype, pd.CategoricalDtype)
+    )
+
+
+def infer_dtype_schema(
+    df: pd.DataFrame,
+    categorical_max_unique: int,
+    categorical_max_unique_ratio: float,
+    downcast_integers: bool,
+    downcast_floats: bool,
+    exclude_cols: list[str] | None = None,
+) -> dict[str, Any]:
+    """Smallest dtypes that hold the values of df.
+
+    String columns with at most `categorical_max_unique` distinct values, and
+    at most `categorical_max_unique_ratio` distinct values per row, become
+    `category` with their sorted categories stored in the schema. Integers
+    shrink to the smallest signed type that fits, floats to float32 only
+    with `downcast_floats`.
+    """
+    exclude = set(exclude_cols or [])
+    columns: dict[str, dict[str, Any]] = {}
+    for col in df.columns:
+        if col in exclude:
+            continue
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if _is_string_like(series):
+            categories = series.astype("category").cat.categories
+            n_unique = len(categories)
+            if (
+                n_unique <= categorical_max_unique
+                and n_unique <= categorical_max_unique_ratio * max(len(series), 1)
+            ):
+                columns[col] = {
+                    "dtype": "category",
+                    "categories": categories.tolist(),
+                }
+        elif downcast_integers and pd.api.types.is_integer_dtype(series.dtype):
+            columns[col] = {
+                "dtype": str(pd.to_numeric(series, downcast="integer").dtype),
+            }
+        elif downcast_floats and pd.api.types.is_float_dtype(series.dtype):
+            columns[col] = {"dtype": "float32"}
+    return {"version": DTYPE_SCHEMA_VERSION, "columns": columns}
+
+
+def widen_numeric(series: pd.Series) -> pd.Series:
+    """`series` as int64 or float64 if it is a narrower numeric column.
+
+    Arithmetic on columns downcast by the schema (e.g. int16 * int16) would
+    overflow or round in the narrow type, widening first gives the results
+    of the data before optimize_dtypes. Nullable columns stay nullable.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+        return series
+    nullable = not isinstance(dtype, np.dtype)
+    if np.dtype(getattr(dtype, "numpy_dtype", dtype)).itemsize >= 8:
+        return series
+    if pd.api.types.is_integer_dtype(dtype):
+        return series.astype("Int64" if nullable else "int64")
+    return series.astype("Float64" if nullable else "float64")
+
+
+def save_dtype_schema(schema: dict[str, Any], dtype_schema_file_path: str) -> None:
+    mkdir_if_not_exists(os.path.dirname(dtype_schema_file_path))
+    with open(dtype_schema_file_path, "w") as f:
+        json.dump(schema, f, indent=4)
+    logger.info("Saved dtype schema to %s", dtype_schema_file_path)
+
+
+def load_dtype_schema(dtype_schema_file_path: str) -> dict[str, Any]:
+    with open(dtype_schema_file_path) as f:
+        schema = json.load(f)
+    logger.info("Loaded dtype schema from %s", dtype_schema_file_path)
+    return schema
+
+
+def categorical_read_dtypes(schema: dict[str, Any]) -> dict[str, str]:
+    """`dtype` argument for readers that parse strings straight to category."""
+    return {
+        col: "category"
+        for col, spec in schema["columns"].items()
+        if spec["dtype"] == "category"
+    }
+
+
+def _categorical_dtype(series: pd.Series, col: str, categories: list) -> Any:
+    present = series.dropna().unique()
+    unknown = pd.Index(present).difference(pd.Index(categories))
+    if len(unknown):
+        logger.warning(
+            "Column '%s' has %d values missing from the dtype schema, appending them.",
+            col,
+            len(unknown),
+        )
+        categories = [*categories, *unknown.tolist()]
+    return pd.CategoricalDtype(categories=categories)
+
+
+def apply_dtype_schema(df: pd.DataFrame, schema: dict[str, Any]) -> pd.DataFrame:
+    """Cast the columns of df listed in the schema.
+
+    Category columns get the stored categories, so their codes are the same
+    in every data version. Numeric casts are skipped when the current values
+    would not survive them (missing values in an integer column, out of range
+    values, non float columns for float casts).
+    """
+    dtypes = {}
+    for col, spec in schema["columns"].items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        dtype = spec["dtype"]
+        if dtype == "category":
+            if _is_string_like(series):
+                dtypes[col] = _categorical_dtype(series, col, spec["categories"])
+        elif np.dtype(dtype).kind == "i":
+            if pd.api.types.is_integer_dtype(series.dtype) and not series.empty:
+                info = np.iinfo(dtype)
+                if info.min <= series.min() and series.max() <= info.max:
+                    dtypes[col] = dtype
+            elif series.empty:
+                dtypes[col] = dtype
+        elif np.dtype(dtype).kind == "f" and pd.api.types.is_float_dtype(series.dtype):
+            dtypes[col] = dtype
+
+    skipped = sorted(set(schema["columns"]) & set(df.columns) - set(dtypes))
+    if skipped:
+        logger.debug("Kept dtypes of %s, the schema casts would not fit.", skipped)
+    return df.astype(dtypes) if dtypes else df
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def panel() -> pd.DataFrame:
+    """Shuffled facility/DRG/year panel with a categorical key and NaNs."""
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "facility_id": rng.integers(0, 30, n),
+            "apr_drg_code": pd.Categorical(rng.integers(0, 8, n).astype(str)),
+            "year": rng.integers(2009, 2018, n),
+            "w_mean_cost": rng.normal(1e4, 2e3, n),
+            "sum_discharges": rng.integers(1, 500, n).astype(float),
+        }
+    ).drop_duplicates(["facility_id", "apr_drg_code", "year"])
+    df.loc[df.sample(frac=0.05, random_state=0).index, "w_mean_cost"] = np.nan
+    return df.sample(frac=1.0, random_state=1)
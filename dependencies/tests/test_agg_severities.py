@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dependencies.transformations.agg_severities import agg_severities
+
+GROUPBY_COLS = ["year", "facility_id", "apr_drg_code"]
+MEAN_COLS = ["mean_charge", "total_mean_profit"]
+MEDIAN_COLS = ["median_charge", "total_median_profit"]
+
+
+@pytest.fixture
+def severities() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 4000
+    return pd.DataFrame(
+        {
+            "year": rng.integers(2010, 2013, n),
+            "facility_id": rng.integers(0, 20, n),
+            "apr_drg_code": rng.integers(0, 10, n),
+            "apr_severity_of_illness_code": rng.integers(1, 5, n),
+            "discharges": rng.integers(1, 30000, n),
+            "mean_charge": rng.normal(5e4, 1e4, n),
+            "total_mean_profit": rng.normal(1e3, 5e2, n),
+            "median_charge": rng.normal(4e4, 1e4, n),
+            "total_median_profit": rng.normal(8e2, 5e2, n),
+        }
+    )
+
+
+def run(df: pd.DataFrame) -> pd.DataFrame:
+    return agg_severities(
+        df,
+        weighted_mean_weight_col_name="discharges",
+        weighted_median_weight_col_name="discharges",
+        discharges_col_name="discharges",
+        sum_discharges_key="sum_discharges",
+        severity_levels=[1, 2, 3, 4],
+        apr_severity_of_illness_code_col_name="apr_severity_of_illness_code",
+        mean_cols=MEAN_COLS,
+        median_cols=MEDIAN_COLS,
+        groupby_cols=GROUPBY_COLS,
+        as_index=False,
+    )
+
+
+def weighted_median(group: pd.DataFrame, col: str) -> float:
+    group = group.sort_values(col, kind="stable")
+    cumsum = group["discharges"].cumsum()
+    return group[col].to_numpy()[np.argmax(cumsum >= cumsum.iloc[-1] / 2.0)]
+
+
+def test_matches_groupby_reference(severities: pd.DataFrame) -> None:
+    result = run(severities).set_index(GROUPBY_COLS)
+    groups = severities.groupby(GROUPBY_COLS)
+    total = groups["discharges"].sum()
+
+    pd.testing.assert_series_equal(
+        result["sum_discharges"], total.astype("float64"), check_names=False
+    )
+    level_1 = (
+        severities["discharges"]
+        .where(severities["apr_severity_of_illness_code"] == 1, 0)
+        .groupby([severities[c] for c in GROUPBY_COLS])
+        .sum()
+    )
+    np.testing.assert_allclose(result["severity_1_portion"], level_1 / total)
+    for col in MEAN_COLS:
+        weighted = (severities[col] * severities["discharges"]).groupby(
+            [severities[c] for c in GROUPBY_COLS]
+        )
+        np.testing.assert_allclose(result[f"w_{col}"], weighted.sum() / total)
+    for col in MEDIAN_COLS:
+        expected = groups[["discharges", col]].apply(weighted_median, col=col)
+        np.testing.assert_array_equal(result[f"w_{col}"], expected)
+
+
+def test_downcast_weights_do_not_overflow(severities: pd.DataFrame) -> None:
+    """int16 discharges summing past 32767 per group (optimize_dtypes)."""
+    expected = run(severities)
+    downcast = severities.assign(discharges=severities["discharges"].astype("int16"))
+    result = run(downcast)
+
+    assert (result["sum_discharges"] > np.iinfo(np.int16).max).any()
+    pd.testing.assert_frame_equal(result, expected)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dependencies.metadata.calculate_metadata import (
+    MetadataAccumulator,
+    calculate_metadata,
+)
+
+VOLATILE_KEYS = ("timestamp",)
+
+
+@pytest.fixture
+def data_file(tmp_path: Path) -> str:
+    path = tmp_path / "v1.csv"
+    path.write_text("placeholder\n")
+    return str(path)
+
+
+def frame(n: int = 10_000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "facility_id": rng.integers(0, 300, n),
+            "charge": rng.normal(size=n),
+            "name": pd.Series(rng.integers(0, 50, n)).astype(str),
+        }
+    )
+
+
+def chunked_metadata(df: pd.DataFrame, data_file: str, size: int) -> dict:
+    accumulator = MetadataAccumulator()
+    for start in range(0, len(df), size):
+        accumulator.update(df.iloc[start : start + size])
+    return accumulator.metadata(data_file)
+
+
+def stable(metadata: dict) -> dict:
+    return {k: v for k, v in metadata.items() if k not in VOLATILE_KEYS}
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        None,
+        pd.Index(np.arange(10_000) * 2),
+        pd.date_range("2020-01-01", periods=10_000, freq="h"),
+    ],
+)
+def test_chunks_match_whole_frame(data_file: str, index: pd.Index | None) -> None:
+    df = frame() if index is None else frame().set_axis(index)
+    expected = stable(calculate_metadata(df, data_file))
+    result = stable(chunked_metadata(df, data_file, 1500))
+
+    # Only a single frame still knows the frequency of a DatetimeIndex
+    result["index"].pop("frequency", None)
+    expected["index"].pop("frequency", None)
+    assert result == expected
+
+
+def test_range_index_bounds(data_file: str) -> None:
+    metadata = chunked_metadata(frame(), data_file, 3000)
+
+    assert metadata["index"] == {
+        "index_type": "RangeIndex",
+        "name": None,
+        "start": 0,
+        "stop": 10_000,
+        "step": 1,
+    }
+    assert metadata["num_rows"] == 10_000
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.inspection import permutation_importance
+from sklearn.linear_model import Ridge
+
+from dependencies.modeling.compute_permutation_importances import (
+    compute_permutation_importances,
+)
+
+
+@pytest.fixture
+def data() -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        rng.normal(size=(500, 4)),
+        columns=["charge", "charge_lag1", "cost", "discharges"],
+        index=np.arange(500) * 3,
+    )
+    y = pd.Series(X.to_numpy() @ np.array([3.0, 1.0, -2.0, 0.5]), index=X.index)
+    return X, y + rng.normal(size=len(X))
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+@pytest.mark.parametrize(
+    "model",
+    [Ridge(), RandomForestRegressor(n_estimators=20, n_jobs=-1, random_state=0)],
+)
+def test_matches_sklearn_permutation_importance(data, model, n_jobs) -> None:
+    X, y = data
+    model.fit(X, y)
+    expected = permutation_importance(model, X, y, n_repeats=4, random_state=7)
+
+    result = compute_permutation_importances(
+        model, X, y, random_state=7, n_repeats=4, n_jobs=n_jobs
+    )
+
+    np.testing.assert_allclose(result["importances"], expected.importances_mean)
+    np.testing.assert_allclose(result["importances_std"], expected.importances_std)
+    if hasattr(model, "n_jobs"):
+        assert model.n_jobs == -1
+
+
+def test_groups_permute_their_columns_together(data) -> None:
+    X, y = data
+    model = Ridge().fit(X, y)
+
+    result = compute_permutation_importances(
+        model,
+        X,
+        y,
+        feature_groups={"charge": ["charge", "charge_lag1"], "cost": ["cost"]},
+    )
+
+    assert list(result["feature"]) == ["charge", "cost"]
+    assert list(result["columns"]) == ["charge,charge_lag1", "cost"]
+    assert (result["importances"] > 0).all()
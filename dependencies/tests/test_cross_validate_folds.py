@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import TimeSeriesSplit, cross_validate
+
+from dependencies.modeling.cross_validate_folds import cross_validate_folds
+
+SCORING = {"rmse": "neg_root_mean_squared_error", "r2": "r2"}
+
+
+@pytest.fixture
+def data() -> tuple[np.ndarray, np.ndarray, list]:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1200, 5))
+    y = X @ np.arange(5.0) + rng.normal(size=len(X))
+    return X, y, list(TimeSeriesSplit(n_splits=4).split(X))
+
+
+@pytest.mark.parametrize("n_jobs", [None, 1, 2])
+@pytest.mark.parametrize(
+    "model",
+    [Ridge(alpha=1.0), RandomForestRegressor(n_estimators=10, random_state=0)],
+)
+def test_matches_sklearn_cross_validate(data, model, n_jobs) -> None:
+    X, y, folds = data
+    expected = cross_validate(model, X, y, cv=folds, scoring=SCORING)
+
+    result = cross_validate_folds(model, X, y, folds, n_jobs=n_jobs)
+
+    np.testing.assert_allclose(result["test_rmse"], expected["test_rmse"])
+    np.testing.assert_allclose(result["test_r2"], expected["test_r2"])
+    assert len(result["fit_time"]) == len(folds)
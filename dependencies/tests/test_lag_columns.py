@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from dependencies.transformations.lag_columns import lag_columns
+
+GROUP_COLS = ["facility_id", "apr_drg_code"]
+TIME_COLS = [*GROUP_COLS, "year"]
+COLUMNS = ["w_mean_cost", "sum_discharges"]
+
+
+def reference(df: pd.DataFrame, lag_periods: list[int]) -> pd.DataFrame:
+    """One grouped shift per column and horizon."""
+    df = df.sort_values(by=TIME_COLS).reset_index(drop=True)
+    for periods in lag_periods:
+        for col in COLUMNS:
+            df[f"{col}_lag{periods}"] = df.groupby(GROUP_COLS, observed=True)[
+                col
+            ].shift(periods)
+    return df
+
+
+@pytest.mark.parametrize("lag_periods", [[1], [1, 2, 3]])
+def test_matches_per_column_grouped_shift(
+    panel: pd.DataFrame, lag_periods: list[int]
+) -> None:
+    result = lag_columns(
+        panel,
+        columns_to_transform=COLUMNS,
+        groupby_time_based_cols=TIME_COLS,
+        drop=True,
+        groupby_lag_cols=GROUP_COLS,
+        lag_suffix="_lag",
+        lag_periods=lag_periods,
+    )
+
+    expected = reference(panel, lag_periods)
+    pd.testing.assert_frame_equal(result, expected[result.columns])
+    assert sorted(result.columns) == sorted(expected.columns)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+from dependencies.modeling.measure_model_cost import (
+    estimate_model_size,
+    measure_model_cost,
+)
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        RandomForestRegressor(n_estimators=20, n_jobs=2, random_state=0),
+        DecisionTreeRegressor(random_state=0),
+        Ridge(),
+    ],
+)
+def test_estimated_size_matches_pickle(model) -> None:
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 6))
+    model.fit(X, X.sum(axis=1) + rng.normal(size=len(X)))
+
+    pickled = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    costs = measure_model_cost(model, X[:100])
+
+    assert estimate_model_size(model) == pytest.approx(pickled, rel=0.01)
+    assert costs["model_size_mb"] == pytest.approx(pickled / 1e6, rel=0.01)
+    assert costs["predict_ms_per_1k_rows"] > 0
+    assert model.get_params().get("n_jobs") in (None, 2)
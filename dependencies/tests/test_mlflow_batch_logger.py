@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from mlflow.entities import Metric, Param, RunTag
+
+from dependencies.logging_utils import mlflow_batch_logger
+from dependencies.logging_utils.mlflow_batch_logger import (
+    MlflowBatchLogger,
+    RunRecord,
+    batch_chunks,
+)
+
+
+def test_batch_chunks_stay_within_log_batch_limits() -> None:
+    metrics = [Metric(f"m{i}", 1.0, 0, i) for i in range(2500)]
+    params = [Param(f"p{i}", "1") for i in range(150)]
+    tags = [RunTag(f"t{i}", "1") for i in range(30)]
+
+    chunks = list(batch_chunks(metrics, params, tags))
+
+    for m, p, t in chunks:
+        assert len(m) <= 1000
+        assert len(p) <= 100
+        assert len(t) <= 100
+        assert len(m) + len(p) + len(t) <= 1000
+    assert [m for chunk in chunks for m in chunk[0]] == metrics
+    assert [p for chunk in chunks for p in chunk[1]] == params
+    assert [t for chunk in chunks for t in chunk[2]] == tags
+
+
+def test_batch_chunks_of_an_empty_run() -> None:
+    assert list(batch_chunks([], [], [])) == []
+
+
+class FailingClient:
+    """Fails every run, the first one only once the test has queued more."""
+
+    def __init__(self) -> None:
+        self.created: list[tuple[str, str, dict]] = []
+        self.release = threading.Event()
+
+    def create_run(self, experiment_id: str, run_name: str, tags: dict) -> None:
+        self.created.append((experiment_id, run_name, tags))
+        self.release.wait(timeout=10)
+        msg = "tracking server unavailable"
+        raise OSError(msg)
+
+
+def test_background_error_is_raised_and_queued_runs_are_reported(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    client = FailingClient()
+    monkeypatch.setattr(mlflow_batch_logger, "MlflowClient", lambda: client)
+    run_logger = MlflowBatchLogger("0", asynchronous=True, max_queue_size=10)
+    run_logger.log_run(RunRecord(run_name="first"))
+    run_logger.log_run(RunRecord(run_name="second"))
+    client.release.set()
+
+    with pytest.raises(OSError, match="unavailable"):
+        run_logger.flush()
+    with pytest.raises(OSError, match="unavailable"):
+        run_logger.log_run(RunRecord(run_name="third"))
+    with pytest.raises(OSError, match="unavailable"):
+        run_logger.close()
+    assert [run_name for _, run_name, _ in client.created] == ["first"]
+    assert "Dropped MLflow run 'second'" in caplog.text
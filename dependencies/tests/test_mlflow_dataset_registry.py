@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+
+from dependencies.logging_utils.mlflow_dataset_registry import (
+    REFERENCE_FIELDS,
+    MlflowDatasetRegistry,
+    datasets_record,
+)
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({"year": [2010, 2011, 2012], "x": [1.0, None, 3.0]})
+
+
+def test_reference_drops_schema_and_profile() -> None:
+    dataset = MlflowDatasetRegistry(source="data.csv").register(_frame())
+    reference = dataset.reference()
+
+    assert dataset.schema is not None
+    assert dataset.profile is not None
+    assert set(reference.to_dict()) == set(REFERENCE_FIELDS)
+    assert reference.digest == dataset.digest
+    assert reference.name == dataset.name
+    assert reference.registry_key == dataset.registry_key
+    assert reference.schema is None
+    assert reference.profile is None
+
+
+def test_datasets_record_logs_frame_and_splits_in_full() -> None:
+    registry = MlflowDatasetRegistry(source="data.csv")
+    dataset = registry.register(_frame())
+    split = registry.register_split(
+        dataset, _frame().head(2), name="X_train", split={"year_range": [2010, 2011]}
+    )
+    record = datasets_record(dataset, {"X_train": split}, {"model_tag": "Ridge"})
+
+    assert record.run_name == "datasets"
+    assert record.inputs == [
+        (dataset, "study", {"model_tag": "Ridge"}),
+        (split, "study", {"model_tag": "Ridge", "split": "X_train"}),
+    ]
+    assert all(d.schema is not None for d, _, _ in record.inputs)
+
+
+def test_registry_file_round_trip(tmp_path: Path) -> None:
+    file_path = str(tmp_path / "registry.json")
+    registry = MlflowDatasetRegistry(source="data.csv", registry_file_path=file_path)
+    dataset = registry.register(_frame())
+    split = registry.register_split(
+        dataset, _frame().head(2), name="X_train", split={"year_range": [2010, 2011]}
+    )
+    registry.save()
+
+    reloaded = MlflowDatasetRegistry(source="data.csv", registry_file_path=file_path)
+    assert reloaded.register(_frame()).to_dict() == dataset.to_dict()
+    assert (
+        reloaded.register_split(
+            dataset,
+            _frame().head(2),
+            name="X_train",
+            split={"year_range": [2010, 2011]},
+        ).digest
+        == split.digest
+    )
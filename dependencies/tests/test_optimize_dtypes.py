@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dependencies.io.read_dataframe import read_dataframe
+from dependencies.io.write_dataframe import write_dataframe
+from dependencies.pandas_specific.dtype_schema import widen_numeric
+from dependencies.transformations.median_profit import median_profit
+from dependencies.transformations.optimize_dtypes import optimize_dtypes
+from dependencies.transformations.total_median_profit import total_median_profit
+
+SCHEMA_OPTIONS = {
+    "categorical_max_unique": 5000,
+    "categorical_max_unique_ratio": 0.5,
+    "downcast_integers": True,
+    "downcast_floats": False,
+    "exclude_cols": [],
+}
+
+
+def sparcs_like(n: int = 5000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "year": rng.integers(2009, 2017, n),
+            "facility_name": rng.choice([f"Hospital {i}" for i in range(40)], n),
+            "discharges": rng.integers(1, 3000, n),
+            "median_charge": rng.integers(1000, 30000, n),
+            "median_cost": rng.integers(500, 30000, n),
+        }
+    )
+
+
+def derive(df: pd.DataFrame) -> pd.DataFrame:
+    df = median_profit(df, "median_profit", "median_charge", "median_cost")
+    return total_median_profit(df, "total_median_profit", "median_profit", "discharges")
+
+
+def test_schema_round_trips_through_csv(tmp_path: Path) -> None:
+    schema_path = str(tmp_path / "dtype_schema.json")
+    optimized = optimize_dtypes(sparcs_like(), schema_path, **SCHEMA_OPTIONS)
+    data_path = str(tmp_path / "v1.csv")
+    write_dataframe(optimized, data_path, include_index=False, file_type="csv")
+
+    read = read_dataframe(data_path, "csv", dtype_schema_file_path=schema_path)
+
+    assert read["discharges"].dtype == np.int16
+    assert isinstance(read["facility_name"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(read, optimized)
+
+
+def test_downcast_columns_derive_the_same_values(tmp_path: Path) -> None:
+    df = sparcs_like()
+    optimized = optimize_dtypes(
+        df.copy(), str(tmp_path / "schema.json"), **SCHEMA_OPTIONS
+    )
+
+    expected = derive(df)
+    result = derive(optimized)
+
+    assert (expected["total_median_profit"].abs() > np.iinfo(np.int16).max).any()
+    for col in ("median_profit", "total_median_profit"):
+        pd.testing.assert_series_equal(result[col], expected[col])
+
+
+def test_widen_numeric_keeps_wide_and_non_numeric_columns() -> None:
+    assert widen_numeric(pd.Series([1], dtype="int16")).dtype == np.int64
+    assert widen_numeric(pd.Series([1], dtype="Int16")).dtype == "Int64"
+    assert widen_numeric(pd.Series([1.5], dtype="float32")).dtype == np.float64
+    for series in (pd.Series([1]), pd.Series(["a"]), pd.Series([True])):
+        assert widen_numeric(series).dtype == series.dtype
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dependencies.metadata.profile_columns import ColumnProfiler, profile_columns
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    n = 20_000
+    return pd.DataFrame(
+        {
+            "facility_id": rng.integers(0, 300, n),
+            "charge": rng.normal(size=n),
+            "name": pd.Series(rng.integers(0, 50, n)).astype(str),
+        }
+    )
+
+
+def chunked(df: pd.DataFrame, size: int, **kwargs) -> dict:
+    profiler = ColumnProfiler(**kwargs)
+    for start in range(0, len(df), size):
+        profiler.update(df.iloc[start : start + size])
+    return profiler.to_dict()
+
+
+def test_chunks_match_whole_frame(frame: pd.DataFrame) -> None:
+    expected = profile_columns(frame)
+
+    assert chunked(frame, 3000) == expected
+    assert expected["facility_id"]["unique_values"] == frame["facility_id"].nunique()
+
+
+def test_merge_matches_whole_frame(frame: pd.DataFrame) -> None:
+    left = ColumnProfiler().update(frame.iloc[:7000])
+    right = ColumnProfiler().update(frame.iloc[7000:])
+
+    assert left.merge(right).to_dict() == profile_columns(frame)
+
+
+def test_exact_mode_switches_to_sketch_past_limit(frame: pd.DataFrame) -> None:
+    profile = chunked(frame, 3000, exact_distinct_limit=1000)
+    profiler = ColumnProfiler(exact_distinct_limit=1000).update(frame)
+
+    assert isinstance(profiler.distinct["facility_id"], np.ndarray)
+    assert profile["facility_id"]["unique_values"] == 300
+    assert not profile["facility_id"]["unique_values_approximate"]
+    assert profile["charge"]["unique_values"] == pytest.approx(len(frame), rel=0.05)
+    assert profile["charge"]["unique_values_approximate"]
+
+
+def test_exact_mode_is_exact_without_limit(frame: pd.DataFrame) -> None:
+    profile = chunked(frame, 3000)
+
+    assert profile["charge"]["unique_values"] == frame["charge"].nunique()
+    assert not any(c["unique_values_approximate"] for c in profile.values())
+
+
+def test_approximate_mode_marks_columns(frame: pd.DataFrame) -> None:
+    profile = profile_columns(frame, distinct_count_mode="approximate")
+
+    assert all(c["unique_values_approximate"] for c in profile.values())
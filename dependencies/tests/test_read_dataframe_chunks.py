@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dependencies.io.dataframe_chunk_writer import DataFrameChunkWriter
+from dependencies.io.read_dataframe import read_dataframe
+from dependencies.io.read_dataframe_chunks import read_dataframe_chunks
+from dependencies.io.write_dataframe import write_dataframe
+from dependencies.metadata.calculate_metadata import (
+    MetadataAccumulator,
+    calculate_metadata,
+)
+
+CHUNK_SIZE_ROWS = 400
+
+
+def late_missing_frame(n: int = 2000) -> pd.DataFrame:
+    """An integer column whose first missing value is past the first chunk."""
+    rng = np.random.default_rng(0)
+    discharges = rng.integers(1, 3000, n).astype(float)
+    discharges[n - 10] = np.nan
+    return pd.DataFrame(
+        {
+            "facility_id": rng.integers(0, 300, n),
+            "discharges": discharges,
+            "name": pd.Series(rng.integers(0, 50, n)).astype(str),
+        }
+    )
+
+
+def write_version(df: pd.DataFrame, directory: Path, file_type: str) -> str:
+    path = str(directory / f"v1.{file_type}")
+    write_dataframe(df, path, include_index=False, file_type=file_type)
+    return path
+
+
+def rewrite_in_chunks(chunks, path: str) -> tuple[bytes, MetadataAccumulator]:
+    accumulator = MetadataAccumulator()
+    with closing(DataFrameChunkWriter(path, include_index=False)) as writer:
+        for chunk in chunks:
+            accumulator.update(chunk)
+            writer.write(chunk)
+    return Path(path).read_bytes(), accumulator
+
+
+def test_csv_chunks_use_the_recorded_dtypes(tmp_path: Path) -> None:
+    path = write_version(late_missing_frame(), tmp_path, "csv")
+    whole = read_dataframe(path, "csv")
+    metadata_path = tmp_path / "v1_metadata.json"
+    metadata_path.write_text(json.dumps(calculate_metadata(whole, path)))
+
+    chunks = list(
+        read_dataframe_chunks(
+            path,
+            "csv",
+            chunk_size_rows=CHUNK_SIZE_ROWS,
+            input_metadata_file_path=str(metadata_path),
+        )
+    )
+    written, accumulator = rewrite_in_chunks(chunks, str(tmp_path / "out.csv"))
+    write_dataframe(whole, str(tmp_path / "whole.csv"), include_index=False)
+
+    assert all(chunk["discharges"].dtype == np.float64 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), whole)
+    assert written == (tmp_path / "whole.csv").read_bytes()
+    assert (
+        accumulator.metadata(path)["df_hash"]
+        == calculate_metadata(whole, path)["df_hash"]
+    )
+
+
+def test_csv_chunks_without_metadata_widen_to_nullable(tmp_path: Path) -> None:
+    df = late_missing_frame().astype({"discharges": "Int64"})
+    path = write_version(df, tmp_path, "csv")
+
+    chunks = list(read_dataframe_chunks(path, "csv", CHUNK_SIZE_ROWS))
+
+    assert {str(chunk["discharges"].dtype) for chunk in chunks} == {"Int64"}
+    assert {str(chunk["facility_id"].dtype) for chunk in chunks} == {"Int64"}
+    assert chunks[-1]["discharges"].isna().sum() == 1
+
+
+@pytest.mark.parametrize("file_type", ["csv", "parquet", "feather"])
+def test_chunks_concatenate_to_the_whole_file(tmp_path: Path, file_type: str) -> None:
+    path = write_version(late_missing_frame(), tmp_path, file_type)
+    whole = read_dataframe(path, file_type)
+    metadata_path = tmp_path / "v1_metadata.json"
+    metadata_path.write_text(json.dumps(calculate_metadata(whole, path)))
+
+    chunks = read_dataframe_chunks(
+        path,
+        file_type,
+        chunk_size_rows=CHUNK_SIZE_ROWS,
+        input_metadata_file_path=str(metadata_path),
+    )
+
+    pd.testing.assert_frame_equal(pd.concat(list(chunks)), whole)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from dependencies.io.read_dataframe import read_dataframe
+from dependencies.io.write_dataframe import write_dataframe
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "facility_id": pd.array([1, 2, 3, 4], dtype="int32"),
+            "year": pd.array([2010, 2011, 2012, 2013], dtype="int16"),
+            "drg": pd.Categorical(["a", "b", "a", "c"]),
+            "profit": [1.5, None, 3.25, -4.0],
+            "name": ["x", "y", None, "z"],
+        }
+    )
+
+
+@pytest.mark.parametrize("file_type", ["parquet", "feather", "arrow"])
+def test_columnar_round_trip_keeps_values_and_dtypes(
+    tmp_path: Path, file_type: str
+) -> None:
+    df = _frame()
+    path = str(tmp_path / "out" / f"data.{file_type}")
+
+    written = write_dataframe(df, path, include_index=False, file_type=file_type)
+    result = read_dataframe(path, file_type=file_type)
+
+    pd.testing.assert_frame_equal(result, df)
+    assert result["drg"].dtype == "category"
+    with open(path, "rb") as f:
+        assert written.hash_sha256 == hashlib.sha256(f.read()).hexdigest()
+    assert written.file_size_bytes == os.path.getsize(path)
+
+
+@pytest.mark.parametrize("compression", ["zstd", None])
+def test_parquet_compression(tmp_path: Path, compression: str | None) -> None:
+    df = _frame()
+    path = str(tmp_path / "data.parquet")
+
+    write_dataframe(
+        df, path, include_index=False, file_type="parquet", compression=compression
+    )
+
+    pd.testing.assert_frame_equal(read_dataframe(path, file_type="parquet"), df)
+
+
+def test_unsupported_file_type(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unsupported file_type"):
+        write_dataframe(
+            _frame(), str(tmp_path / "data.xlsx"), include_index=False, file_type="xlsx"
+        )
+    with pytest.raises(ValueError, match="Unsupported file_type"):
+        read_dataframe(str(tmp_path / "data.xlsx"), file_type="xlsx")
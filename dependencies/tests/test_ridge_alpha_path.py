@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import TimeSeriesSplit
+
+from dependencies.modeling.ridge_alpha_path import (
+    decompose_ridge_folds,
+    ridge_alpha_grid,
+    ridge_alpha_path_cv,
+)
+
+
+@pytest.fixture
+def data() -> tuple[np.ndarray, np.ndarray, list]:
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=3.0, size=(800, 6))
+    y = X @ np.arange(6.0) + 10 + rng.normal(size=len(X))
+    return X, y, list(TimeSeriesSplit(n_splits=3).split(X))
+
+
+def test_alpha_path_matches_sklearn_ridge(data) -> None:
+    X, y, folds = data
+    alphas = ridge_alpha_grid({"low": 1e-3, "high": 1e3, "log": True}, 7)
+
+    results = ridge_alpha_path_cv(decompose_ridge_folds(X, y, folds), alphas)
+
+    for i, (train_idx, test_idx) in enumerate(folds):
+        for j, alpha in enumerate(alphas):
+            model = Ridge(alpha=alpha).fit(X[train_idx], y[train_idx])
+            y_pred = model.predict(X[test_idx])
+            expected_rmse = np.sqrt(mean_squared_error(y[test_idx], y_pred))
+            assert results["test_rmse"][i, j] == pytest.approx(expected_rmse)
+            assert results["test_r2"][i, j] == pytest.approx(
+                r2_score(y[test_idx], y_pred)
+            )
+
+
+def test_alpha_grid_spans_the_range() -> None:
+    log_grid = ridge_alpha_grid({"low": 0.01, "high": 100, "log": True}, 5)
+    linear_grid = ridge_alpha_grid({"low": 0, "high": 1}, 3)
+
+    np.testing.assert_allclose(log_grid, [0.01, 0.1, 1, 10, 100])
+    np.testing.assert_allclose(linear_grid, [0, 0.5, 1])
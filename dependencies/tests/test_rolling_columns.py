@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from dependencies.transformations.rolling_columns import (
+    rolling_column_name,
+    rolling_columns,
+)
+
+GROUP_COLS = ["facility_id", "apr_drg_code"]
+TIME_COLS = [*GROUP_COLS, "year"]
+COLUMNS = ["w_mean_cost", "sum_discharges"]
+WINDOW = 3
+
+
+def run(df: pd.DataFrame, aggregations: list[str]) -> pd.DataFrame:
+    return rolling_columns(
+        df,
+        columns_to_transform=COLUMNS,
+        groupby_time_based_cols=TIME_COLS,
+        drop=True,
+        groupby_rolling_cols=GROUP_COLS,
+        rolling_str="_rolling",
+        window=WINDOW,
+        shift_periods=1,
+        min_periods=1,
+        inplace=False,
+        aggregations=aggregations,
+        ewm_span=WINDOW,
+    )
+
+
+def reference(df: pd.DataFrame, aggregations: list[str]) -> pd.DataFrame:
+    """One grouped transform per column and aggregation, `mean` included."""
+    df = df.sort_values(by=TIME_COLS).reset_index(drop=True)
+    for aggregation in aggregations:
+        for col in COLUMNS:
+
+            def roll(s: pd.Series, aggregation: str = aggregation) -> pd.Series:
+                shifted = s.shift(1)
+                if aggregation == "ewm":
+                    return shifted.ewm(span=WINDOW, min_periods=1).mean()
+                windows = shifted.rolling(window=WINDOW, min_periods=1)
+                return getattr(windows, aggregation)()
+
+            name = rolling_column_name(col, "_rolling", aggregation, WINDOW, WINDOW)
+            df[name] = df.groupby(GROUP_COLS, observed=True)[col].transform(roll)
+    # Rows without any history are dropped by their rolling mean
+    return df.dropna(
+        subset=[
+            rolling_column_name(col, "_rolling", "mean", WINDOW, WINDOW)
+            for col in COLUMNS
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "aggregations", [["mean"], ["mean", "sum", "std", "min", "max", "ewm"]]
+)
+def test_matches_per_column_grouped_transform(
+    panel: pd.DataFrame, aggregations: list[str]
+) -> None:
+    result = run(panel, aggregations)
+
+    expected = reference(panel, aggregations)
+    assert sorted(result.columns) == sorted(expected.columns)
+    pd.testing.assert_frame_equal(result, expected[result.columns])
+
+
+def test_without_mean_drops_rows_missing_any_aggregation(panel: pd.DataFrame) -> None:
+    result = run(panel, ["std", "max"])
+
+    names = [
+        rolling_column_name(col, "_rolling", aggregation, WINDOW, WINDOW)
+        for aggregation in ("std", "max")
+        for col in COLUMNS
+    ]
+    assert not result[names].isna().any().any()
+
+
+def test_unknown_aggregation(panel: pd.DataFrame) -> None:
+    with pytest.raises(ValueError, match="Unsupported rolling aggregations"):
+        run(panel, ["mean", "median"])
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import optuna
+import pytest
+
+from dependencies.modeling.select_study_trial import (
+    feasible_trials,
+    select_study_trial,
+)
+
+# (rmse, predict_ms_per_1k_rows) of a front from accurate and slow to fast
+FRONT = [(100.0, 9.0), (101.0, 4.0), (103.0, 2.0), (130.0, 1.0)]
+DOMINATED = [(104.0, 5.0), (131.0, 3.0)]
+
+
+def study_with(values: list[tuple[float, float]]) -> optuna.Study:
+    study = optuna.create_study(directions=["minimize", "minimize"])
+    distribution = optuna.distributions.IntDistribution(0, len(values))
+    study.add_trials(
+        [
+            optuna.trial.create_trial(
+                params={"i": i},
+                distributions={"i": distribution},
+                values=list(v),
+            )
+            for i, v in enumerate(values)
+        ]
+    )
+    return study
+
+
+@pytest.mark.parametrize(
+    ("pareto_pick", "expected"),
+    [
+        ("best_rmse", (100.0, 9.0)),
+        ("fastest_within", (101.0, 4.0)),
+        ("knee", (103.0, 2.0)),
+    ],
+)
+def test_pareto_pick(pareto_pick: str, expected: tuple[float, float]) -> None:
+    study = study_with(FRONT + DOMINATED)
+
+    trial = select_study_trial(
+        study, "multi_objective", pareto_pick, rmse_tolerance=0.02
+    )
+
+    assert len(study.best_trials) == len(FRONT)
+    assert tuple(trial.values) == expected
+
+
+def test_constrained_takes_best_feasible_trial() -> None:
+    study = optuna.create_study()
+    distribution = optuna.distributions.IntDistribution(0, 2)
+    study.add_trials(
+        [
+            optuna.trial.create_trial(
+                params={"i": i},
+                distributions={"i": distribution},
+                value=value,
+                system_attrs={"constraints": [excess]},
+            )
+            for i, (value, excess) in enumerate([(1.0, 0.5), (2.0, -1.0), (3.0, 0.0)])
+        ]
+    )
+
+    trial = select_study_trial(study, "constrained")
+
+    assert trial.value == 2.0
+    assert len(feasible_trials(study.trials)) == 2
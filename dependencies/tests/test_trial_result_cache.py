@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+from dependencies.modeling.trial_result_cache import TrialResultCache
+
+CV_SPEC = {"cv_splits": 4, "cv_dtype": "float32"}
+
+
+def test_key_ignores_volatile_params_only() -> None:
+    key = TrialResultCache.key(
+        RandomForestRegressor(n_estimators=10, n_jobs=1), "data", CV_SPEC
+    )
+
+    assert key == TrialResultCache.key(
+        RandomForestRegressor(n_estimators=10, n_jobs=-1, verbose=1, warm_start=True),
+        "data",
+        CV_SPEC,
+    )
+    assert key != TrialResultCache.key(
+        RandomForestRegressor(n_estimators=11), "data", CV_SPEC
+    )
+    assert key != TrialResultCache.key(
+        RandomForestRegressor(n_estimators=10), "other data", CV_SPEC
+    )
+    assert key != TrialResultCache.key(
+        RandomForestRegressor(n_estimators=10), "data", {**CV_SPEC, "cv_splits": 5}
+    )
+
+
+def test_key_distinguishes_model_classes() -> None:
+    assert TrialResultCache.key(Ridge(), "data", CV_SPEC) != TrialResultCache.key(
+        RandomForestRegressor(), "data", CV_SPEC
+    )
+
+
+def test_results_round_trip(tmp_path: Path) -> None:
+    cache = TrialResultCache(str(tmp_path / "cache" / "trial_result_cache.db"))
+    model = Ridge(alpha=2.0)
+    key = cache.key(model, "data", CV_SPEC)
+    results = {
+        "test_rmse": np.array([-1.5, -2.0]),
+        "fit_time": np.array([0.1, 0.2]),
+        "model_size_mb": np.float64(0.01),
+    }
+
+    assert cache.get(key) is None
+    cache.put(key, model, results)
+    cached = cache.get(key)
+
+    assert cached is not None
+    np.testing.assert_array_equal(cached["test_rmse"], results["test_rmse"])
+    np.testing.assert_array_equal(cached["fit_time"], results["fit_time"])
+    assert cached["model_size_mb"] == 0.01
+    assert TrialResultCache(cache.file_path).get(key) is not None
@@ -3,14 +3,10 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
 
 import numpy as np
 import pandas as pd
 
-if TYPE_CHECKING:
-    from numpy.dtypes import BoolDType
-
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +24,67 @@ class AggSeveritiesConfig:
     as_index: bool
 
 
+def _wide(values: np.ndarray) -> np.ndarray:
+    """`values` as int64 (integers, booleans) or float64, the dtypes pandas
+    sums in. Downcast columns (see optimize_dtypes) would overflow otherwise.
+    """
+    if values.dtype.kind in "biu":
+        return values.astype(np.result_type(values.dtype, np.int64), copy=False)
+    return values.astype(np.float64, copy=False)
+
+
+def _segment_sums(
+    values: np.ndarray, starts: np.ndarray, sizes: np.ndarray
+) -> np.ndarray:
+    """Sum contiguous segments of `values`, NaN counting as 0.
+
+    Segments of equal length are gathered into one 2-D block and summed along
+    the rows, which adds the elements in the same order as `Series.sum` on each
+    segment would. The result is bit-identical to summing group by group. Sums
+    are taken in int64 or float64 whatever the input dtype.
+    """
+    values = _wide(values)
+    if values.dtype.kind == "f":
+        values = np.where(np.isnan(values), 0.0, values)
+    out = np.zeros(len(starts), dtype=values.dtype)
+    for size in np.unique(sizes):
+        if size == 0:
+            continue
+        seg = np.flatnonzero(sizes == size)
+        out[seg] = values[starts[seg][:, None] + np.arange(size)].sum(axis=1)
+    return out
+
+
+def _weighted_medians(
+    values: np.ndarray,
+    weights: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int,
+) -> np.ndarray:
+    """Lower weighted median per group: the smallest value whose cumulative
+    weight reaches half of the group's total weight. One global sort by
+    (group, value) replaces a sort per group.
+    """
+    order = np.lexsort((values, codes))
+    values_sorted = values[order]
+    weights_sorted = pd.Series(_wide(weights)[order])
+    codes_sorted = codes[order]
+
+    sizes = np.bincount(codes_sorted, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    half = _segment_sums(weights_sorted.to_numpy(), starts, sizes) / 2.0
+
+    cumsum = weights_sorted.groupby(codes_sorted, sort=False).cumsum().to_numpy()
+    with np.errstate(invalid="ignore"):
+        reached = cumsum >= half[codes_sorted]
+
+    medians = np.full(n_groups, np.nan)
+    hit_pos = np.flatnonzero(reached)
+    hit_codes, first = np.unique(codes_sorted[hit_pos], return_index=True)
+    medians[hit_codes] = values_sorted[hit_pos[first]]
+    return medians
+
+
 def agg_severities(
     df: pd.DataFrame,
     weighted_mean_weight_col_name: str,
@@ -39,52 +96,80 @@ def agg_severities(
     mean_cols: list[str],
     median_cols: list[str],
     groupby_cols: list[str],
-    as_index: BoolDType,
+    as_index: bool,
 ) -> pd.DataFrame:
-    def weighted_mean(grp: pd.DataFrame, value_col: str, weight_col: str) -> float:
-        total_wt = grp[weight_col].sum()
-        return (
-            np.nan
-            if total_wt == 0
-            else (grp[value_col] * grp[weight_col]).sum() / total_wt
+    """Aggregate the severity rows of each `groupby_cols` group into one row.
+
+    Per group: the sum of discharges, the discharge portion of each severity
+    level, discharge weighted means of `mean_cols` and discharge weighted
+    medians of `median_cols`. All groups are computed at once on the group
+    codes instead of calling a Python function per group.
+    """
+    groupby_cols = list(groupby_cols)
+    as_index = bool(as_index)
+
+    codes_series = df.groupby(groupby_cols, sort=True, observed=True).ngroup()
+    valid = codes_series.notna().to_numpy()
+    df = df.loc[valid]
+    codes = codes_series.to_numpy()[valid].astype(np.intp)
+
+    # Rows of a group become one contiguous segment, in their original order
+    order = np.argsort(codes, kind="stable")
+    codes_sorted = codes[order]
+    n_groups = int(codes_sorted[-1]) + 1 if len(codes_sorted) else 0
+    sizes = np.bincount(codes_sorted, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.intp)
+
+    def column_sorted(col: str) -> np.ndarray:
+        return df[col].to_numpy()[order]
+
+    discharges = _wide(column_sorted(discharges_col_name))
+    total_dis = _segment_sums(discharges, starts, sizes)
+    results: dict[str, np.ndarray] = {sum_discharges_key: total_dis}
+
+    severity = column_sorted(apr_severity_of_illness_code_col_name)
+    for severity_level in severity_levels:
+        level_dis = np.where(severity == severity_level, discharges, 0)
+        level_sizes = np.bincount(
+            codes_sorted[severity == severity_level], minlength=n_groups
         )
+        # Matching rows first within each segment, so the sum only adds them
+        level_order = np.lexsort((severity != severity_level, codes_sorted))
+        level_sum = _segment_sums(level_dis[level_order], starts, level_sizes)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            results[f"severity_{severity_level}_portion"] = np.where(
+                total_dis != 0, level_sum / total_dis, 0
+            )
 
-    def weighted_median(grp: pd.DataFrame, value_col: str, weight_col: str) -> float:
-        df_sorted = grp[[value_col, weight_col]].sort_values(value_col)
-        cumsum = df_sorted[weight_col].cumsum()
-        half = df_sorted[weight_col].sum() / 2.0
-        return df_sorted.loc[cumsum >= half, value_col].iloc[0]
-
-    def aggregate_facility_rows(grp: pd.DataFrame) -> pd.Series:
-        total_dis = grp[discharges_col_name].sum()
-        results = {sum_discharges_key: total_dis}
-        for severity_level in severity_levels:
-            sub = grp[grp[apr_severity_of_illness_code_col_name] == severity_level]
-            results[f"severity_{severity_level}_portion"] = (
-                sub[discharges_col_name].sum() / total_dis if total_dis else 0
+    mean_weights = _wide(column_sorted(weighted_mean_weight_col_name))
+    total_mean_wt = _segment_sums(mean_weights, starts, sizes)
+    for col in mean_cols:
+        if col in df.columns:
+            weighted = _segment_sums(
+                _wide(column_sorted(col)) * mean_weights, starts, sizes
             )
-        for col in mean_cols:
-            if col in grp.columns:
-                results[f"w_{col}"] = weighted_mean(
-                    grp,
-                    value_col=col,
-                    weight_col=weighted_mean_weight_col_name,
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results[f"w_{col}"] = np.where(
+                    total_mean_wt == 0, np.nan, weighted / total_mean_wt
                 )
 
-        for col in median_cols:
-            if col in grp.columns:
-                results[f"w_{col}"] = weighted_median(
-                    grp,
-                    value_col=col,
-                    weight_col=weighted_median_weight_col_name,
-                )
-        return pd.Series(results)
+    median_weights = df[weighted_median_weight_col_name].to_numpy()
+    for col in median_cols:
+        if col in df.columns:
+            results[f"w_{col}"] = _weighted_medians(
+                df[col].to_numpy(),
+                median_weights,
+                codes,
+                n_groups,
+            )
 
-    groupby_cols = list(groupby_cols)
-    as_index = bool(as_index)
-    aggregated = df.groupby(groupby_cols, as_index=as_index).apply(
-        aggregate_facility_rows,
+    group_keys = df[groupby_cols].iloc[order[starts]].reset_index(drop=True)
+    aggregated = pd.concat(
+        [group_keys, pd.DataFrame(results).astype("float64")],
+        axis=1,
     )
+    if as_index:
+        aggregated = aggregated.set_index(groupby_cols)
     aggregated = aggregated.reset_index(drop=False)
     logger.info("Done with core transformation: agg_severities")
     if "w_total_median_profit" not in aggregated.columns.tolist():
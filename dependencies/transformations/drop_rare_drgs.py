@@ -29,9 +29,11 @@ def drop_rare_drgs(
     drop = bool(drop)
     inplace = bool(inplace)
 
-    total_dis_by_code = df.groupby(apr_drg_code_col_name, as_index=as_index)[
-        discharges_col_name
-    ].sum()
+    total_dis_by_code = df.groupby(
+        apr_drg_code_col_name,
+        as_index=as_index,
+        observed=True,
+    )[discharges_col_name].sum()
 
     if as_index:
         valid_codes = total_dis_by_code.loc[total_dis_by_code > threshold].index
@@ -12,8 +12,8 @@ class LagColumnsConfig:
     groupby_time_based_cols: list[str]
     drop: bool
     groupby_lag_cols: list[str]
-    lag1_suffix: str
-    shift_periods: int
+    lag_suffix: str
+    lag_periods: list[int]
 
 
 def lag_columns(
@@ -22,19 +22,24 @@ def lag_columns(
     groupby_time_based_cols: list[str],
     drop: bool,
     groupby_lag_cols: list[str],
-    lag1_suffix: str,
-    shift_periods: int,
+    lag_suffix: str,
+    lag_periods: list[int],
 ) -> pd.DataFrame:
     groupby_time_based_cols = list(groupby_time_based_cols)
     groupby_lag_cols = list(groupby_lag_cols)
+    columns_to_transform = list(columns_to_transform)
     drop = bool(drop)
 
     df = df.sort_values(by=groupby_time_based_cols).reset_index(drop=drop)
 
-    for col in columns_to_transform:
-        df[f"{col}{lag1_suffix}"] = df.groupby(groupby_lag_cols)[col].shift(
-            shift_periods,
-        )
+    # The group keys are hashed once, every horizon shifts the same column block
+    codes = df.groupby(groupby_lag_cols, sort=False, observed=True).ngroup()
+    grouped = df[columns_to_transform].groupby(codes, sort=False)
+    lagged = [
+        grouped.shift(int(periods)).add_suffix(f"{lag_suffix}{periods}")
+        for periods in lag_periods
+    ]
+    df = pd.concat([df, *lagged], axis=1)
 
     logger.info("Done with core transformation: lag_columns")
     return df
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 
 import pandas as pd
 
+from dependencies.pandas_specific.dtype_schema import widen_numeric
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,8 @@ def mean_profit(
     mean_charge_col_name: str,
     mean_cost_col_name: str,
 ) -> pd.DataFrame:
-    df[mean_profit_col_name] = df[mean_charge_col_name] - df[mean_cost_col_name]
+    charge = widen_numeric(df[mean_charge_col_name])
+    cost = widen_numeric(df[mean_cost_col_name])
+    df[mean_profit_col_name] = charge - cost
     logger.info("Done with core transformation: mean_profit")
     return df
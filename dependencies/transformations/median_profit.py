@@ -3,6 +3,8 @@ from dataclasses import dataclass
 
 import pandas as pd
 
+from dependencies.pandas_specific.dtype_schema import widen_numeric
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,8 @@ def median_profit(
     median_charge_col_name: str,
     median_cost_col_name: str,
 ) -> pd.DataFrame:
-    df[median_profit_col_name] = df[median_charge_col_name] - df[median_cost_col_name]
+    charge = widen_numeric(df[median_charge_col_name])
+    cost = widen_numeric(df[median_cost_col_name])
+    df[median_profit_col_name] = charge - cost
     logger.info("Done with core transformation: median_profit")
     return df
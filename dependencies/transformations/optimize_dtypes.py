@@ -0,0 +1,62 @@
+# dependencies/transformations/optimize_dtypes.py
+import logging
+from dataclasses import dataclass
+
+import pandas as pd
+
+from dependencies.pandas_specific.dtype_schema import (
+    apply_dtype_schema,
+    infer_dtype_schema,
+    save_dtype_schema,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OptimizeDtypesConfig:
+    dtype_schema_file_path: str
+    categorical_max_unique: int
+    categorical_max_unique_ratio: float
+    downcast_integers: bool
+    downcast_floats: bool
+    exclude_cols: list[str]
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    dtype_schema_file_path: str,
+    categorical_max_unique: int,
+    categorical_max_unique_ratio: float,
+    downcast_integers: bool,
+    downcast_floats: bool,
+    exclude_cols: list[str],
+) -> pd.DataFrame:
+    """Downcast numerics and turn low-cardinality strings into `category`.
+
+    The inferred schema is saved to `dtype_schema_file_path`. Reads that set
+    `utility_function_read.dtype_schema_file_path` to the same file reapply
+    it, so later stages group on category codes even when the data versions
+    are stored as CSV.
+    """
+    schema = infer_dtype_schema(
+        df,
+        categorical_max_unique=int(categorical_max_unique),
+        categorical_max_unique_ratio=float(categorical_max_unique_ratio),
+        downcast_integers=bool(downcast_integers),
+        downcast_floats=bool(downcast_floats),
+        exclude_cols=list(exclude_cols),
+    )
+    save_dtype_schema(schema, dtype_schema_file_path)
+
+    memory_before = df.memory_usage(deep=True).sum()
+    df = apply_dtype_schema(df, schema)
+    memory_after = df.memory_usage(deep=True).sum()
+    logger.info(
+        "Optimized dtypes of %d columns, memory %.1f MB -> %.1f MB",
+        len(schema["columns"]),
+        memory_before / 1e6,
+        memory_after / 1e6,
+    )
+    logger.info("Done with core transformation: optimize_dtypes")
+    return df
@@ -40,13 +40,15 @@ def ratio_drg_facility_vs_year(
     year_merge_on = str(year_merge_on)
 
     df_fac_yr = (
-        df.groupby([year_col_name, facility_id_col_name])[apr_drg_code_col_name]
+        df.groupby([year_col_name, facility_id_col_name], observed=True)[
+            apr_drg_code_col_name
+        ]
         .nunique()
         .reset_index(name=facility_drg_count_col_name)
     )
 
     df_yr = (
-        df.groupby(year_col_name)[apr_drg_code_col_name]
+        df.groupby(year_col_name, observed=True)[apr_drg_code_col_name]
         .nunique()
         .reset_index(name=year_drg_count_col_name)
     )
@@ -5,6 +5,8 @@ import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+ROLLING_AGGREGATIONS = ("mean", "sum", "std", "min", "max", "ewm")
+
 
 @dataclass
 class RollingColumnsConfig:
@@ -17,6 +19,23 @@ class RollingColumnsConfig:
     shift_periods: int
     min_periods: int
     inplace: bool
+    aggregations: list[str]
+    ewm_span: int
+
+
+def rolling_column_name(
+    col: str,
+    rolling_str: str,
+    aggregation: str,
+    window: int,
+    ewm_span: int,
+) -> str:
+    """Mean keeps the historical `{col}{rolling_str}{window}` name."""
+    if aggregation == "mean":
+        return f"{col}{rolling_str}{window}"
+    if aggregation == "ewm":
+        return f"{col}{rolling_str}_ewm{ewm_span}"
+    return f"{col}{rolling_str}_{aggregation}{window}"
 
 
 def rolling_columns(
@@ -30,24 +49,57 @@ def rolling_columns(
     shift_periods: int,
     min_periods: int,
     inplace: bool,
+    aggregations: list[str],
+    ewm_span: int,
 ) -> pd.DataFrame:
     groupby_time_based_cols = list(groupby_time_based_cols)
     groupby_rolling_cols = list(groupby_rolling_cols)
+    columns_to_transform = list(columns_to_transform)
+    aggregations = list(aggregations)
     drop = bool(drop)
     inplace = bool(inplace)
 
+    unknown = sorted(set(aggregations) - set(ROLLING_AGGREGATIONS))
+    if unknown:
+        msg = f"Unsupported rolling aggregations {unknown}."
+        raise ValueError(msg)
+
     df = df.sort_values(by=groupby_time_based_cols).reset_index(drop=drop)
 
-    for col in columns_to_transform:
-        df[f"{col}{rolling_str}{window}"] = df.groupby(groupby_rolling_cols)[
-            col
-        ].transform(
-            lambda s: s.shift(shift_periods)
-            .rolling(window=window, min_periods=min_periods)
-            .mean(),
-        )
+    # One grouped pass shifts the whole column block, the group codes are then
+    # reused by every rolling aggregation instead of regrouping per column.
+    codes = df.groupby(groupby_rolling_cols, sort=False, observed=True).ngroup()
+    shifted = (
+        df.groupby(groupby_rolling_cols, sort=False, observed=True)[
+            columns_to_transform
+        ]
+        .shift(shift_periods)
+        .groupby(codes, sort=False)
+    )
+
+    blocks = []
+    for aggregation in aggregations:
+        if aggregation == "ewm":
+            windows = shifted.ewm(span=ewm_span, min_periods=min_periods)
+            block = windows.mean()
+        else:
+            windows = shifted.rolling(window=window, min_periods=min_periods)
+            block = getattr(windows, aggregation)()
+        block = block.droplevel(0).reindex(df.index)
+        block.columns = [
+            rolling_column_name(col, rolling_str, aggregation, window, ewm_span)
+            for col in block.columns
+        ]
+        blocks.append(block)
+    df = pd.concat([df, *blocks], axis=1)
 
-    rolling_cols = [f"{col}{rolling_str}{window}" for col in columns_to_transform]
+    dropna_aggregation = "mean" if "mean" in aggregations else None
+    rolling_cols = [
+        rolling_column_name(col, rolling_str, aggregation, window, ewm_span)
+        for aggregation in aggregations
+        if dropna_aggregation in (None, aggregation)
+        for col in columns_to_transform
+    ]
     df = df.dropna(subset=rolling_cols, inplace=inplace)
 
     logger.info("Done with core transformation: rolling_columns")
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 
 import pandas as pd
 
+from dependencies.pandas_specific.dtype_schema import widen_numeric
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,7 +21,9 @@ def total_median_cost(
     median_cost_col_name: str,
     discharges_col_name: str,
 ) -> pd.DataFrame:
-    df[total_median_cost_col_name] = df[median_cost_col_name] * df[discharges_col_name]
+    cost = widen_numeric(df[median_cost_col_name])
+    discharges = widen_numeric(df[discharges_col_name])
+    df[total_median_cost_col_name] = cost * discharges
     logger.info("Done with core transformation: total_median_cost")
 
     return df
@@ -55,14 +55,16 @@ def yearly_discharge_bin(
         return pd.qcut(x, q=q, labels=labels, duplicates=duplicates)
 
     df_agg = (
-        df.groupby(groupby_cols, as_index=as_index)[sum_discharges_col_name]
+        df.groupby(groupby_cols, as_index=as_index, observed=True)[
+            sum_discharges_col_name
+        ]
         .sum()
         .rename(columns=rename_columns)
     )
 
-    df_agg[yearly_discharge_bin_col_name] = df_agg.groupby(year_col_name)[
-        yearly_sum_discharges_col_name
-    ].transform(lambda x: make_qbins(x, q=num_bins))
+    df_agg[yearly_discharge_bin_col_name] = df_agg.groupby(
+        year_col_name, observed=True
+    )[yearly_sum_discharges_col_name].transform(lambda x: make_qbins(x, q=num_bins))
 
     logger.info("Done with core transformation: yearly_discharge_bin")
     return df_merge(
@@ -2,12 +2,18 @@
 """Execute a pipeline step specified by Hydra configuration.
 This script reads/writes data, applies transformations, and runs tests as configured."""
 
+from __future__ import annotations
+
 import logging
+from collections.abc import Callable
+from contextlib import closing
 from dataclasses import asdict
-from typing import Any, Callable
+from typing import Any, cast
 
 import hydra
 import pandas as pd
+from hydra import compose
+from hydra.core.hydra_config import HydraConfig
 from omegaconf import OmegaConf
 
 # Transformation imports
@@ -19,8 +25,10 @@ from dependencies.ingestion.ingest_data import (
 )
 
 # io imports
-from dependencies.io.csv_to_dataframe import csv_to_dataframe
-from dependencies.io.dataframe_to_csv import dataframe_to_csv
+from dependencies.io.dataframe_chunk_writer import DataFrameChunkWriter
+from dependencies.io.read_dataframe import read_dataframe
+from dependencies.io.read_dataframe_chunks import read_dataframe_chunks
+from dependencies.io.write_dataframe import write_dataframe
 
 # Logging imports
 from dependencies.logging_utils.log_cfg_job import log_cfg_job
@@ -28,7 +36,12 @@ from dependencies.logging_utils.log_function_call import log_function_call
 from dependencies.logging_utils.setup_logging import setup_logging
 
 # Metadata imports
-from dependencies.metadata.calculate_metadata import calculate_and_save_metadata
+from dependencies.metadata.calculate_metadata import (
+    MetadataAccumulator,
+    calculate_and_save_metadata,
+    save_accumulated_metadata,
+)
+from dependencies.modeling.batch_predict import BatchPredictConfig, batch_predict
 from dependencies.modeling.rf_optuna_trial import RfOptunaTrialConfig, rf_optuna_trial
 from dependencies.modeling.ridge_optuna_trial import (
     RidgeOptunaTrialConfig,
@@ -60,6 +73,10 @@ from dependencies.transformations.drop_rare_drgs import (
 from dependencies.transformations.lag_columns import LagColumnsConfig, lag_columns
 from dependencies.transformations.mean_profit import MeanProfitConfig, mean_profit
 from dependencies.transformations.median_profit import MedianProfitConfig, median_profit
+from dependencies.transformations.optimize_dtypes import (
+    OptimizeDtypesConfig,
+    optimize_dtypes,
+)
 from dependencies.transformations.ratio_drg_facility_vs_year import (
     RatioDrgFacilityVsYearConfig,
     ratio_drg_facility_vs_year,
@@ -97,6 +114,7 @@ TRANSFORMATIONS: dict[str, dict[str, Any]] = {
     "sanitize_column_names": {
         "transform": log_function_call(sanitize_column_names),
         "Config": None,
+        "row_local": True,
     },
     "agg_severities": {
         "transform": log_function_call(agg_severities),
@@ -105,6 +123,7 @@ TRANSFORMATIONS: dict[str, dict[str, Any]] = {
     "drop_description_columns": {
         "transform": log_function_call(drop_description_columns),
         "Config": DropDescriptionColumnsConfig,
+        "row_local": True,
     },
     "drop_non_lag_columns": {
         "transform": log_function_call(drop_non_lag_columns),
@@ -121,10 +140,16 @@ TRANSFORMATIONS: dict[str, dict[str, Any]] = {
     "mean_profit": {
         "transform": log_function_call(mean_profit),
         "Config": MeanProfitConfig,
+        "row_local": True,
     },
     "median_profit": {
         "transform": log_function_call(median_profit),
         "Config": MedianProfitConfig,
+        "row_local": True,
+    },
+    "optimize_dtypes": {
+        "transform": log_function_call(optimize_dtypes),
+        "Config": OptimizeDtypesConfig,
     },
     "ratio_drg_facility_vs_year": {
         "transform": log_function_call(ratio_drg_facility_vs_year),
@@ -137,18 +162,22 @@ TRANSFORMATIONS: dict[str, dict[str, Any]] = {
     "total_mean_cost": {
         "transform": log_function_call(total_mean_cost),
         "Config": TotalMeanCostConfig,
+        "row_local": True,
     },
     "total_mean_profit": {
         "transform": log_function_call(total_mean_profit),
         "Config": TotalMeanProfitConfig,
+        "row_local": True,
     },
     "total_median_cost": {
         "transform": log_function_call(total_median_cost),
         "Config": TotalMedianCostConfig,
+        "row_local": True,
     },
     "total_median_profit": {
         "transform": log_function_call(total_median_profit),
         "Config": TotalMedianProfitConfig,
+        "row_local": True,
     },
     "yearly_discharge_bin": {
         "transform": log_function_call(yearly_discharge_bin),
@@ -162,12 +191,20 @@ TRANSFORMATIONS: dict[str, dict[str, Any]] = {
         "transform": log_function_call(ridge_optuna_trial),
         "Config": RidgeOptunaTrialConfig,
     },
+    # streaming: runs chunk by chunk even without io_policy.STREAMING
+    "batch_predict": {
+        "transform": log_function_call(batch_predict),
+        "Config": BatchPredictConfig,
+        "row_local": True,
+        "streaming": True,
+    },
 }
 
 TESTS: dict[str, dict[str, Any]] = {
     "check_required_columns": {
         "test": log_function_call(check_required_columns),
         "Config": CheckRequiredColumnsConfig,
+        "row_local": True,
     },
     "check_row_count": {
         "test": log_function_call(check_row_count),
@@ -176,15 +213,249 @@ TESTS: dict[str, dict[str, Any]] = {
 }
 
 
+FUSED_RUN_OVERRIDE_KEYS = (
+    "fused_run",
+    "setup.script_base_name",
+    "transformations",
+    "data_versions.data_version_input",
+    "data_versions.data_version_output",
+    "test_params",
+)
+
+
+def apply_transformation(
+    df: pd.DataFrame,
+    transform_name: str,
+    transform_config: dict[str, Any],
+) -> pd.DataFrame:
+    """Run a registered transformation on df and validate its return value."""
+    step_info = TRANSFORMATIONS[transform_name]
+    step_fn = step_info["transform"]
+    step_cls = step_info["Config"] if step_info["Config"] else None
+
+    step_params = transform_config[transform_name]
+
+    if step_cls:
+        cfg_obj = step_cls(**step_params)
+        returned_value = step_fn(df, **asdict(cfg_obj))
+    else:
+        returned_value = step_fn(df)
+    return_type = transform_config.get("return_type")
+    if return_type == "df" and returned_value is not None:
+        if not isinstance(returned_value, pd.DataFrame):
+            logger = logging.getLogger(__name__)
+            logger.error("%s did not return a DataFrame.", transform_name)
+            raise TypeError
+        df = returned_value
+    return df
+
+
+def run_tests(
+    df: pd.DataFrame,
+    transform_config: dict[str, Any],
+    tests_config: dict[str, Any],
+    row_local: bool | None = None,
+) -> pd.DataFrame:
+    """Run every test in TESTS that is switched on in transform_config.
+
+    `row_local` restricts the run to the tests with that registry flag.
+    """
+    for test_key, test_dict in TESTS.items():
+        if row_local is not None and test_dict.get("row_local", False) != row_local:
+            continue
+        if transform_config.get(test_key, False):
+            test_fn: Callable[..., pd.DataFrame] = test_dict["test"]
+            test_params_dict = tests_config.get(test_key, {})
+            df = test_fn(df, **test_params_dict)
+    return df
+
+
+def write_outputs(
+    df: pd.DataFrame,
+    write_params: dict[str, Any],
+    meta_params: dict[str, Any],
+) -> None:
+    written_file = write_dataframe(df, **write_params)
+    calculate_and_save_metadata(
+        df,
+        **meta_params,
+        file_hash_sha256=written_file.hash_sha256,
+        file_size_bytes=written_file.file_size_bytes,
+    )
+
+
+def stream_step(
+    transform_name: str,
+    transform_config: dict[str, Any],
+    tests_config: dict[str, Any],
+    read_params: dict[str, Any],
+    write_params: dict[str, Any],
+    meta_params: dict[str, Any],
+    chunk_size_rows: int,
+    input_metadata_file_path: str | None = None,
+) -> None:
+    """Run a row-local transformation over the input chunk by chunk.
+
+    At most one chunk is in memory: it is transformed, checked by the
+    row-local tests, appended to the output file and added to the metadata
+    accumulators. The other tests (the row count) run on the row count of the
+    finished output. CSV chunks are parsed into the dtypes recorded in
+    `input_metadata_file_path`.
+    """
+    meta_params = dict(meta_params)
+    accumulator = MetadataAccumulator(
+        df_hash_n_jobs=meta_params.pop("df_hash_n_jobs", 1),
+        column_profile=meta_params.pop("column_profile", None),
+    )
+    chunks = read_dataframe_chunks(
+        **read_params,
+        chunk_size_rows=chunk_size_rows,
+        input_metadata_file_path=input_metadata_file_path,
+    )
+    with closing(DataFrameChunkWriter(**write_params)) as writer:
+        for chunk in chunks:
+            df = apply_transformation(chunk, transform_name, transform_config)
+            df = run_tests(df, transform_config, tests_config, row_local=True)
+            accumulator.update(df)
+            writer.write(df)
+
+    run_tests(
+        pd.DataFrame(index=pd.RangeIndex(accumulator.num_rows)),
+        transform_config,
+        tests_config,
+        row_local=False,
+    )
+    written_file = writer.written_file
+    save_accumulated_metadata(
+        accumulator,
+        **meta_params,
+        file_hash_sha256=written_file.hash_sha256,
+        file_size_bytes=written_file.file_size_bytes,
+    )
+
+
+def compose_fused_step_cfg(
+    step: dict[str, Any],
+    data_version_input: str,
+    base_overrides: list[str],
+) -> RootConfig:
+    """Compose the config a single universal_step run of `step` would get."""
+    data_version_output = step["data_version_output"]
+    step_overrides = [
+        f"setup.script_base_name={step['transformation']}",
+        f"transformations={step['transformation']}",
+        f"data_versions.data_version_input={data_version_input}",
+        f"data_versions.data_version_output={data_version_output}",
+        f"test_params={step.get('test_params') or data_version_output}",
+        *step.get("overrides", []),
+    ]
+    return cast(
+        RootConfig,
+        compose(config_name="config", overrides=base_overrides + step_overrides),
+    )
+
+
+def fused_run(cfg: RootConfig) -> None:
+    """Run the ordered `fused_run.steps` in this process on one DataFrame.
+
+    Every step is configured exactly like its own universal_step run, but the
+    input is only read once and the DataFrame is handed from step to step in
+    memory. Outputs and metadata are written per data version, either right
+    after each step or, with `defer_writes`, once the whole chain succeeded.
+    """
+    logger = logging.getLogger(__name__)
+
+    steps = cast(
+        list[dict[str, Any]],
+        OmegaConf.to_container(cfg.fused_run.steps, resolve=True),
+    )
+    write_intermediate = bool(cfg.fused_run.write_intermediate)
+    defer_writes = bool(cfg.fused_run.defer_writes)
+    write_output = cfg.io_policy.WRITE_OUTPUT
+
+    # CLI overrides (e.g. data_storage.file_type) apply to every step, the keys
+    # that define a step are set per step
+    base_overrides = []
+    for override in HydraConfig.get().overrides.task:
+        key = override.lstrip("+~").split("=", 1)[0]
+        if key in FUSED_RUN_OVERRIDE_KEYS or key.startswith("fused_run."):
+            continue
+        base_overrides.append(override)
+
+    for step in steps:
+        if step["transformation"] not in TRANSFORMATIONS:
+            logger.error(
+                "'%s' is not recognized in TRANSFORMATIONS.", step["transformation"]
+            )
+            raise KeyError(step["transformation"])
+        if step["transformation"] == "ingest_data":
+            msg = "ingest_data has no input DataFrame and can not be fused."
+            raise ValueError(msg)
+
+    df: pd.DataFrame | None = None
+    pending: list[tuple[pd.DataFrame, dict[str, Any], dict[str, Any]]] = []
+    data_version_input = cfg.data_versions.data_version_input
+
+    for i, step in enumerate(steps):
+        transform_name = step["transformation"]
+        step_cfg = compose_fused_step_cfg(step, data_version_input, base_overrides)
+        transform_config = cast(
+            dict[str, Any],
+            OmegaConf.to_container(step_cfg.transformations, resolve=True),
+        )
+        if transform_config.get("return_type") != "df":
+            msg = f"{transform_name} does not return a DataFrame and can not be fused."
+            raise ValueError(msg)
+
+        if df is None:
+            read_params = OmegaConf.to_container(
+                step_cfg.utility_functions.utility_function_read, resolve=True
+            )
+            df = read_dataframe(**read_params)
+
+        df = apply_transformation(df, transform_name, transform_config)
+
+        is_last = i == len(steps) - 1
+        if write_output and (write_intermediate or is_last):
+            tests_config = OmegaConf.to_container(step_cfg.tests, resolve=True)
+            df = run_tests(df, transform_config, tests_config)
+            write_params = OmegaConf.to_container(
+                step_cfg.utility_functions.utility_function_write, resolve=True
+            )
+            meta_params = OmegaConf.to_container(
+                step_cfg.utility_functions.utility_function_metadata, resolve=True
+            )
+            if defer_writes:
+                # Later steps modify df in place, keep the state of this version
+                pending.append((df.copy(), write_params, meta_params))
+            else:
+                write_outputs(df, write_params, meta_params)
+
+        logger.info(
+            "Fused step %i/%i done: %s -> %s",
+            i + 1,
+            len(steps),
+            transform_name,
+            step["data_version_output"],
+        )
+        data_version_input = step["data_version_output"]
+
+    for df_version, write_params, meta_params in pending:
+        write_outputs(df_version, write_params, meta_params)
+
+
 @hydra.main(version_base=None, config_path="../configs", config_name="config")
 def universal_step(cfg: RootConfig) -> None:
     """
     Orchestrate a universal pipeline step using the provided RootConfig:
     1) Identify the transformation to run.
-    2) Optionally read data from Parquet.
+    2) Optionally read data in the configured storage format.
     3) Validate transformation output if it should be a DataFrame.
     4) Execute configured tests on the resulting data.
     5) Optionally write the resulting data and metadata.
+
+    If `fused_run.steps` is set, the listed transformations run as one chain
+    instead, see `fused_run`.
     """
     setup_logging(cfg)
     logger = logging.getLogger(__name__)
@@ -199,6 +470,14 @@ def universal_step(cfg: RootConfig) -> None:
             bool(log_cfg_job_flag),
         )
 
+    if cfg.fused_run.steps:
+        fused_run(cfg)
+        logger.info(
+            "Sucessfully executed fused steps: %s",
+            [step.transformation for step in cfg.fused_run.steps],
+        )
+        return
+
     # Convert Hydra configs to dict
     transform_config = OmegaConf.to_container(cfg.transformations, resolve=True)
     read_params = OmegaConf.to_container(
@@ -217,44 +496,48 @@ def universal_step(cfg: RootConfig) -> None:
         logger.error("'%s' is not recognized in TRANSFORMATIONS.", transform_name)
         return
 
-    step_info = TRANSFORMATIONS[transform_name]
-    step_fn = step_info["transform"]
-    step_cls = step_info["Config"] if step_info["Config"] else None
-
-    step_params = transform_config[transform_name]
-
     read_input = cfg.io_policy.READ_INPUT
     write_output = cfg.io_policy.WRITE_OUTPUT
+    streaming = bool(cfg.io_policy.STREAMING) or TRANSFORMATIONS.get(
+        transform_name, {}
+    ).get("streaming", False)
 
     if transform_name == "ingest_data":
+        step_info = TRANSFORMATIONS[transform_name]
+        step_fn = step_info["transform"]
+        step_cls = step_info["Config"] if step_info["Config"] else None
         if step_cls:
-            cfg_obj = step_cls(**step_params)
+            cfg_obj = step_cls(**transform_config[transform_name])
             step_fn(**asdict(cfg_obj))
         else:
             step_fn()
+    elif (
+        streaming
+        and read_input
+        and write_output
+        and TRANSFORMATIONS[transform_name].get("row_local", False)
+    ):
+        stream_step(
+            transform_name,
+            transform_config,
+            tests_config,
+            read_params,
+            write_params,
+            meta_params,
+            chunk_size_rows=cfg.io_policy.CHUNK_SIZE_ROWS,
+            input_metadata_file_path=cfg.data_storage.input_metadata_file_path,
+        )
     else:
-        df = csv_to_dataframe(**read_params) if read_input else pd.DataFrame()
-        if step_cls:
-            cfg_obj = step_cls(**step_params)
-            returned_value = step_fn(df, **asdict(cfg_obj))
-        else:
-            returned_value = step_fn(df)
-        return_type = transform_config.get("return_type")
-        if return_type == "df" and returned_value is not None:
-            if not isinstance(returned_value, pd.DataFrame):
-                logger.error("%s did not return a DataFrame.", transform_name)
-                raise TypeError
-            df = returned_value
+        if streaming:
+            logger.info(
+                "'%s' is not row-local, reading the whole input.", transform_name
+            )
+        df = read_dataframe(**read_params) if read_input else pd.DataFrame()
+        df = apply_transformation(df, transform_name, transform_config)
 
         if write_output:
-            for test_key, test_dict in TESTS.items():
-                if transform_config.get(test_key, False):
-                    test_fn: Callable[..., pd.DataFrame] = test_dict["test"]
-                    test_params_dict = tests_config.get(test_key, {})
-                    df = test_fn(df, **test_params_dict)
-
-            dataframe_to_csv(df, **write_params)
-            calculate_and_save_metadata(df, **meta_params)
+            df = run_tests(df, transform_config, tests_config)
+            write_outputs(df, write_params, meta_params)
 
     logger.info("Sucessfully executed step: %s", transform_name)
 